@@ -1,15 +1,33 @@
 
+import os
 from typing import Optional
 from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.session.base import BaseSession
+from aiogram.client.telegram import TelegramAPIServer
+
+from app.middlewares.metrics_middlewares import ApiMetricsMiddleware
+from app.utils.rate_limiter import OutboundLimiter
 
 _bot: Optional[Bot] = None
 
+# Другой адрес Bot API: свой сервер telegram-bot-api или заглушка для нагрузочных тестов (benchmarks/load_test.py)
+BOT_API_URL = os.getenv("BOT_API_URL")
+
 
-def init_bot(token: str) -> Bot:
-    """Инициализировать и вернуть глобальный Bot. Вызывать один раз при старте приложения."""
+def init_bot(token: str, session: Optional[BaseSession] = None) -> Bot:
+    """
+    Инициализировать и вернуть глобальный Bot. Вызывать один раз при старте приложения.
+    session — своя сессия (например, к заглушке Bot API в бенчмарках); ограничитель и метрики подключаются к ней.
+    """
     global _bot
     if _bot is None:
-        _bot = Bot(token=token)
+        if session is None and BOT_API_URL:
+            session = AiohttpSession(api=TelegramAPIServer.from_base(BOT_API_URL))
+        _bot = Bot(token=token, session=session)
+        # Ограничитель снаружи: метрики API считают только сам запрос, без ожидания очереди
+        _bot.session.middleware(OutboundLimiter())
+        _bot.session.middleware(ApiMetricsMiddleware())
     return _bot
 
 
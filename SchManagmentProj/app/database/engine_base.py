@@ -1,9 +1,102 @@
+import os
+from dataclasses import dataclass, fields
+from typing import Optional
+
+from sqlalchemy import event
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy.ext.asyncio import AsyncAttrs, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncAttrs, AsyncEngine, async_sessionmaker, create_async_engine
 from datetime import datetime
 
-engine = create_async_engine(url="sqlite+aiosqlite:///bot_data.sqlite3")
-async_session = async_sessionmaker(engine, expire_on_commit=False)
+from app.database.migrations import run_migrations
+from app.utils.sql_monitor import track_queries
+
+DATABASE_URL = os.getenv("BOT_DB_URL", "sqlite+aiosqlite:///bot_data.sqlite3")
+
+
+@dataclass(frozen=True)
+class SQLiteProfile:
+    """
+    Настройки соединений SQLite. Прагмы применяются к каждому новому соединению,
+    None — оставить значение SQLite по умолчанию.
+    Любое поле можно переопределить переменной окружения BOT_DB_<ИМЯ_ПОЛЯ>.
+    """
+    journal_mode: Optional[str] = "WAL"
+    synchronous: Optional[str] = "NORMAL"
+    busy_timeout: Optional[int] = 5000  # мс
+    mmap_size: Optional[int] = 256 * 1024 * 1024  # байт
+    cache_size: Optional[int] = -64 * 1024  # отрицательное значение — в КиБ
+    temp_store: Optional[str] = "MEMORY"
+
+    # Пул соединений для чтения. Писатель всегда один — см. write_engine
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+
+    @classmethod
+    def from_env(cls, prefix: str = "BOT_DB_") -> "SQLiteProfile":
+        overrides = {}
+        for f in fields(cls):
+            raw = os.getenv(prefix + f.name.upper())
+            if raw is None:
+                continue
+            if raw.lower() in ("", "none", "default"):
+                overrides[f.name] = None
+            elif f.name in ("journal_mode", "synchronous", "temp_store"):
+                overrides[f.name] = raw.upper()
+            elif f.name == "pool_timeout":
+                overrides[f.name] = float(raw)
+            else:
+                overrides[f.name] = int(raw)
+        return cls(**overrides)
+
+    def pragmas(self) -> list[str]:
+        names = ("journal_mode", "synchronous", "busy_timeout", "mmap_size", "cache_size", "temp_store")
+        return [f"PRAGMA {name}={getattr(self, name)}" for name in names if getattr(self, name) is not None]
+
+
+# Настройки SQLite по умолчанию (как было до профилей) — для сравнения в бенчмарках
+LEGACY_PROFILE = SQLiteProfile(journal_mode=None, synchronous=None, busy_timeout=None, mmap_size=None,
+                               cache_size=None, temp_store=None)
+
+
+def build_engine(url: str = DATABASE_URL, profile: SQLiteProfile = None, *, read_only: bool = False,
+                 pool_size: int = None, max_overflow: int = None) -> AsyncEngine:
+    profile = profile or SQLiteProfile.from_env()
+    new_engine = create_async_engine(
+        url=url,
+        pool_size=profile.pool_size if pool_size is None else pool_size,
+        max_overflow=profile.max_overflow if max_overflow is None else max_overflow,
+        pool_timeout=profile.pool_timeout,
+    )
+    statements = profile.pragmas()
+    if read_only:
+        # Соединение только для чтения: в режиме WAL читает снимок и не ждёт писателя
+        statements.append("PRAGMA query_only=ON")
+
+    @event.listens_for(new_engine.sync_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
+
+    track_queries(new_engine.sync_engine, "read" if read_only else "write")
+    return new_engine
+
+
+_profile = SQLiteProfile.from_env()
+
+# Единственное соединение на запись: записи выстраиваются в очередь пула, а не упираются в блокировку БД
+write_engine = build_engine(DATABASE_URL, _profile, pool_size=1, max_overflow=0)
+# Пул соединений только для чтения
+read_engine = build_engine(DATABASE_URL, _profile, read_only=True)
+
+write_session = async_sessionmaker(write_engine, expire_on_commit=False)
+read_session = async_sessionmaker(read_engine, expire_on_commit=False)
+
+# Прежние имена: всё, что явно не объявлено чтением, идёт через писателя
+engine = write_engine
+async_session = write_session
 
 
 class Base(AsyncAttrs, DeclarativeBase):
@@ -13,3 +106,10 @@ class Base(AsyncAttrs, DeclarativeBase):
 async def async_main():
    async with engine.begin() as conn:
        await conn.run_sync(Base.metadata.create_all)
+   # create_all не трогает существующие таблицы — колонки и индексы досоздают миграции
+   await run_migrations(engine)
+
+
+async def dispose_engines():
+    await read_engine.dispose()
+    await write_engine.dispose()
@@ -0,0 +1,94 @@
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, List, NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable[[AsyncConnection], Awaitable[None]]
+
+
+async def _add_column(conn: AsyncConnection, table: str, column: str, ddl: str) -> None:
+    # create_all не добавляет колонки в существующие таблицы, а на новой базе колонка уже есть
+    result = await conn.exec_driver_sql(f"PRAGMA table_info({table})")
+    if column not in {row[1] for row in result.all()}:
+        await conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+
+async def _create_indexes(conn: AsyncConnection, statements: List[str]) -> None:
+    for statement in statements:
+        await conn.exec_driver_sql(statement)
+
+
+async def _model_changes(conn: AsyncConnection) -> None:
+    """Колонки и индексы, появившиеся в моделях после первой версии схемы."""
+    await _add_column(conn, "registered_users", "unreachable_at", "DATETIME")
+    await _create_indexes(conn, [
+        "CREATE INDEX IF NOT EXISTS ix_registered_users_unreachable_at ON registered_users (unreachable_at)",
+        "CREATE INDEX IF NOT EXISTS ix_task_owner_status "
+        "ON task_info (created_for, is_completed, is_deleted, id)",
+        "CREATE INDEX IF NOT EXISTS ix_task_owner_completed_at "
+        "ON task_info (created_for, is_completed, is_deleted, completed_at)",
+    ])
+
+
+async def _hot_path_indexes(conn: AsyncConnection) -> None:
+    """Индексы под частые запросы. Списки задач пользователя уже покрыты ix_task_owner_status."""
+    await _create_indexes(conn, [
+        # События дня и диапазона: get_events_by_date, get_events_in_range
+        "CREATE INDEX IF NOT EXISTS ix_event_live_period ON event_info (is_deleted, start_at, end_at)",
+        # get_existing_managers, get_president
+        "CREATE INDEX IF NOT EXISTS ix_registered_users_role ON registered_users (role)",
+        "CREATE INDEX IF NOT EXISTS ix_registered_users_manager_role ON registered_users (manager_role)",
+        # Выбор класса при регистрации
+        "CREATE INDEX IF NOT EXISTS ix_group_letter_grade ON group_info (letter, grade)",
+    ])
+
+
+# Новые миграции добавляются в конец списка со следующим номером версии
+MIGRATIONS: List[Migration] = [
+    Migration(1, "model_changes", _model_changes),
+    Migration(2, "hot_path_indexes", _hot_path_indexes),
+]
+
+
+async def get_schema_version(conn: AsyncConnection) -> int:
+    result = await conn.exec_driver_sql("SELECT MAX(version) FROM schema_migrations")
+    return result.scalar() or 0
+
+
+async def run_migrations(engine: AsyncEngine, migrations: List[Migration] = None) -> int:
+    """Применяет по порядку ещё не применённые миграции. Каждая — в своей транзакции. Возвращает версию схемы."""
+    migrations = sorted(migrations or MIGRATIONS, key=lambda m: m.version)
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, name VARCHAR(128) NOT NULL, applied_at DATETIME NOT NULL)"
+        )
+        version = await get_schema_version(conn)
+
+    applied = False
+    for migration in migrations:
+        if migration.version <= version:
+            continue
+        async with engine.begin() as conn:
+            await migration.apply(conn)
+            await conn.execute(
+                text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:version, :name, :applied_at)"),
+                {"version": migration.version, "name": migration.name, "applied_at": datetime.now()}
+            )
+        version = migration.version
+        applied = True
+        logger.info("Applied migration %s_%s", migration.version, migration.name)
+
+    if applied:
+        # Обновляем статистику планировщика, чтобы он начал выбирать новые индексы
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql("PRAGMA optimize")
+    return version
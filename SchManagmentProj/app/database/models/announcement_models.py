@@ -0,0 +1,62 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import BigInteger, String, Integer, DateTime, ForeignKey, UniqueConstraint
+from enum import Enum as PyEnum
+from sqlalchemy import Enum as SQLEnum
+from app.database.engine_base import Base
+
+
+class AnnouncementStatus(PyEnum):
+    pending = "pending"
+    running = "running"
+    done = "done"
+    failed = "failed"
+
+
+class DeliveryStatus(PyEnum):
+    sent = "sent"
+    failed = "failed"
+
+
+class AnnouncementJob(Base):
+    __tablename__ = "announcement_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    created_by: Mapped[int] = mapped_column(Integer, ForeignKey("registered_users.id", ondelete="SET NULL"),
+                                            nullable=True)
+    created_at: Mapped[DateTime] = mapped_column(DateTime, nullable=False)
+
+    # Исходное сообщение, которое копируется получателям
+    author_chat_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    from_chat_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    message_id: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    # Кому рассылать. Пока поддерживается только "all"
+    target: Mapped[str] = mapped_column(String(64), nullable=False, default="all")
+
+    status: Mapped[AnnouncementStatus] = mapped_column(SQLEnum(AnnouncementStatus, name="announcement_status"),
+                                                       nullable=False, default=AnnouncementStatus.pending,
+                                                       index=True)
+    # Время отложенной отправки (локальное), None — отправить сразу
+    send_at: Mapped[DateTime] = mapped_column(DateTime, nullable=True, index=True)
+    started_at: Mapped[DateTime] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[DateTime] = mapped_column(DateTime, nullable=True)
+
+    # Сообщение автору с живым прогрессом
+    progress_message_id: Mapped[int] = mapped_column(Integer, nullable=True)
+
+    total_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    sent_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class AnnouncementDelivery(Base):
+    __tablename__ = "announcement_deliveries"
+    __table_args__ = (UniqueConstraint("job_id", "tg_id", name="uq_announcement_delivery"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    job_id: Mapped[int] = mapped_column(Integer, ForeignKey("announcement_jobs.id", ondelete="CASCADE"),
+                                        nullable=False)
+    tg_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    status: Mapped[DeliveryStatus] = mapped_column(SQLEnum(DeliveryStatus, name="delivery_status"), nullable=False)
+    error: Mapped[str] = mapped_column(String(255), nullable=True)
+    delivered_at: Mapped[DateTime] = mapped_column(DateTime, nullable=False)
@@ -1,5 +1,8 @@
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy import BigInteger, String, Integer, Boolean, Column, DateTime, ForeignKey
+from dataclasses import dataclass
+from datetime import date
+from typing import Tuple
 from app.database.engine_base import Base
 
 
@@ -31,3 +34,12 @@ class Event(Base):
     deleted_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=True)
     deleted_by: Mapped[int] = mapped_column(Integer, ForeignKey("registered_users.id", ondelete="SET NULL"),
                                             nullable=True)
+
+
+@dataclass(frozen=True)
+class WeekSchedule:
+    """События недели, разложенные по дням (понедельник — days[0]). Кэшируется целиком."""
+    start: date
+    days: Tuple[Tuple[Event, ...], ...]
+    # Версия "events" на момент начала загрузки (см. keyboard_cache.get_version)
+    version: int = 0
@@ -0,0 +1,15 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Text, DateTime
+from app.database.engine_base import Base
+
+
+class FSMRecord(Base):
+    __tablename__ = "fsm_states"
+
+    # Ключ вида "bot_id:chat_id:user_id:thread_id:business_connection_id:destiny"
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    state: Mapped[str] = mapped_column(String(255), nullable=True)
+    # Данные формы в компактном JSON (см. app.utils.fsm_storage)
+    data: Mapped[str] = mapped_column(Text, nullable=False, default="{}")
+    # Время последнего изменения — по нему удаляются брошенные формы
+    updated_at: Mapped[DateTime] = mapped_column(DateTime, nullable=False, index=True)
@@ -0,0 +1,34 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Integer, Text, DateTime, ForeignKey, Index
+from enum import Enum as PyEnum
+from sqlalchemy import Enum as SQLEnum
+from app.database.engine_base import Base
+
+
+class OutboxStatus(PyEnum):
+    pending = "pending"
+    failed = "failed"
+
+
+class OutboxNotification(Base):
+    """
+    Уведомление, которое нужно доставить пользователю. Пишется в одной транзакции с изменением,
+    о котором уведомляет, и удаляется после успешной отправки (см. app/utils/outbox_worker.py).
+    """
+    __tablename__ = "notification_outbox"
+    # Выборка очередной пачки: ожидающие, у которых подошло время попытки
+    __table_args__ = (Index("ix_outbox_status_next_attempt", "status", "next_attempt_at"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("registered_users.id", ondelete="CASCADE"),
+                                         nullable=False)
+    text: Mapped[str] = mapped_column(String(4096), nullable=False)
+    # InlineKeyboardMarkup в JSON
+    reply_markup: Mapped[str] = mapped_column(Text, nullable=True)
+
+    status: Mapped[OutboxStatus] = mapped_column(SQLEnum(OutboxStatus, name="outbox_status"), nullable=False,
+                                                 default=OutboxStatus.pending)
+    created_at: Mapped[DateTime] = mapped_column(DateTime, nullable=False)
+    next_attempt_at: Mapped[DateTime] = mapped_column(DateTime, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[str] = mapped_column(String(255), nullable=True)
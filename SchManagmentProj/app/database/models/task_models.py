@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import BigInteger, String, Integer, Boolean, Column, DateTime, ForeignKey
+from sqlalchemy import BigInteger, String, Integer, Boolean, Column, DateTime, ForeignKey, Index
 from enum import Enum as PyEnum
 from sqlalchemy import Enum as SQLEnum
 from app.database.engine_base import Base
@@ -7,6 +7,12 @@ from app.database.engine_base import Base
 
 class Task(Base):
     __tablename__ = 'task_info'
+    # Списки задач пользователя (планер, завершённые) листаются по id внутри этого индекса
+    __table_args__ = (
+        Index("ix_task_owner_status", "created_for", "is_completed", "is_deleted", "id"),
+        # Месячный отчёт пользователя — диапазон по completed_at
+        Index("ix_task_owner_completed_at", "created_for", "is_completed", "is_deleted", "completed_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     title: Mapped[str] = mapped_column(String(64), nullable=False)
@@ -28,3 +34,14 @@ class Task(Base):
     deleted_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=True)
     deleted_by: Mapped[int] = mapped_column(Integer, ForeignKey("registered_users.id", ondelete="SET NULL"),
                                             nullable=True)
+
+
+class TaskCounter(Base):
+    """
+    Счётчики задач для трекера: "total", "completed", "created:ГГГГ-ММ", "completed:ГГГГ-ММ".
+    Учитываются только неудалённые задачи. Обновляются в одной транзакции с изменением задачи.
+    """
+    __tablename__ = 'task_counters'
+
+    key: Mapped[str] = mapped_column(String(32), primary_key=True)
+    value: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
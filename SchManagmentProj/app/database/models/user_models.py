@@ -1,6 +1,8 @@
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy import BigInteger, String, Integer, Boolean, Column, DateTime, ForeignKey
 from enum import Enum as PyEnum
+from dataclasses import dataclass
+from typing import Optional
 from sqlalchemy import Enum as SQLEnum
 from app.database.engine_base import Base
 
@@ -36,6 +38,8 @@ class User(Base):
     user_desc: Mapped[str] = mapped_column(String(255), nullable=True)
     registered_at: Mapped[DateTime] = mapped_column(DateTime, nullable=False)
     is_banned: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    # Когда доставка пользователю упала с ошибкой "бот заблокирован"/"чат не найден"
+    unreachable_at: Mapped[DateTime] = mapped_column(DateTime, nullable=True, index=True)
     full_name: Mapped[str] = mapped_column(String(64), nullable=True)
     group_id: Mapped[int] = mapped_column(Integer, ForeignKey("group_info.id", ondelete="SET NULL"), nullable=True)
 
@@ -43,3 +47,28 @@ class User(Base):
     deleted_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=True)
     deleted_by: Mapped[int] = mapped_column(Integer, ForeignKey("registered_users.id", ondelete="SET NULL"),
                                             nullable=True)
+
+
+@dataclass(frozen=True, slots=True)
+class UserIdentity:
+    """
+    Лёгкий снимок пользователя: кэшируется и передаётся в хендлеры как `user`.
+    Только то, что нужно для проверки доступа, — данные профиля читаются из базы там, где они нужны.
+    """
+    id: int
+    tg_id: int
+    role: UserRole
+    manager_role: Optional[ManagementType]
+    is_banned: bool
+    is_unreachable: bool = False
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserIdentity":
+        return cls(
+            id=user.id,
+            tg_id=user.tg_id,
+            role=user.role,
+            manager_role=user.manager_role,
+            is_banned=bool(user.is_banned),
+            is_unreachable=user.unreachable_at is not None,
+        )
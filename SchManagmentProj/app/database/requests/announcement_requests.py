@@ -0,0 +1,84 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, update, insert, or_
+from app.database.engine_base import read_session, write_session
+from app.database.models.announcement_models import (
+    AnnouncementJob, AnnouncementDelivery, AnnouncementStatus, DeliveryStatus
+)
+
+
+async def create_announcement_job(data: dict) -> AnnouncementJob:
+    async with write_session() as session:
+        job = AnnouncementJob(**data)
+        session.add(job)
+        await session.commit()
+        await session.refresh(job)
+        return job
+
+
+async def get_due_announcement_jobs(now: datetime) -> List[AnnouncementJob]:
+    # Незавершённые задания (в т.ч. прерванные перезапуском) и наступившие отложенные
+    async with read_session() as session:
+        result = await session.execute(
+            select(AnnouncementJob)
+            .filter(AnnouncementJob.status.in_([AnnouncementStatus.pending, AnnouncementStatus.running]),
+                    or_(AnnouncementJob.send_at.is_(None), AnnouncementJob.send_at <= now))
+            .order_by(AnnouncementJob.id)
+        )
+        return result.scalars().all()
+
+
+async def update_announcement_job(job_id: int, values: dict) -> None:
+    async with write_session() as session:
+        await session.execute(update(AnnouncementJob).where(AnnouncementJob.id == job_id).values(**values))
+        await session.commit()
+
+
+async def record_deliveries(job_id: int, results: List[Tuple[int, Optional[str]]]) -> Tuple[int, int]:
+    """
+    Пакетно записывает результаты доставки и обновляет счётчики задания в одной транзакции.
+    Уже записанные получатели (повторная отправка после возобновления) не учитываются.
+    Возвращает (отправлено, не доставлено) по действительно добавленным записям.
+    """
+    if not results:
+        return 0, 0
+    now = datetime.now()
+    rows = [
+        {
+            "job_id": job_id,
+            "tg_id": tg_id,
+            "status": DeliveryStatus.sent if error is None else DeliveryStatus.failed,
+            "error": error[:255] if error else None,
+            "delivered_at": now,
+        }
+        for tg_id, error in results
+    ]
+    async with write_session() as session:
+        # RETURNING отдаёт только вставленные строки, пропущенные OR IGNORE в счётчики не попадают
+        inserted = (await session.execute(
+            insert(AnnouncementDelivery).prefix_with("OR IGNORE").returning(AnnouncementDelivery.status), rows
+        )).scalars().all()
+        failed = sum(1 for status in inserted if status == DeliveryStatus.failed)
+        sent = len(inserted) - failed
+        if inserted:
+            await session.execute(
+                update(AnnouncementJob)
+                .where(AnnouncementJob.id == job_id)
+                .values(sent_count=AnnouncementJob.sent_count + sent,
+                        failed_count=AnnouncementJob.failed_count + failed)
+            )
+        await session.commit()
+    return sent, failed
+
+
+async def get_failed_deliveries(job_id: int, limit: int = 10) -> List[Tuple[int, str]]:
+    async with read_session() as session:
+        result = await session.execute(
+            select(AnnouncementDelivery.tg_id, AnnouncementDelivery.error)
+            .filter_by(job_id=job_id, status=DeliveryStatus.failed)
+            .order_by(AnnouncementDelivery.id)
+            .limit(limit)
+        )
+        return [tuple(row) for row in result.all()]
+
@@ -2,7 +2,7 @@ from sqlalchemy import select, update, delete
 from app.database.models.code_models import DistributionType, RegistrationCode
 from app.database.models.user_models import UserRole
 from app.database.models.group_models import Group
-from app.database.engine_base import async_session
+from app.database.engine_base import read_session, write_session
 
 
 async def create_code(data: dict):
@@ -23,7 +23,7 @@ async def create_code(data: dict):
         "created_at": data.get("created_at")
     }
 
-    async with async_session() as session:
+    async with write_session() as session:
         new_code = RegistrationCode(**formatted_data)
         session.add(new_code)
         await session.flush()
@@ -70,7 +70,7 @@ async def create_code(data: dict):
 
 
 async def check_code_exist(code: str) -> bool:
-    async with async_session() as session:
+    async with read_session() as session:
         result = await session.execute(
             select(RegistrationCode).filter_by(code=code)
         )
@@ -78,7 +78,7 @@ async def check_code_exist(code: str) -> bool:
 
 
 async def get_registration_code(code: str) -> RegistrationCode:
-    async with async_session() as session:
+    async with read_session() as session:
         result = await session.execute(
             select(RegistrationCode).filter_by(code=code)
         )
@@ -1,7 +1,68 @@
 from datetime import datetime, date, time, timedelta
+from typing import Optional, Tuple
 from sqlalchemy import select
-from app.database.models.event_models import Event
-from app.database.engine_base import async_session
+from app.database.models.event_models import Event, WeekSchedule
+from app.database.engine_base import read_session, write_session
+from app.utils.cache import TTLCache
+from app.utils.keyboard_cache import bump_version, get_version
+
+# Понедельник недели -> WeekSchedule. Сбрасывается при создании, правке и удалении событий
+week_schedule_cache = TTLCache(256, 600.0)
+# День -> события дня для листания карточек; живёт недолго, сбрасывается так же
+day_events_cache = TTLCache(512, 60.0)
+
+
+def _week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def invalidate_event_weeks(event: Optional[Event]) -> None:
+    """Сбрасывает из кэша все недели и дни, которые задевает событие."""
+    if event is None or event.start_at is None or event.end_at is None:
+        return
+    bump_version("events")
+    week = _week_start(event.start_at.date())
+    last_week = _week_start(event.end_at.date())
+    while week <= last_week:
+        week_schedule_cache.pop(week)
+        week += timedelta(days=7)
+    day = event.start_at.date()
+    while day <= event.end_at.date():
+        day_events_cache.pop(day)
+        day += timedelta(days=1)
+
+
+async def get_day_events(day_date: date) -> Tuple[Event, ...]:
+    """События дня в том же порядке, что и в расписании недели. Если неделя уже в кэше — без запроса."""
+    week = week_schedule_cache.get(_week_start(day_date))
+    if week is not None:
+        return week.days[day_date.weekday()]
+
+    async def load() -> Tuple[Event, ...]:
+        return tuple(await get_events_by_date(day_date))
+
+    return await day_events_cache.get_or_load(day_date, load)
+
+
+async def get_week_schedule(start_of_week: date) -> WeekSchedule:
+    """События недели по дням; одновременные промахи по одной неделе делают один запрос."""
+    async def load() -> WeekSchedule:
+        # Версия до запроса: если события изменятся во время загрузки, клавиатура не попадёт под новую версию
+        version = get_version("events")
+        start_dt = datetime.combine(start_of_week, time.min)
+        end_dt = datetime.combine(start_of_week + timedelta(days=6), time.max)
+        events = await get_events_in_range(start_dt, end_dt)
+
+        # Раскладываем за один проход: каждое событие попадает во все дни недели, которые оно занимает
+        days = [[] for _ in range(7)]
+        for event in events:
+            first = max((event.start_at.date() - start_of_week).days, 0)
+            last = min((event.end_at.date() - start_of_week).days, 6)
+            for day_num in range(first, last + 1):
+                days[day_num].append(event)
+        return WeekSchedule(start=start_of_week, days=tuple(tuple(day) for day in days), version=version)
+
+    return await week_schedule_cache.get_or_load(start_of_week, load)
 
 
 async def create_event(data: dict):
@@ -15,16 +76,17 @@ async def create_event(data: dict):
         "image_storage_key": data.get("image_storage_key"),  # <- сохранение ключа фото
     }
 
-    async with async_session() as session:
+    async with write_session() as session:
         new_event = Event(**formatted_data)
         session.add(new_event)
         await session.commit()
         await session.refresh(new_event)
+        invalidate_event_weeks(new_event)
         return new_event
 
 
 async def get_event_by_name(event_name: str) -> Event:
-    async with async_session() as session:
+    async with read_session() as session:
         result = await session.execute(
             select(Event).filter_by(title=event_name, is_deleted=False)
         )
@@ -34,21 +96,23 @@ async def get_event_by_name(event_name: str) -> Event:
 async def get_events_by_date(day_date: date):
     start = datetime.combine(day_date, time.min)
     end = start + timedelta(days=1)
-    async with async_session() as session:
+    async with read_session() as session:
         result = await session.execute(
             # ищем события, которые пересекают этот день:
             # start_at < end_of_day AND end_at >= start_of_day
             select(Event).filter(Event.start_at < end, Event.end_at >= start, Event.is_deleted == False)
+            .order_by(Event.start_at, Event.id)
         )
         return result.scalars().all()
 
 
 async def get_events_in_range(start_dt: datetime, end_dt: datetime):
-    async with async_session() as session:
+    async with read_session() as session:
         result = await session.execute(
             # ищем события, которые пересекают диапазон [start_dt, end_dt]:
             # start_at < end_dt AND end_at >= start_dt
             select(Event).filter(Event.start_at < end_dt, Event.end_at >= start_dt, Event.is_deleted == False)
+            .order_by(Event.start_at, Event.id)
         )
         return result.scalars().all()
 
@@ -56,7 +120,7 @@ async def get_events_in_range(start_dt: datetime, end_dt: datetime):
 async def soft_delete_event(event_id: int, deleted_by: int, deleted_at: datetime = None):
     if deleted_at is None:
         deleted_at = datetime.now()
-    async with async_session() as session:
+    async with write_session() as session:
         event = await session.get(Event, event_id)
         if not event:
             return None
@@ -66,49 +130,30 @@ async def soft_delete_event(event_id: int, deleted_by: int, deleted_at: datetime
         session.add(event)
         await session.commit()
         await session.refresh(event)
+        invalidate_event_weeks(event)
         return event
 
 
 async def get_event_by_id(event_id: int):
-    async with async_session() as session:
+    async with read_session() as session:
         result = await session.execute(
             select(Event).filter_by(id=event_id, is_deleted=False)
         )
         return result.scalar_one_or_none()
 
 
-async def get_event_data(event_id: int) -> dict:
-    async with async_session() as session:
-        result = await session.execute(
-            select(Event).filter_by(id=event_id, is_deleted=False)
-        )
-        event = result.scalar_one_or_none()
-
-        return {
-            "id": event.id,
-            "title": event.title,
-            "description": event.description,
-            "created_by": event.created_by,
-            "created_at": event.created_at.isoformat() if isinstance(event.created_at, datetime) else None,
-            "is_active": event.is_active,
-            "start_at": event.start_at.isoformat() if isinstance(event.start_at, datetime) else None,
-            "end_at": event.end_at.isoformat() if isinstance(event.end_at, datetime) else None,
-            "image_storage_key": event.image_storage_key,
-            "is_deleted": event.is_deleted,
-            "deleted_at": event.deleted_at.isoformat() if event.deleted_at else None,
-            "deleted_by": event.deleted_by,
-        }
-
-
 async def update_event(event_id: int, compilation: dict) -> Event | None:
-    async with async_session() as session:
+    async with write_session() as session:
         event = await session.get(Event, event_id)
         if not event:
             return None
+        # Событие могло переехать на другие недели — сбрасываем и старые, и новые
+        invalidate_event_weeks(event)
         for key, value in compilation.items():
             if hasattr(event, key):
                 setattr(event, key, value)
         session.add(event)
         await session.commit()
         await session.refresh(event)
+        invalidate_event_weeks(event)
         return event
@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.sqlite import insert
+from app.database.engine_base import read_session, write_session
+from app.database.models.fsm_models import FSMRecord
+
+
+async def get_fsm_record(key: str) -> Optional[Tuple[Optional[str], str, datetime]]:
+    async with read_session() as session:
+        result = await session.execute(
+            select(FSMRecord.state, FSMRecord.data, FSMRecord.updated_at).where(FSMRecord.key == key)
+        )
+        row = result.first()
+        return tuple(row) if row else None
+
+
+async def save_fsm_record(key: str, state: Optional[str], data: str, updated_at: datetime) -> None:
+    async with write_session() as session:
+        stmt = insert(FSMRecord).values(key=key, state=state, data=data, updated_at=updated_at)
+        await session.execute(stmt.on_conflict_do_update(
+            index_elements=[FSMRecord.key],
+            set_={"state": stmt.excluded.state, "data": stmt.excluded.data, "updated_at": stmt.excluded.updated_at}
+        ))
+        await session.commit()
+
+
+async def delete_fsm_record(key: str) -> None:
+    async with write_session() as session:
+        await session.execute(delete(FSMRecord).where(FSMRecord.key == key))
+        await session.commit()
+
+
+async def delete_expired_fsm_records(before: datetime) -> int:
+    async with write_session() as session:
+        result = await session.execute(delete(FSMRecord).where(FSMRecord.updated_at < before))
+        await session.commit()
+        return result.rowcount
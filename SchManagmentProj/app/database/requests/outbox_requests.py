@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from aiogram.types import InlineKeyboardMarkup
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.engine_base import read_session, write_session
+from app.database.models.outbox_models import OutboxNotification, OutboxStatus
+
+
+@dataclass(frozen=True, slots=True)
+class OutboxMessage:
+    """Уведомление для outbox: кому (id в registered_users), текст и inline-клавиатура."""
+    user_id: int
+    text: str
+    reply_markup: Optional[InlineKeyboardMarkup] = None
+
+
+def add_to_outbox(session: AsyncSession, messages: List[OutboxMessage]) -> None:
+    """Добавляет уведомления в сессию вызывающего — они сохранятся в той же транзакции, что и изменение."""
+    now = datetime.now()
+    session.add_all(OutboxNotification(
+        user_id=message.user_id,
+        text=message.text,
+        reply_markup=message.reply_markup.model_dump_json(exclude_none=True) if message.reply_markup else None,
+        status=OutboxStatus.pending,
+        created_at=now,
+        next_attempt_at=now,
+        attempts=0,
+    ) for message in messages)
+
+
+async def get_due_outbox(now: datetime, limit: int) -> List[OutboxNotification]:
+    async with read_session() as session:
+        result = await session.execute(
+            select(OutboxNotification)
+            .where(OutboxNotification.status == OutboxStatus.pending, OutboxNotification.next_attempt_at <= now)
+            .order_by(OutboxNotification.next_attempt_at, OutboxNotification.id)
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+
+async def get_next_outbox_attempt() -> Optional[datetime]:
+    async with read_session() as session:
+        return await session.scalar(
+            select(func.min(OutboxNotification.next_attempt_at))
+            .where(OutboxNotification.status == OutboxStatus.pending)
+        )
+
+
+async def complete_outbox(sent_ids: List[int], retries: List[tuple], failures: List[tuple]) -> None:
+    """
+    Итог пачки одной транзакцией: отправленные удаляются,
+    retries — (id, ошибка, время следующей попытки), failures — (id, ошибка) больше не повторяются.
+    """
+    if not (sent_ids or retries or failures):
+        return
+    async with write_session() as session:
+        if sent_ids:
+            await session.execute(delete(OutboxNotification).where(OutboxNotification.id.in_(sent_ids)))
+        for outbox_id, error, next_attempt_at in retries:
+            await session.execute(
+                update(OutboxNotification).where(OutboxNotification.id == outbox_id)
+                .values(attempts=OutboxNotification.attempts + 1, last_error=error[:255],
+                        next_attempt_at=next_attempt_at)
+            )
+        for outbox_id, error in failures:
+            await session.execute(
+                update(OutboxNotification).where(OutboxNotification.id == outbox_id)
+                .values(attempts=OutboxNotification.attempts + 1, last_error=error[:255],
+                        status=OutboxStatus.failed)
+            )
+        await session.commit()
@@ -1,64 +1,182 @@
 from datetime import datetime
-from sqlalchemy import select, func
-from app.database.engine_base import async_session
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy import select, func, delete, case, insert as sa_insert
+from sqlalchemy.dialects.sqlite import insert
+from app.database.engine_base import read_session, write_session
 from app.database.models.task_models import *
+from app.database.requests.outbox_requests import OutboxMessage, add_to_outbox
 from app.database.requests.user_requests import get_user_by_tg_id
+from app.utils.cache import TTLCache
+from app.utils.datetime_utils import local_now
+
+# Задачи закрытых месяцев для отчёта: (user_id, год, месяц) -> строки.
+# Завершить задачу задним числом нельзя, поэтому запись меняется только при правке или удалении задачи
+month_report_cache = TTLCache(5000, 6 * 3600.0)
+
+
+def _month_bounds(year: int, month: int) -> Tuple[datetime, datetime]:
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
+
+
+def _invalidate_month_report(task: Optional[Task]) -> None:
+    if task is not None and task.completed_at is not None:
+        month_report_cache.pop((task.created_for, task.completed_at.year, task.completed_at.month))
+
+
+# Уведомления об изменении задачи: по задаче после изменения строит сообщения для outbox.
+# Они сохраняются в той же транзакции, что и сама задача, и отправляются фоновым воркером
+TaskNotify = Callable[[Task], List[OutboxMessage]]
+
+
+# Служебный ключ: счётчики посчитаны целиком и дальше поддерживаются инкрементально
+COUNTERS_READY_KEY = "ready"
+
+
+def _counter_keys(task: Task) -> List[str]:
+    """Счётчики, в которые входит задача в текущем состоянии."""
+    if task.is_deleted:
+        return []
+    keys = ["total"]
+    if task.created_at is not None:
+        keys.append(f"created:{task.created_at:%Y-%m}")
+    if task.is_completed:
+        keys.append("completed")
+        if task.completed_at is not None:
+            keys.append(f"completed:{task.completed_at:%Y-%m}")
+    return keys
+
+
+async def _apply_counter_changes(session, before: List[str], after: List[str]) -> None:
+    deltas = {}
+    for key in before:
+        deltas[key] = deltas.get(key, 0) - 1
+    for key in after:
+        deltas[key] = deltas.get(key, 0) + 1
+    rows = [{"key": key, "value": delta} for key, delta in deltas.items() if delta]
+    if not rows:
+        return
+    stmt = insert(TaskCounter).values(rows)
+    await session.execute(stmt.on_conflict_do_update(
+        index_elements=[TaskCounter.key], set_={"value": TaskCounter.value + stmt.excluded.value}
+    ))
+
+
+async def get_user_month_report(user_id: int, year: int, month: int) -> List:
+    """Завершённые задачи пользователя за месяц, отобранные по completed_at на стороне БД."""
+    now = local_now()
+    closed = (year, month) < (now.year, now.month)
+    key = (user_id, year, month)
+    if closed:
+        rows = month_report_cache.get(key)
+        if rows is not None:
+            return rows
+
+    start, end = _month_bounds(year, month)
+    async with read_session() as session:
+        result = await session.execute(
+            select(Task.title, Task.description, Task.complete_desc, Task.created_at, Task.completed_at, Task.end_at)
+            .where(Task.created_for == user_id, Task.is_completed.is_(True), Task.is_deleted.is_(False),
+                   Task.completed_at >= start, Task.completed_at < end)
+            .order_by(Task.completed_at, Task.id)
+        )
+        rows = result.all()
+    if closed:
+        month_report_cache.set(key, rows)
+    return rows
 
 
 async def get_task_by_title(title: str):
-    async with async_session() as session:
+    async with read_session() as session:
         result = await session.execute(
             select(Task).filter_by(title=title, is_deleted=False))
         return result.scalar_one_or_none()
 
 
-async def create_task(compilation: dict):
-    async with async_session() as session:
+async def create_task(compilation: dict, notify: Optional[TaskNotify] = None):
+    async with write_session() as session:
         task = Task(**compilation)
         session.add(task)
+        await session.flush()
+        await _apply_counter_changes(session, [], _counter_keys(task))
+        if notify is not None:
+            add_to_outbox(session, notify(task))
         await session.commit()
         await session.refresh(task)
         return task
 
 
-async def get_user_active_tasks(user_id: int):
-    async with async_session() as session:
-        result = await session.execute(
-            select(Task).filter_by(created_for=user_id, is_completed=False, is_deleted=False))
-        return result.scalars().all()
+TASK_PAGE_SIZE = 5
 
 
-async def get_user_completed_tasks(user_id: int):
-    async with async_session() as session:
-        result = await session.execute(
-            select(Task).filter_by(created_for=user_id, is_completed=True, is_deleted=False))
-        return result.scalars().all()
+async def get_user_tasks_page(user_id: int, completed: bool, page: int = 1, cursor: Optional[str] = None,
+                              page_size: int = TASK_PAGE_SIZE) -> Tuple[List, int, int]:
+    """
+    Страница задач пользователя (только id и title) по возрастанию id.
+    cursor: None — первая страница, "a<id>" — задачи после id, "b<id>" — до id, "e" — последняя страница.
+    Возвращает (задачи, номер страницы, всего задач).
+    """
+    filters = (Task.created_for == user_id, Task.is_completed.is_(completed), Task.is_deleted.is_(False))
+    async with read_session() as session:
+        total = await session.scalar(select(func.count(Task.id)).where(*filters))
+        total_pages = max((total + page_size - 1) // page_size, 1)
+        query = select(Task.id, Task.title).where(*filters)
+
+        rows = []
+        if cursor and cursor[0] in "ab" and cursor[1:].isdigit():
+            anchor = int(cursor[1:])
+            if cursor[0] == "a":
+                result = await session.execute(query.where(Task.id > anchor).order_by(Task.id).limit(page_size))
+                rows = result.all()
+            else:
+                result = await session.execute(query.where(Task.id < anchor).order_by(Task.id.desc()).limit(page_size))
+                rows = result.all()[::-1]
+            page = min(max(page, 1), total_pages)
+        elif cursor == "e" and total:
+            # На последней странице остаток, а не полный page_size
+            result = await session.execute(query.order_by(Task.id.desc()).limit(total - (total_pages - 1) * page_size))
+            rows = result.all()[::-1]
+            page = total_pages
+
+        if not rows:
+            # Первая страница — и запасной вариант, если задачи вокруг курсора удалили
+            result = await session.execute(query.order_by(Task.id).limit(page_size))
+            rows = result.all()
+            page = 1
+        return rows, page, total
 
 
 async def get_task_by_id(task_id: int) -> Task | None:
-    async with async_session() as session:
+    async with read_session() as session:
         result = await session.execute(
             select(Task).filter_by(id=task_id, is_deleted=False))
         return result.scalar_one_or_none()
 
 
-async def set_task_completed(task_id: int) -> Task | None:
-    async with async_session() as session:
+async def set_task_completed(task_id: int, notify: Optional[TaskNotify] = None) -> Task | None:
+    async with write_session() as session:
         result = await session.execute(
             select(Task).filter_by(id=task_id, is_deleted=False))
         task = result.scalar_one_or_none()
         if not task:
             return None
+        before = _counter_keys(task)
         task.is_completed = True
-        task.completed_at = datetime.now()
+        # Время в БД — локальное без tzinfo, как created_at из local_now(); по нему же считаются месяцы счётчиков
+        task.completed_at = local_now().replace(tzinfo=None)
         session.add(task)
+        await _apply_counter_changes(session, before, _counter_keys(task))
+        if notify is not None:
+            add_to_outbox(session, notify(task))
         await session.commit()
         await session.refresh(task)
+        _invalidate_month_report(task)
         return task
 
 
 async def update_task_complete_desc(task_id: int, description: str) -> Task | None:
-    async with async_session() as session:
+    async with write_session() as session:
         result = await session.execute(
             select(Task).filter_by(id=task_id, is_deleted=False))
         task = result.scalar_one_or_none()
@@ -69,74 +187,126 @@ async def update_task_complete_desc(task_id: int, description: str) -> Task | No
         session.add(task)
         await session.commit()
         await session.refresh(task)
+        _invalidate_month_report(task)
         return task
 
 
 async def soft_delete_task(task_id: int, deleted_by: int, deleted_at: datetime = None):
     if deleted_at is None:
         deleted_at = datetime.now()
-    async with async_session() as session:
+    async with write_session() as session:
         task = await session.get(Task, task_id)
         if not task:
             return None
+        before = _counter_keys(task)
         task.is_deleted = True
         task.deleted_by = deleted_by
         task.deleted_at = deleted_at
         session.add(task)
+        await _apply_counter_changes(session, before, _counter_keys(task))
         await session.commit()
         await session.refresh(task)
+        _invalidate_month_report(task)
         return task
 
 
-async def update_task(task_id: int, compilation: dict) -> Task | None:
-    async with async_session() as session:
+async def update_task(task_id: int, compilation: dict, notify: Optional[TaskNotify] = None) -> Task | None:
+    async with write_session() as session:
         task = await session.get(Task, task_id)
         if not task:
             return None
+        # Отчёт мог содержать задачу до правки
+        _invalidate_month_report(task)
+        before = _counter_keys(task)
         # Обновляем только переданные поля
         for key, value in compilation.items():
             if hasattr(task, key):
                 setattr(task, key, value)
         session.add(task)
+        await _apply_counter_changes(session, before, _counter_keys(task))
+        if notify is not None:
+            add_to_outbox(session, notify(task))
         await session.commit()
         await session.refresh(task)
+        _invalidate_month_report(task)
         return task
 
 
-async def get_tasks_tracker_stats():
-    now = datetime.now()
-    month_start = datetime(now.year, now.month, 1)
+def _month_key(prefix: str) -> str:
+    # Тот же пояс, что у created_at/completed_at: иначе в начале месяца задачи попадают в ещё не читаемый ключ
+    return f"{prefix}:{local_now():%Y-%m}"
 
-    async with async_session() as session:
-        total_tasks = await session.scalar(
-            select(func.count(Task.id)).where(Task.is_deleted.is_(False))
-        )
 
-        completed_tasks = await session.scalar(
-            select(func.count(Task.id)).where(
-                Task.is_deleted.is_(False),
-                Task.is_completed.is_(True)
-            )
-        )
+async def count_tasks_tracker_stats() -> dict:
+    """Статистика трекера одним проходом по task_info — без счётчиков. Сверка для /recount_tasks."""
+    now = local_now()
+    # Как и в счётчиках, месяц — календарный: даты следующих месяцев в него не входят
+    month_start, month_end = _month_bounds(now.year, now.month)
 
-        month_tasks = await session.scalar(
-            select(func.count(Task.id)).where(
-                Task.is_deleted.is_(False),
-                Task.created_at >= month_start
-            )
+    async with read_session() as session:
+        result = await session.execute(
+            select(
+                func.count(Task.id),
+                func.count(case((Task.is_completed.is_(True), 1))),
+                func.count(case(((Task.created_at >= month_start) & (Task.created_at < month_end), 1))),
+                func.count(case((Task.is_completed.is_(True) & (Task.completed_at >= month_start)
+                                 & (Task.completed_at < month_end), 1))),
+            ).where(Task.is_deleted.is_(False))
         )
+        total, completed, month_total, month_completed = result.one()
+        return {
+            "total": total,
+            "completed": completed,
+            "month_total": month_total,
+            "month_completed": month_completed,
+        }
+
+
+async def recalculate_task_counters() -> dict:
+    """Пересчитывает таблицу счётчиков с нуля. Возвращает статистику трекера после пересчёта."""
+    created_month = func.strftime("%Y-%m", Task.created_at)
+    completed_month = func.strftime("%Y-%m", Task.completed_at)
 
-        month_completed_tasks = await session.scalar(
-            select(func.count(Task.id)).where(
-                Task.is_deleted.is_(False),
-                Task.is_completed.is_(True),
-                Task.completed_at >= month_start
-            )
+    async with write_session() as session:
+        totals = (await session.execute(
+            select(func.count(Task.id), func.count(case((Task.is_completed.is_(True), 1))))
+            .where(Task.is_deleted.is_(False))
+        )).one()
+        created = await session.execute(
+            select(created_month, func.count(Task.id))
+            .where(Task.is_deleted.is_(False), Task.created_at.is_not(None))
+            .group_by(created_month)
+        )
+        completed = await session.execute(
+            select(completed_month, func.count(Task.id))
+            .where(Task.is_deleted.is_(False), Task.is_completed.is_(True), Task.completed_at.is_not(None))
+            .group_by(completed_month)
         )
 
-        return {
-            "total": total_tasks or 0,
-            "completed": completed_tasks or 0,
-            "month_total": month_tasks or 0,
-            "month_completed": month_completed_tasks or 0,
-        }
+        rows = [{"key": "total", "value": totals[0]}, {"key": "completed", "value": totals[1]},
+                {"key": COUNTERS_READY_KEY, "value": 1}]
+        rows += [{"key": f"created:{month}", "value": count} for month, count in created.all()]
+        rows += [{"key": f"completed:{month}", "value": count} for month, count in completed.all()]
+
+        await session.execute(delete(TaskCounter))
+        await session.execute(sa_insert(TaskCounter), rows)
+        await session.commit()
+    return await get_tasks_tracker_stats()
+
+
+async def get_tasks_tracker_stats():
+    keys = ["total", "completed", _month_key("created"), _month_key("completed"), COUNTERS_READY_KEY]
+    async with read_session() as session:
+        result = await session.execute(select(TaskCounter.key, TaskCounter.value).where(TaskCounter.key.in_(keys)))
+        counters = dict(result.all())
+
+    if COUNTERS_READY_KEY not in counters:
+        # Счётчики ещё не заполнялись (первый запуск на существующей базе)
+        return await recalculate_task_counters()
+
+    return {
+        "total": counters.get("total", 0),
+        "completed": counters.get("completed", 0),
+        "month_total": counters.get(keys[2], 0),
+        "month_completed": counters.get(keys[3], 0),
+    }
@@ -1,15 +1,29 @@
-from typing import Optional
+from typing import Optional, AsyncIterator
 
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, update, delete, exists, func
 from datetime import datetime
+from app.database.models.announcement_models import AnnouncementDelivery
 from app.database.models.code_models import RegistrationCode, DistributionType
 from app.database.models.group_models import Group
-from app.database.models.user_models import User, UserRole, ManagementType
-from app.database.engine_base import async_session
+from app.database.models.user_models import User, UserRole, ManagementType, UserIdentity
+from app.database.engine_base import read_session, write_session
+from app.utils.cache import TTLCache, MISSING
+
+USER_CACHE_SIZE = 10_000
+USER_CACHE_TTL = 60.0
+# Сколько id передавать в один IN (...): у SQLite ограничено число параметров запроса
+IN_CHUNK_SIZE = 500
+
+# tg_id -> UserIdentity (или None для незарегистрированных)
+user_identity_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+
+def invalidate_user_identity(tg_id: int) -> None:
+    user_identity_cache.pop(tg_id)
 
 
 async def create_role_user(tg_id: int, code_object: RegistrationCode):
-    async with async_session() as session:
+    async with write_session() as session:
         # Проверяем, существует ли пользователь
         result = await session.execute(select(User).filter_by(tg_id=tg_id))
         user = result.scalar_one_or_none()
@@ -36,6 +50,7 @@ async def create_role_user(tg_id: int, code_object: RegistrationCode):
             await session.delete(code_object)
 
             await session.commit()
+            invalidate_user_identity(tg_id)
             return True
 
         # Школьник
@@ -79,11 +94,12 @@ async def create_role_user(tg_id: int, code_object: RegistrationCode):
                         .values(uses_count=code_object.uses_count + 1)
                     )
                 await session.commit()
+                invalidate_user_identity(tg_id)
                 return True
 
 
 async def create_user(tg_id: int):
-    async with async_session() as session:
+    async with write_session() as session:
         # Проверяем, существует ли пользователь
         result = await session.execute(select(User).filter_by(tg_id=tg_id))
         user = result.scalar_one_or_none()
@@ -96,28 +112,40 @@ async def create_user(tg_id: int):
         )
         session.add(new_user_data)
         await session.commit()
+    invalidate_user_identity(tg_id)
 
 
 async def get_existing_managers():
-    async with async_session() as session:
+    async with read_session() as session:
         result = await session.execute(select(User).filter_by(role=UserRole.management))
         return result.scalars().all()
 
 
 async def get_president():
-    async with async_session() as session:
+    async with read_session() as session:
         result = await session.execute(select(User).filter_by(manager_role=ManagementType.president))
         return result.scalar_one_or_none()
 
 
 async def get_user_by_tg_id(tg_id: int) -> Optional[User]:
-    async with async_session() as session:
+    async with read_session() as session:
         result = await session.execute(select(User).filter_by(tg_id=tg_id))
         return result.scalar_one_or_none()
 
 
+async def get_user_identity(tg_id: int) -> Optional[UserIdentity]:
+    cached = user_identity_cache.get(tg_id, MISSING)
+    if cached is not MISSING:
+        return cached
+
+    user = await get_user_by_tg_id(tg_id)
+    identity = UserIdentity.from_user(user) if user else None
+    user_identity_cache.set(tg_id, identity)
+    return identity
+
+
 async def get_user_data(user_id: int) -> dict:
-    async with async_session() as session:
+    async with read_session() as session:
         result = await session.execute(select(User).filter_by(id=user_id))
         user = result.scalar_one_or_none()
 
@@ -130,6 +158,7 @@ async def get_user_data(user_id: int) -> dict:
             "registered_at": user.registered_at.isoformat() if isinstance(user.registered_at,
                                                                           datetime) else user.registered_at,
             "is_banned": user.is_banned,
+            "unreachable_at": user.unreachable_at.isoformat() if user.unreachable_at else None,
             "full_name": user.full_name,
             "group_id": user.group_id,
             "is_deleted": user.is_deleted,
@@ -138,7 +167,78 @@ async def get_user_data(user_id: int) -> dict:
         }
 
 
+async def get_notification_targets(user_ids: list[int]) -> dict:
+    """
+    Данные для доставки уведомлений одним запросом на пачку id: user_id -> строка
+    с полями tg_id, is_banned, is_deleted, unreachable_at. Отсутствующих пользователей в словаре нет.
+    """
+    targets = {}
+    async with read_session() as session:
+        for start in range(0, len(user_ids), IN_CHUNK_SIZE):
+            result = await session.execute(
+                select(User.id, User.tg_id, User.is_banned, User.is_deleted, User.unreachable_at)
+                .where(User.id.in_(user_ids[start:start + IN_CHUNK_SIZE]))
+            )
+            targets.update((row.id, row) for row in result)
+    return targets
+
+
 async def get_users_for_announce() -> list[int]:
-    async with async_session() as session:
-        result = await session.execute(select(User.tg_id).filter_by(is_banned=False, is_deleted=False))
+    async with read_session() as session:
+        result = await session.execute(select(User.tg_id).filter(*_announce_filters()))
         return result.scalars().all()
+
+
+async def mark_users_unreachable(tg_ids: list[int]) -> None:
+    """Отметить пользователей, которым невозможно доставить сообщение (заблокировали бота и т.п.)."""
+    if not tg_ids:
+        return
+    async with write_session() as session:
+        await session.execute(
+            update(User)
+            .where(User.tg_id.in_(tg_ids), User.unreachable_at.is_(None))
+            .values(unreachable_at=datetime.now())
+        )
+        await session.commit()
+    for tg_id in tg_ids:
+        invalidate_user_identity(tg_id)
+
+
+async def mark_user_reachable(tg_id: int) -> None:
+    async with write_session() as session:
+        await session.execute(update(User).where(User.tg_id == tg_id).values(unreachable_at=None))
+        await session.commit()
+    invalidate_user_identity(tg_id)
+
+
+def _announce_filters(job_id: int = None) -> list:
+    filters = [User.is_banned == False, User.is_deleted == False, User.unreachable_at.is_(None)]
+    if job_id is not None:
+        # Исключаем тех, кому это объявление уже доставлялось
+        filters.append(~exists().where(AnnouncementDelivery.job_id == job_id,
+                                       AnnouncementDelivery.tg_id == User.tg_id))
+    return filters
+
+
+async def count_users_for_announce(job_id: int = None) -> int:
+    async with read_session() as session:
+        return await session.scalar(select(func.count(User.id)).filter(*_announce_filters(job_id))) or 0
+
+
+async def iter_users_for_announce(chunk_size: int = 500, job_id: int = None) -> AsyncIterator[int]:
+    """Отдаёт tg_id получателей рассылки порциями, не загружая всю таблицу в память."""
+    last_id = 0
+    while True:
+        async with read_session() as session:
+            result = await session.execute(
+                select(User.id, User.tg_id)
+                .filter(User.id > last_id, *_announce_filters(job_id))
+                .order_by(User.id)
+                .limit(chunk_size)
+            )
+            rows = result.all()
+        if not rows:
+            return
+        for _, tg_id in rows:
+            yield tg_id
+        last_id = rows[-1][0]
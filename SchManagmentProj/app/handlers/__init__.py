@@ -1,9 +1,77 @@
-from aiogram.filters.callback_data import CallbackData
+from datetime import date
+from typing import Optional
 
+from app.utils.callback_codec import CompactCallback
+from app.utils.callback_dispatch import CallbackTable
 
-class ItemCallback(CallbackData, prefix="item"):
-    callback_action: str
-    data: str
+
+# Callback-данные inline-кнопок. Коды короткие и не должны повторяться
+
+class EventList(CompactCallback, code="el"):
+    week: Optional[date]  # понедельник недели, None — текущая неделя
+
+
+class EventInfo(CompactCallback, code="ei"):
+    day: date
+    index: Optional[int]
+
+
+class EventDelete(CompactCallback, code="ed"):
+    event_id: int
+
+
+class EventEdit(CompactCallback, code="ee"):
+    event_id: int
+
+
+class TaskPlaner(CompactCallback, code="tp"):
+    user_id: int
+
+
+class CompletedTasks(CompactCallback, code="tc"):
+    user_id: int
+
+
+class TaskPlanerPage(CompactCallback, code="pp"):
+    user_id: int
+    page: int
+    cursor: Optional[str]  # см. get_user_tasks_page
+
+
+class CompletedTaskPage(CompactCallback, code="cp"):
+    user_id: int
+    page: int
+    cursor: Optional[str]
+
+
+class TaskInfo(CompactCallback, code="ti"):
+    task_id: int
+
+
+class TaskComplete(CompactCallback, code="tf"):
+    task_id: int
+
+
+class TaskDelete(CompactCallback, code="td"):
+    task_id: int
+
+
+class TaskEdit(CompactCallback, code="te"):
+    task_id: int
+
+
+class TaskCreate(CompactCallback, code="tn"):
+    user_id: int
+
+
+class TaskReport(CompactCallback, code="sr"):
+    user_id: Optional[int]  # None — отчёт текущего пользователя
+    year: Optional[int]
+    month: Optional[int]
+
+
+# Callback-хендлеры регистрируются здесь (callbacks.action / callbacks.data), а не в роутерах модулей
+callbacks = CallbackTable()
 
 
 from aiogram import Router
@@ -13,7 +81,7 @@ from .profile_handlers import router as profile_router
 from .code_handlers import router as code_router
 from app.handlers.event.event_handlers import router as event_router
 from app.handlers.event.event_creation_handlers import router as event_creation_router
-from .other_handlers import router as other_router
+from .other_handlers import router as other_router, stale_callback_router
 from .settings_handlers import router as settings_router
 from .announcement_handlers import router as notifications_router
 from app.handlers.task.task_handlers import router as task_router
@@ -30,6 +98,9 @@ mw = RegistrationBarrier(
 router.message.middleware(mw)
 router.callback_query.middleware(mw)
 
+# Таблица проверяется раньше вложенных роутеров: известный callback сразу попадает в свой хендлер
+callbacks.setup(router)
+
 router.include_router(registration_router)
 router.include_router(profile_router)
 router.include_router(code_router)
@@ -41,3 +112,5 @@ router.include_router(notifications_router)
 router.include_router(task_router)
 router.include_router(task_creation_router)
 router.include_router(report_router)
+# Последним: кнопки старого формата и испорченные callback-данные
+router.include_router(stale_callback_router)
@@ -1,15 +1,19 @@
+from datetime import datetime
+
 from aiogram import Router, F
 from aiogram.filters import StateFilter
 from aiogram.types import Message, CallbackQuery, ReplyKeyboardRemove
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-import asyncio
-from aiogram.exceptions import TelegramRetryAfter, TelegramAPIError
 
 from app.keyboards.announcement_keyboards import announcement_menu, announcement_preview_kb
 from app.keyboards.keyboards import cancel_keyboard
-from app.database.requests.user_requests import get_users_for_announce
+from app.database.requests.announcement_requests import create_announcement_job
+from app.handlers import callbacks
 from app.handlers.profile_handlers import cmd_profile
+from app.database.models.user_models import UserIdentity
+from app.utils import try_parse_datetime, local_now, format_dt
+from app.utils.announce_worker import announcement_worker
 
 router = Router()
 
@@ -17,9 +21,10 @@ router = Router()
 class AnnouncementCreation(StatesGroup):
     waiting_for_content = State()
     preview = State()
+    schedule_input = State()
 
 
-@router.callback_query(F.data == "announcement_menu")
+@callbacks.data("announcement_menu")
 async def callback_announcement_menu(callback_query: CallbackQuery):
     if not callback_query.message:
         await callback_query.answer()
@@ -31,7 +36,7 @@ async def callback_announcement_menu(callback_query: CallbackQuery):
     await callback_query.answer()
 
 
-@router.callback_query(F.data == "send_all_announce")
+@callbacks.data("send_all_announce")
 async def callback_send_all_announcement(callback_query: CallbackQuery, state: FSMContext):
     if not callback_query.message:
         await callback_query.answer()
@@ -46,10 +51,10 @@ async def callback_send_all_announcement(callback_query: CallbackQuery, state: F
 
 
 @router.message(StateFilter(AnnouncementCreation), F.text == "❌ Отменить")
-async def cancel_code_creation(message: Message, state: FSMContext):
+async def cancel_code_creation(message: Message, state: FSMContext, user: UserIdentity):
     await state.clear()
     await message.answer("Создание объявления отменено.", reply_markup=ReplyKeyboardRemove())
-    await cmd_profile(message)
+    await cmd_profile(message, user)
 
 
 @router.message(StateFilter(AnnouncementCreation.waiting_for_content))
@@ -85,71 +90,60 @@ async def announce_edit(message: Message, state: FSMContext):
 
 
 @router.message(StateFilter(AnnouncementCreation.preview), F.text == "✅ Отправить")
-async def announce_send(message: Message, state: FSMContext):
+async def announce_send(message: Message, state: FSMContext, user: UserIdentity):
+    if await enqueue_announcement(message, state, user):
+        await message.answer("Рассылка поставлена в очередь. Прогресс будет отображаться в отдельном сообщении.",
+                             reply_markup=ReplyKeyboardRemove())
+
+
+@router.message(StateFilter(AnnouncementCreation.preview), F.text == "🕑 Запланировать")
+async def announce_schedule(message: Message, state: FSMContext):
+    await state.set_state(AnnouncementCreation.schedule_input)
+    example_date = format_dt(local_now(), "%d.%m.%Y %H:%M")
+    await message.answer(
+        f"Введите дату и время отправки в формате:\n"
+        f"\"дд.мм.гггг ЧЧ:ММ\" (Пример: {example_date}):",
+        reply_markup=cancel_keyboard
+    )
+
+
+@router.message(StateFilter(AnnouncementCreation.schedule_input))
+async def announce_schedule_input(message: Message, state: FSMContext, user: UserIdentity):
+    send_at = try_parse_datetime((message.text or "").strip())
+    if not send_at:
+        await message.answer("Не удалось распознать дату. Используйте формат 'дд.мм.гггг ЧЧ:ММ'.\n"
+                             "Попробуйте ещё раз:")
+        return
+    if send_at <= local_now().replace(tzinfo=None):
+        await message.answer("Время отправки должно быть в будущем. Введите корректную дату и время:")
+        return
+
+    if await enqueue_announcement(message, state, user, send_at=send_at):
+        await message.answer(f"Объявление запланировано на {format_dt(send_at)}.",
+                             reply_markup=ReplyKeyboardRemove())
+
+
+async def enqueue_announcement(message: Message, state: FSMContext, user: UserIdentity,
+                               send_at: datetime = None) -> bool:
     data = await state.get_data()
     from_chat_id = data.get("announcement_from_chat_id")
     message_id = data.get("announcement_message_id")
+    await state.clear()
 
     if not from_chat_id or not message_id:
         await message.answer("Нет данных для отправки объявления. Попробуйте заново.",
-                                            reply_markup=ReplyKeyboardRemove())
-        await state.clear()
-        return
-
-    # Получаем список всех пользователей
-    user_ids = await get_users_for_announce()
-    if not user_ids:
-        await message.answer(
-            "В базе нет пользователей для рассылки. (как вообще возможно получить эту ошибку лол)",
-            reply_markup=ReplyKeyboardRemove())
-        await state.clear()
-        return
-
-    bot = message.bot
-    sent_count = 0
-    failed = []
-
-    # Рассылка с простой обработкой RetryAfter
-    for tg_id in user_ids:
-        try:
-            # Копируем сообщение (сохраняет тип/медиа/подписи)
-            await bot.copy_message(chat_id=tg_id, from_chat_id=from_chat_id, message_id=message_id)
-            sent_count += 1
-        except TelegramRetryAfter as e:
-            # Если получили лимит, ждём и повторяем попытку
-            wait_for = getattr(e, "retry_after", None) or 1
-            await asyncio.sleep(wait_for)
-            try:
-                await bot.copy_message(chat_id=tg_id, from_chat_id=from_chat_id, message_id=message_id)
-                sent_count += 1
-            except Exception as ex:
-                failed.append((tg_id, str(ex)))
-        except TelegramAPIError as e:
-            # Любая ошибка API — сохраняем для отчёта
-            failed.append((tg_id, str(e)))
-        except Exception as e:
-            failed.append((tg_id, str(e)))
-
-        # Небольшая пауза, чтобы снизить риск достижения лимитов
-        await asyncio.sleep(0.05)
-
-    # Отчёт автору
-    total = len(user_ids)
-    failed_count = len(failed)
-    success_count = sent_count
-
-    report_lines = [
-        f"Рассылка завершена.",
-        f"Всего пользователей в базе: {total}",
-        f"Отправлено успешно: {success_count}",
-        f"Не доставлено: {failed_count}",
-    ]
-    if failed_count > 0:
-        # Покажем первые 10 ошибок для удобства
-        preview_failures = failed[:10]
-        report_lines.append("Примеры ошибок (tg_id: ошибка):")
-        for uid, err in preview_failures:
-            report_lines.append(f"{uid}: {err}")
-
-    await message.answer("\n".join(report_lines), reply_markup=ReplyKeyboardRemove())
-    await state.clear()
+                             reply_markup=ReplyKeyboardRemove())
+        return False
+
+    # Рассылка сохраняется в БД и выполняется фоновым воркером — хендлер сразу освобождается
+    await create_announcement_job({
+        "created_by": user.id,
+        "created_at": local_now().replace(tzinfo=None, microsecond=0),
+        "author_chat_id": message.chat.id,
+        "from_chat_id": from_chat_id,
+        "message_id": message_id,
+        "target": "all",
+        "send_at": send_at,
+    })
+    announcement_worker.notify()
+    return True
@@ -9,9 +9,10 @@ from aiogram.fsm.state import State, StatesGroup
 from app.keyboards.event_keyboards import *
 from app.keyboards.keyboards import cancel_keyboard, build_cancel_keyboard
 
+from app.handlers import callbacks
 from app.handlers.profile_handlers import cmd_profile
 
-from app.database.requests.user_requests import get_user_by_tg_id
+from app.database.models.user_models import UserIdentity
 from app.database.requests.event_requests import create_event, get_event_by_name, update_event
 from app.utils import try_parse_datetime, local_now, format_dt
 
@@ -28,10 +29,10 @@ class EventCreation(StatesGroup):
 
 
 @router.message(StateFilter(EventCreation), F.text == "❌ Отменить")
-async def cancel_event_creation(message: Message, state: FSMContext):
+async def cancel_event_creation(message: Message, state: FSMContext, user: UserIdentity):
     await state.clear()
     await message.answer("Создание события отменено", reply_markup=ReplyKeyboardRemove())
-    await cmd_profile(message)
+    await cmd_profile(message, user)
 
 
 @router.message(Command("create_event"))
@@ -41,7 +42,7 @@ async def cmd_create_event(message: Message, state: FSMContext):
     await message.answer("Вы начали создание события. \n\nВведите название события.", reply_markup=cancel_keyboard)
 
 
-@router.callback_query(F.data == "create_event")
+@callbacks.data("create_event")
 async def callback_create_event(callback_query: CallbackQuery, state: FSMContext):
     if not callback_query.message:
         await callback_query.answer()
@@ -198,7 +199,7 @@ async def input_event_end(message: Message, state: FSMContext):
 
 
 @router.message(StateFilter(EventCreation.preview), F.text.in_({"✅ Создать событие", "💾 Сохранить изменения"}))
-async def preview_confirm_create(message: Message, state: FSMContext):
+async def preview_confirm_create(message: Message, state: FSMContext, user: UserIdentity):
     data = await state.get_data()
     title = data.get("title")
     description = data.get("description")
@@ -212,8 +213,7 @@ async def preview_confirm_create(message: Message, state: FSMContext):
         await state.clear()
         return
 
-    user_object = await get_user_by_tg_id(message.from_user.id)
-    if not user_object:
+    if not user:
         await message.answer("Не удалось получить данные пользователя. Попробуйте позже.",
                              reply_markup=ReplyKeyboardRemove())
         await state.clear()
@@ -241,7 +241,7 @@ async def preview_confirm_create(message: Message, state: FSMContext):
     compilation = {
         "title": title,
         "description": description,
-        "created_by": user_object.id,
+        "created_by": user.id,
         "created_at": local_now().replace(microsecond=0),
         "start_at": start_at,
         "end_at": end_at,
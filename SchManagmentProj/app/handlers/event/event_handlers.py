@@ -12,10 +12,8 @@ from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.exceptions import TelegramBadRequest
 
-from app.database.models.user_models import UserRole, ManagementType
-
-from app.database.requests.user_requests import get_user_by_tg_id, get_user_data
-from app.handlers import ItemCallback
+from app.database.models.user_models import UserRole, ManagementType, UserIdentity
+from app.handlers import callbacks, EventList, EventInfo, EventDelete, EventEdit
 
 from app.keyboards.keyboards import confirm_keyboard, build_cancel_keyboard
 
@@ -23,8 +21,8 @@ from app.keyboards.event_keyboards import (
     build_week_keyboard,
     build_event_info_keyboard,
 )
-from app.database.requests.event_requests import get_events_in_range, get_events_by_date, soft_delete_event, \
-    get_event_by_id, get_event_data
+from app.database.requests.event_requests import get_week_schedule, get_day_events, soft_delete_event, \
+    get_event_by_id
 
 from app.handlers.event.event_creation_handlers import EventCreation
 
@@ -37,41 +35,27 @@ class DeleteEventStates(StatesGroup):
     waiting_for_confirmation = State()
 
 
-@router.callback_query(ItemCallback.filter(F.callback_action == "event_list"))
-async def callback_event_list(callback_query: CallbackQuery, callback_data: ItemCallback):
+@callbacks.action(EventList)
+async def callback_event_list(callback_query: CallbackQuery, callback_data: EventList, user: UserIdentity):
     # Error check
     if not callback_query.message:
         await callback_query.answer()
         return
 
-    data = callback_data.data.split()
-    if data[0] == "main":
+    if callback_data.week is None:
         today = datetime.today()
         start_of_week_date = (today - timedelta(days=today.weekday())).date()
-    elif data[0] == "set":
-        try:
-            start_of_week_date = dt_date.fromisoformat(data[1])
-        except Exception:
-            await callback_query.answer("Неверная дата в callback.", show_alert=True)
-            return
     else:
-        await callback_query.answer()
-        return
+        start_of_week_date = callback_data.week
 
     # Data
-    user_object = await get_user_by_tg_id(callback_query.from_user.id)
-    user_data = await get_user_data(user_object.id)
-
-    start_dt = datetime.combine(start_of_week_date, dt_time.min)
-    end_dt = datetime.combine(start_of_week_date + timedelta(days=6), dt_time.max)
-
-    events = await get_events_in_range(start_dt, end_dt)
+    week = await get_week_schedule(start_of_week_date)
 
     # Role check for event creation keyboard
-    if user_data["role"] in [UserRole.management, UserRole.admin, UserRole.teacher]:
-        keyboard = build_week_keyboard(start_of_week_date, events, True)
+    if user.role in [UserRole.management, UserRole.admin, UserRole.teacher]:
+        keyboard = build_week_keyboard(week, True)
     else:
-        keyboard = build_week_keyboard(start_of_week_date, events, False)
+        keyboard = build_week_keyboard(week, False)
 
     # Handler
     month_name = event_month_names[datetime.now().month - 1]
@@ -104,27 +88,17 @@ async def callback_event_list(callback_query: CallbackQuery, callback_data: Item
     await callback_query.answer()
 
 
-@router.callback_query(ItemCallback.filter(F.callback_action == "event_info"))
-async def callback_event_info(callback_query: CallbackQuery, callback_data: ItemCallback):
+@callbacks.action(EventInfo)
+async def callback_event_info(callback_query: CallbackQuery, callback_data: EventInfo, user: UserIdentity):
     if not callback_query.message:
         await callback_query.answer()
         return
 
-    raw = callback_data.data or ""
-    parts = raw.split()
-    try:
-        day_iso = parts[0]
-        query_date = dt_date.fromisoformat(day_iso)
-    except Exception:
-        await callback_query.answer("Неверная дата в callback.", show_alert=True)
-        return
+    query_date = callback_data.day
+    index = callback_data.index or 0
 
-    try:
-        index = int(parts[1]) if len(parts) > 1 else 0
-    except Exception:
-        index = 0
-
-    event_objects = await get_events_by_date(query_date)
+    # Листание карточек дня берёт события из кэша, без повторных запросов
+    event_objects = await get_day_events(query_date)
     if not event_objects:
         await callback_query.answer("Событий на этот день нет.", show_alert=True)
         return
@@ -138,15 +112,9 @@ async def callback_event_info(callback_query: CallbackQuery, callback_data: Item
 
     event = event_objects[index]
 
-    # Data
-    user_object = await get_user_by_tg_id(callback_query.from_user.id)
-    user_data = await get_user_data(user_object.id)
-
-    event_data = await get_event_data(event.id)
-
     # Role check for event creation keyboard
-    if (user_data["role"] in [UserRole.admin, UserRole.teacher] or user_data["manager_role"] == ManagementType.president
-            or user_data.get("id") == event_data.get("created_by")):
+    if (user.role in [UserRole.admin, UserRole.teacher] or user.manager_role == ManagementType.president
+            or user.id == event.created_by):
         keyboard = build_event_info_keyboard(event, index=index, total=total, day_date=query_date, can_redact=True)
     else:
         keyboard = build_event_info_keyboard(event, index=index, total=total, day_date=query_date, can_redact=False)
@@ -187,18 +155,13 @@ async def callback_event_info(callback_query: CallbackQuery, callback_data: Item
     await callback_query.answer()
 
 
-@router.callback_query(ItemCallback.filter(F.callback_action == "event_delete"))
-async def callback_event_delete(callback_query: CallbackQuery, callback_data: ItemCallback, state: FSMContext):
+@callbacks.action(EventDelete)
+async def callback_event_delete(callback_query: CallbackQuery, callback_data: EventDelete, state: FSMContext):
     if not callback_query.message:
         await callback_query.answer()
         return
 
-    raw = callback_data.data or ""
-    try:
-        event_id = int(raw)
-    except Exception:
-        await callback_query.answer("Неверный идентификатор события.", show_alert=True)
-        return
+    event_id = callback_data.event_id
 
     await state.update_data(pending_delete_event_id=event_id)
     await state.set_state(DeleteEventStates.waiting_for_confirmation)
@@ -212,7 +175,7 @@ async def callback_event_delete(callback_query: CallbackQuery, callback_data: It
 
 
 @router.message(StateFilter(DeleteEventStates.waiting_for_confirmation))
-async def confirm_delete_message(message: Message, state: FSMContext):
+async def confirm_delete_message(message: Message, state: FSMContext, user: UserIdentity):
     text = (message.text or "").strip()
     data = await state.get_data()
     event_id = data.get("pending_delete_event_id")
@@ -223,8 +186,7 @@ async def confirm_delete_message(message: Message, state: FSMContext):
         return
 
     if text == "✅ Подтвердить":
-        deleted_by = message.from_user.id if message.from_user else None
-        deleted_event = await soft_delete_event(event_id, deleted_by)
+        deleted_event = await soft_delete_event(event_id, user.id)
         if deleted_event:
             await message.answer("Событие успешно удалено.", reply_markup=ReplyKeyboardRemove())
         else:
@@ -239,19 +201,13 @@ async def confirm_delete_message(message: Message, state: FSMContext):
     await message.answer('Пожалуйста, дайте ответ через кнопку "✅ Подтвердить" или "❌ Отменить"')
 
 
-@router.callback_query(ItemCallback.filter(F.callback_action == "edit_event"))
-async def callback_edit_event(callback_query: CallbackQuery, callback_data: ItemCallback, state: FSMContext):
+@callbacks.action(EventEdit)
+async def callback_edit_event(callback_query: CallbackQuery, callback_data: EventEdit, state: FSMContext):
     if not callback_query.message:
         await callback_query.answer()
         return
 
-    try:
-        event_id = int(callback_data.data)
-    except Exception:
-        await callback_query.answer("Некорректный идентификатор события", show_alert=True)
-        return
-
-    event = await get_event_by_id(event_id)
+    event = await get_event_by_id(callback_data.event_id)
     if not event:
         await callback_query.answer("Событие не найдено", show_alert=True)
         return
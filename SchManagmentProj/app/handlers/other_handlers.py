@@ -4,23 +4,35 @@ from aiogram.types import Message, CallbackQuery, ReplyKeyboardRemove, InlineKey
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
-from app.handlers import ItemCallback
+from app.handlers import callbacks
+from app.utils.callback_codec import is_compact_callback
+from app.database.models.user_models import UserIdentity, UserRole
 from app.keyboards.keyboards import not_founded
+from app.utils.metrics import metrics
 
 router = Router()
+stale_callback_router = Router()
 
+STALE_CALLBACK_TEXT = "Кнопка устарела. Откройте меню заново."
 
-@router.callback_query(F.data == "pages_count")
+
+@callbacks.data("pages_count")
 async def create_profile(callback: CallbackQuery):
     await callback.answer("Кол-во страниц", show_alert=False)
 
 
 @router.message(Command("test"))
-async def cmd_info(message: Message):
+async def cmd_info(message: Message, user: UserIdentity):
     from app.utils.notif_sender import send_notification_by_id
-    from app.database.requests.user_requests import get_user_by_tg_id
-    user_object = await get_user_by_tg_id(message.chat.id)
-    await send_notification_by_id(user_object.id, "привет чувак")
+    await send_notification_by_id(user.id, "привет чувак")
+
+
+@router.message(Command("metrics"))
+async def cmd_metrics(message: Message, user: UserIdentity):
+    # Сводка по скорости обработки апдейтов — только для администраторов
+    if user.role != UserRole.admin:
+        return
+    await message.answer(metrics.summary())
 
 
 @router.message(Command("send"))
@@ -43,12 +55,12 @@ async def cmd_send(message: Message):
         await message.answer("Сообщение отправлено.")
 
 
-@router.callback_query(F.data == "just_answer_callback")
+@callbacks.data("just_answer_callback")
 async def blank_callback(callback: CallbackQuery):
     await callback.answer()
 
 
-@router.callback_query(F.data == "blank_callback")
+@callbacks.data("blank_callback")
 async def blank_callback(callback: CallbackQuery):
     print("Инициация 'blank_callback'")
     print(callback)
@@ -57,3 +69,9 @@ async def blank_callback(callback: CallbackQuery):
         caption="Эта функция ещё не реализована. Попробуйте позже.",
         reply_markup=not_founded)
     await callback.answer()
+
+
+@stale_callback_router.callback_query(F.data.startswith("item:") | F.data.func(is_compact_callback))
+async def stale_callback(callback: CallbackQuery):
+    # Кнопки из сообщений, отправленных до смены формата callback-данных, или испорченные данные
+    await callback.answer(STALE_CALLBACK_TEXT, show_alert=True)
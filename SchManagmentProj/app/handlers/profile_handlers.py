@@ -6,8 +6,9 @@ from aiogram.types import Message, CallbackQuery, ReplyKeyboardRemove
 
 from typing import Optional
 
-from app.database.models.user_models import UserRole
-from app.database.requests.user_requests import get_user_data, create_user, get_user_by_tg_id
+from app.handlers import callbacks
+from app.database.models.user_models import UserRole, UserIdentity
+from app.database.requests.user_requests import create_user, get_user_identity, get_user_data
 
 from app.keyboards.profile_keyboards import standard_profile, admin_profile
 
@@ -28,23 +29,21 @@ async def send_profile(message: Message, text: str, keyboard, new_message: bool
         await message.answer(text, reply_markup=keyboard)
 
 
-@router.callback_query(F.data == "create_profile")
-async def create_profile(callback: CallbackQuery):
-    if await get_user_by_tg_id(callback.from_user.id):
+@callbacks.data("create_profile")
+async def create_profile(callback: CallbackQuery, user: Optional[UserIdentity]):
+    if user:
         await callback.answer("Пользователь уже существует. Профиль не создан.")
         return
     await create_user(callback.from_user.id)
+    user = await get_user_identity(callback.from_user.id)
     await callback.bot.send_message(text="Профиль успешно создан!", chat_id=callback.message.chat.id)
-    await cmd_profile(callback.message, user_id=callback.from_user.id, new_message=True)
+    await cmd_profile(callback.message, user, new_message=True)
     await callback.answer()
 
 
 @router.message(Command("profile"))
-async def cmd_profile(message: Message, user_id: Optional[int] = None, new_message: bool = False):
-    user_object = await get_user_by_tg_id(user_id if user_id else message.from_user.id)
-    user_data = await get_user_data(user_object.id)
-
-    role = user_data.get("role")
+async def cmd_profile(message: Message, user: Optional[UserIdentity], new_message: bool = False):
+    role = user.role if user else None
 
     if role == UserRole.user:
         text = (f"Твой профиль:\n"
@@ -55,10 +54,12 @@ async def cmd_profile(message: Message, user_id: Optional[int] = None, new_messa
                 f"Роль: Ученик\n")
         await send_profile(message, text, standard_profile, new_message)
     elif role == UserRole.teacher:
+        user_data = await get_user_data(user.id)
         text = (f"Твой профиль:\n"
                 f"Роль: Учитель: {user_data['full_name']}")
         await send_profile(message, text, admin_profile, new_message)
     elif role == UserRole.management:
+        user_data = await get_user_data(user.id)
         text = (f"Твой профиль:\n"
                 f"Роль: Управление [{user_data['user_desc']}]")
         await send_profile(message, text, admin_profile, new_message)
@@ -71,9 +72,9 @@ async def cmd_profile(message: Message, user_id: Optional[int] = None, new_messa
         await send_profile(message, "Неизвестная роль пользователя", keyboard=ReplyKeyboardRemove())
 
 
-@router.callback_query(F.data == "profile")
-async def callback_profile(callback: CallbackQuery):
+@callbacks.data("profile")
+async def callback_profile(callback: CallbackQuery, user: UserIdentity):
     if not callback.message:
         return
-    await cmd_profile(callback.message, user_id=callback.from_user.id)
+    await cmd_profile(callback.message, user)
     await callback.answer()
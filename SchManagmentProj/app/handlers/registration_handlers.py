@@ -1,3 +1,5 @@
+from typing import Optional
+
 from aiogram import Router
 from aiogram.filters import CommandStart
 from aiogram.types import Message, ReactionTypeEmoji
@@ -5,9 +7,7 @@ from aiogram.fsm.state import State, StatesGroup
 from aiogram.fsm.context import FSMContext
 
 from app.database.requests.code_requests import get_registration_code   
-from app.database.requests.user_requests import get_user_by_tg_id
-
-from app.database.models.user_models import UserRole
+from app.database.models.user_models import UserRole, UserIdentity
 
 from app.keyboards.profile_keyboards import create_profile
 from app.handlers.profile_handlers import cmd_profile
@@ -16,11 +16,11 @@ router = Router()
 
 
 @router.message(CommandStart())
-async def cmd_start(message: Message):
+async def cmd_start(message: Message, user: Optional[UserIdentity]):
     if not message.from_user.id:
         return
-    if await get_user_by_tg_id(message.from_user.id):
-        await cmd_profile(message)
+    if user:
+        await cmd_profile(message, user)
         return
     await message.bot.set_message_reaction(
         chat_id=message.chat.id,
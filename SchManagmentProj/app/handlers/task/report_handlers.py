@@ -1,4 +1,4 @@
-from datetime import timedelta, datetime
+from datetime import timedelta, datetime, MINYEAR, MAXYEAR
 from typing import Optional
 
 from aiogram import Router, F
@@ -10,66 +10,39 @@ from aiogram.exceptions import TelegramBadRequest
 
 from app.keyboards.keyboards import cancel_keyboard, build_cancel_keyboard
 from app.keyboards.task_keyboards import *
-from app.handlers import ItemCallback
+from app.handlers import callbacks, TaskReport
 
 from app.handlers.profile_handlers import cmd_profile
-from app.database.requests.user_requests import get_user_by_tg_id
+from app.handlers.other_handlers import STALE_CALLBACK_TEXT
+from app.database.models.user_models import UserIdentity
 from app.database.requests.task_requests import (
     create_task, get_task_by_title, update_task,
-    get_user_completed_tasks
+    get_user_month_report
 )
 from app.utils import try_parse_datetime, local_now, format_dt, month_names
 
 router = Router()
 
 
-@router.callback_query(ItemCallback.filter(F.callback_action == "self_task_report"))
-async def callback_self_task_report(callback_query: CallbackQuery, callback_data: ItemCallback):
+@callbacks.action(TaskReport)
+async def callback_self_task_report(callback_query: CallbackQuery, callback_data: TaskReport, user: UserIdentity):
     if not callback_query.message:
         await callback_query.answer()
         return
 
-    user_id = callback_query.from_user.id if callback_query.from_user else None
-    if not user_id:
-        await callback_query.answer()
-        return
-
-    data = callback_data.data.split()
-    print(data)
+    # если в callback передан id пользователя — показываем отчёт этого пользователя
+    target_user_id = callback_data.user_id or user.id
     now = local_now()
-    year = now.year
-    month = now.month
+    year = callback_data.year or now.year
+    month = callback_data.month or now.month
 
-    if not data:
-        await callback_query.answer("Неверные данные в callback.", show_alert=True)
+    # Соседние месяцы в клавиатуре тоже должны помещаться в диапазон datetime
+    if not (1 <= month <= 12 and MINYEAR < year < MAXYEAR):
+        await callback_query.answer(STALE_CALLBACK_TEXT, show_alert=True)
         return
 
-    if data[0] == "main":
-        text = await build_month_report_text(user_id, year, month)
-        keyboard = build_self_report_keyboard(year, month)
-    elif data[0] == "set":
-        try:
-            year_str, month_str = data[1].split("-")
-            year = int(year_str)
-            month = int(month_str)
-            text = await build_month_report_text(user_id, year, month)
-            keyboard = build_self_report_keyboard(year, month)
-        except Exception:
-            await callback_query.answer("Неверные данные в callback.", show_alert=True)
-
-            return
-    elif data[0].isdigit():
-        # если в callback передан id пользователя — показываем отчёт этого пользователя
-        try:
-            target_user_id = int(data[0])
-            text = await build_month_report_text(target_user_id, year, month)
-            keyboard = build_self_report_keyboard(year, month)
-        except Exception:
-            await callback_query.answer("Неверные данные в callback.", show_alert=True)
-            return
-    else:
-        await callback_query.answer("Неверный формат callback.", show_alert=True)
-        return
+    text = await build_month_report_text(target_user_id, year, month)
+    keyboard = build_self_report_keyboard(year, month)
 
     try:
         await callback_query.message.edit_text(text, reply_markup=keyboard)
@@ -84,13 +57,7 @@ async def callback_self_task_report(callback_query: CallbackQuery, callback_data
 
 
 async def build_month_report_text(user_id: int, year: int, month: int) -> str:
-    tasks = await get_user_completed_tasks(user_id)
-    filtered = [
-        task for task in tasks
-        if getattr(task, "completed_at") is not None
-           and getattr(task, "completed_at").year == year
-           and getattr(task, "completed_at").month == month
-    ]
+    filtered = await get_user_month_report(user_id, year, month)
 
     header = f"Ваш отчёт по задачам:\n— {month_names[month - 1]} {year} года\n"
     if not filtered:
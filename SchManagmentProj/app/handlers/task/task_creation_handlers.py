@@ -1,4 +1,5 @@
 from datetime import timedelta, datetime
+from typing import List, Optional
 
 from aiogram import Router, F
 from aiogram.filters import Command, StateFilter
@@ -10,13 +11,15 @@ from app.keyboards.keyboards import cancel_keyboard, build_cancel_keyboard
 from app.keyboards.task_keyboards import *
 
 from app.handlers.profile_handlers import cmd_profile
-from app.database.requests.user_requests import get_user_by_tg_id, get_president
-from app.database.requests.task_requests import create_task, get_task_by_title, update_task
+from app.database.models.user_models import UserIdentity
+from app.database.requests.user_requests import get_president, get_user_data
+from app.database.requests.task_requests import create_task, get_task_by_title, update_task, TaskNotify
+from app.database.requests.outbox_requests import OutboxMessage
 from app.utils import try_parse_datetime, local_now, format_dt
-from app.utils.notif_sender import send_notification_by_id
+from app.utils.outbox_worker import outbox_worker
 
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-from app.handlers import ItemCallback
+from app.handlers import callbacks, TaskCreate, TaskInfo
 
 router = Router()
 
@@ -29,10 +32,10 @@ class TaskCreation(StatesGroup):
 
 
 @router.message(StateFilter(TaskCreation), F.text == "❌ Отменить")
-async def cancel_task_creation(message: Message, state: FSMContext):
+async def cancel_task_creation(message: Message, state: FSMContext, user: UserIdentity):
     await state.clear()
     await message.answer("Создание задачи отменено", reply_markup=ReplyKeyboardRemove())
-    await cmd_profile(message)
+    await cmd_profile(message, user)
 
 
 @router.message(Command("create_task"))
@@ -42,18 +45,15 @@ async def cmd_create_task(message: Message, state: FSMContext):
     await message.answer("Вы начали создание задачи.\n\nВведите название задачи.", reply_markup=cancel_keyboard)
 
 
-@router.callback_query(ItemCallback.filter(F.callback_action == "create_task"))
-async def callback_create_task(callback_query: CallbackQuery, callback_data: ItemCallback, state: FSMContext):
+@callbacks.action(TaskCreate)
+async def callback_create_task(callback_query: CallbackQuery, callback_data: TaskCreate, state: FSMContext,
+                               user: UserIdentity):
     if not callback_query.message:
         await callback_query.answer()
         return
     await cmd_create_task(callback_query.message, state)
     # cmd_create_task очищает FSM/устанавливает состояние — устанавливаем created_for после этого
-    try:
-        created_for_id = int(callback_data.data)
-    except Exception:
-        created_for_id = callback_query.from_user.id
-    await state.update_data(created_for=created_for_id)
+    await state.update_data(created_for=callback_data.user_id)
     await callback_query.answer()
 
 
@@ -146,28 +146,45 @@ async def input_task_end(message: Message, state: FSMContext):
     await state.set_state(TaskCreation.preview)
 
 
+async def president_notice(user: UserIdentity, icon: str, action: str) -> Optional[TaskNotify]:
+    """
+    Уведомление президенту о действии пользователя с задачей — для notify в create_task/update_task/
+    set_task_completed. None, если президента нет или действует он сам.
+    """
+    president_object = await get_president()
+    if not president_object or president_object.id == user.id:
+        return None
+    president_id = president_object.id
+    user_data = await get_user_data(user.id)
+    notif_text = f"{icon} {user_data['user_desc']} {action}."
+
+    def build(task) -> List[OutboxMessage]:
+        markup = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="Открыть задачу", callback_data=TaskInfo(task.id).pack())]
+        ])
+        return [OutboxMessage(president_id, notif_text, markup)]
+
+    return build
+
+
 @router.message(
     StateFilter(TaskCreation.preview),
     F.text.in_({"✅ Создать задачу", "💾 Сохранить изменения"})
 )
-async def preview_confirm_create(message: Message, state: FSMContext):
+async def preview_confirm_create(message: Message, state: FSMContext, user: UserIdentity):
     data = await state.get_data()
     title = data.get("title")
     description = data.get("description")
     end_at = data.get("end_at")
     editing_id = data.get("editing_task_id")
 
-    creator_user_object = await get_user_by_tg_id(message.from_user.id)
-    president_object = await get_president()
-
     if not title or not end_at:
         await message.answer("Нет данных. Начните заново.",
                              reply_markup=ReplyKeyboardRemove())
         await state.clear()
         return
 
-    user_object = await get_user_by_tg_id(message.from_user.id)
-    if not user_object:
+    if not user:
         await message.answer("Не удалось получить данные пользователя. Попробуйте позже.",
                              reply_markup=ReplyKeyboardRemove())
         await state.clear()
@@ -176,24 +193,27 @@ async def preview_confirm_create(message: Message, state: FSMContext):
     compilation = {
         "title": title,
         "description": description,
-        "created_by": user_object.id,
-        "created_for": data.get("created_for", user_object.id),
+        "created_by": user.id,
+        "created_for": data.get("created_for", user.id),
         "created_at": local_now().replace(microsecond=0),
         "end_at": end_at,
     }
 
+    # Президента уведомляем о задачах, созданных и изменённых другими пользователями
     if editing_id:
         # обновление существующей задачи
-        updated_task = await update_task(editing_id, {"title": title, "description": description, "end_at": end_at})
+        updated_task = await update_task(editing_id, {"title": title, "description": description, "end_at": end_at},
+                                         notify=await president_notice(user, "✏️", "изменил задачу"))
         await state.clear()
         if not updated_task:
             await message.answer("Ошибка при обновлении задачи. Проверьте данные.", reply_markup=ReplyKeyboardRemove())
             return
+        outbox_worker.notify()
         await message.answer("✅ Задача успешно обновлена!",
                              reply_markup=ReplyKeyboardRemove())
         return
 
-    created_task = await create_task(compilation)
+    created_task = await create_task(compilation, notify=await president_notice(user, "✏️", "создал задачу"))
     await state.clear()
 
     if (not created_task or not getattr(created_task, "title", None) or
@@ -202,13 +222,8 @@ async def preview_confirm_create(message: Message, state: FSMContext):
                              reply_markup=ReplyKeyboardRemove())
         return
 
-    if creator_user_object != user_object:
-        notif_text = f"✏️ {user_object.user_desc} создал задачу."
-        task_cb = ItemCallback(callback_action="task_info", data=str(getattr(created_task, "id"))).pack()
-        markup = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="Открыть задачу", callback_data=task_cb)]
-        ])
-        await send_notification_by_id(president_object.id, notif_text, reply_markup=markup)
+    # Уведомление уже сохранено вместе с задачей, отправит его фоновый воркер
+    outbox_worker.notify()
     await message.answer(f"✅ Задача успешно создана!",
                          reply_markup=ReplyKeyboardRemove())
 
@@ -1,7 +1,7 @@
 from aiogram import Router, F
 from aiogram.types import CallbackQuery, ReplyKeyboardRemove, Message
 
-from app.database.models.user_models import ManagementType, UserRole
+from app.database.models.user_models import ManagementType, UserRole, UserIdentity
 from app.database.requests.task_requests import *
 from app.database.requests.user_requests import get_user_data
 from app.handlers.profile_handlers import cmd_profile
@@ -11,10 +11,13 @@ from datetime import datetime
 
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from aiogram.filters import StateFilter
+from aiogram.filters import Command, StateFilter
 
-from app.handlers.task.task_creation_handlers import TaskCreation
-from app.handlers import ItemCallback
+from app.handlers.task.task_creation_handlers import TaskCreation, president_notice
+from app.utils.outbox_worker import outbox_worker
+from app.handlers import (
+    callbacks, TaskPlaner, CompletedTasks, TaskPlanerPage, CompletedTaskPage, TaskInfo, TaskComplete, TaskDelete, TaskEdit
+)
 
 router = Router()
 
@@ -28,21 +31,20 @@ class DeleteTaskStates(StatesGroup):
 
 
 @router.message(StateFilter(CompleteTaskStates), F.text == "❌ Отменить")
-async def cancel_event_creation(message: Message, state: FSMContext):
+async def cancel_event_creation(message: Message, state: FSMContext, user: UserIdentity):
     await state.clear()
     await message.answer("❌ Завершение задачи отменено", reply_markup=ReplyKeyboardRemove())
-    await cmd_profile(message)
+    await cmd_profile(message, user)
 
 
 # ===== Menu
-@router.callback_query(F.data == "task_menu")
-async def callback_task_menu(callback_query: CallbackQuery):
+@callbacks.data("task_menu")
+async def callback_task_menu(callback_query: CallbackQuery, user: UserIdentity):
     if not callback_query.message:
         await callback_query.answer()
         return
 
-    user_object = await get_user_by_tg_id(callback_query.from_user.id)
-    keyboard = build_task_menu_keyboard(user_object)
+    keyboard = build_task_menu_keyboard(user)
 
     await callback_query.message.edit_text(
         f"Меню задач:",
@@ -52,29 +54,28 @@ async def callback_task_menu(callback_query: CallbackQuery):
 
 
 # callback action
-@router.callback_query(ItemCallback.filter(F.callback_action == "task_planer"))
-async def callback_task_planer(callback_query: CallbackQuery, callback_data: ItemCallback):
+@callbacks.action(TaskPlaner)
+async def callback_task_planer(callback_query: CallbackQuery, callback_data: TaskPlaner, user: UserIdentity):
     if not callback_query.message:
         await callback_query.answer()
         return
 
-    callback_user_object = await get_user_by_tg_id(callback_query.from_user.id)
-    tasks = await get_user_active_tasks(int(callback_data.data))
-    if callback_user_object.manager_role == ManagementType.president or callback_user_object.role in (
+    tasks, page, total = await get_user_tasks_page(callback_data.user_id, completed=False)
+    if user.manager_role == ManagementType.president or user.role in (
     UserRole.teacher, UserRole.admin):
         back_to = "task_tracker_menu"
     else:
         back_to = "task_menu"
 
-    keyboard = build_task_planer_keyboard(tasks, int(callback_data.data), page=1, back_to=back_to)
+    keyboard = build_task_planer_keyboard(tasks, callback_data.user_id, page=page, total=total, back_to=back_to)
 
-    if callback_user_object.id == int(callback_data.data):
+    if user.id == callback_data.user_id:
         await callback_query.message.edit_text(
             f"🗂 Меню планера задач:",
             reply_markup=keyboard
         )
     else:
-        user_data = await get_user_data(int(callback_data.data))
+        user_data = await get_user_data(callback_data.user_id)
         await callback_query.message.edit_text(
             f"🗂 Меню планера задач:\n\n"
             f"👤 {user_data.get('user_desc')}",
@@ -84,23 +85,23 @@ async def callback_task_planer(callback_query: CallbackQuery, callback_data: Ite
 
 
 # callback action
-@router.callback_query(ItemCallback.filter(F.callback_action == "completed_task_menu"))
-async def callback_completed_task_menu(callback_query: CallbackQuery, callback_data: ItemCallback):
+@callbacks.action(CompletedTasks)
+async def callback_completed_task_menu(callback_query: CallbackQuery, callback_data: CompletedTasks,
+                                       user: UserIdentity):
     if not callback_query.message:
         await callback_query.answer()
         return
 
-    callback_user_object = await get_user_by_tg_id(callback_query.from_user.id)
-    tasks = await get_user_completed_tasks(int(callback_data.data))
-    keyboard = build_completed_task_keyboard(tasks, int(callback_data.data), page=1)
+    tasks, page, total = await get_user_tasks_page(callback_data.user_id, completed=True)
+    keyboard = build_completed_task_keyboard(tasks, callback_data.user_id, page=page, total=total)
 
-    if callback_user_object.id == int(callback_data.data):
+    if user.id == callback_data.user_id:
         await callback_query.message.edit_text(
             f"🗃 Меню завершённых задач:",
             reply_markup=keyboard
         )
     else:
-        user_data = await get_user_data(int(callback_data.data))
+        user_data = await get_user_data(callback_data.user_id)
         await callback_query.message.edit_text(
             f"🗃 Меню завершённых задач:\n\n"
             f"👤 {user_data.get('user_desc')}",
@@ -109,7 +110,26 @@ async def callback_completed_task_menu(callback_query: CallbackQuery, callback_d
     await callback_query.answer()
 
 
-@router.callback_query(F.data == "task_tracker_menu")
+@router.message(Command("recount_tasks"))
+async def cmd_recount_tasks(message: Message, user: UserIdentity):
+    # Сверка счётчиков трекера с task_info — только для администраторов
+    if user.role != UserRole.admin:
+        return
+
+    before = await get_tasks_tracker_stats()
+    after = await recalculate_task_counters()
+    # Независимая проверка: та же статистика прямым подсчётом по task_info
+    direct = await count_tasks_tracker_stats()
+    lines = [f"{key}: {before[key]} → {after[key]}" for key in after]
+    mismatched = [f"{key}: {after[key]} ≠ {direct[key]}" for key in after if after[key] != direct[key]]
+    if mismatched:
+        lines += ["Расхождение с подсчётом по задачам:", *mismatched]
+    else:
+        lines.append("Совпадает с подсчётом по задачам.")
+    await message.answer("Счётчики задач пересчитаны:\n" + "\n".join(lines))
+
+
+@callbacks.data("task_tracker_menu")
 async def callback_task_tracker_menu(callback_query: CallbackQuery):
     if not callback_query.message:
         await callback_query.answer()
@@ -141,19 +161,13 @@ async def callback_task_tracker_menu(callback_query: CallbackQuery):
 
 
 # Task panels and pages
-@router.callback_query(ItemCallback.filter(F.callback_action == "task_info"))
-async def callback_task_info(callback_query: CallbackQuery, callback_data: ItemCallback):
+@callbacks.action(TaskInfo)
+async def callback_task_info(callback_query: CallbackQuery, callback_data: TaskInfo):
     if not callback_query.message:
         await callback_query.answer()
         return
 
-    try:
-        task_id = int(callback_data.data)
-    except Exception:
-        await callback_query.answer("Некорректный идентификатор задачи", show_alert=True)
-        return
-
-    task = await get_task_by_id(task_id)
+    task = await get_task_by_id(callback_data.task_id)
     if not task:
         await callback_query.answer("Задача не найдена", show_alert=True)
         return
@@ -229,36 +243,32 @@ async def callback_task_info(callback_query: CallbackQuery, callback_data: ItemC
     await callback_query.answer()
 
 
-@router.callback_query(ItemCallback.filter(F.callback_action == "task_planer_page"))
-async def callback_task_planer_page(callback_query: CallbackQuery, callback_data: ItemCallback):
+@callbacks.action(TaskPlanerPage)
+async def callback_task_planer_page(callback_query: CallbackQuery, callback_data: TaskPlanerPage,
+                                    user: UserIdentity):
     if not callback_query.message:
         await callback_query.answer()
         return
 
-    data = callback_data.data.split()
-    try:
-        page = int(data[1])
-    except Exception:
-        page = 1
-
-    callback_user_object = await get_user_by_tg_id(callback_query.from_user.id)
-    tasks = await get_user_active_tasks(int(data[0]))
+    owner_id = callback_data.user_id
+    tasks, page, total = await get_user_tasks_page(owner_id, completed=False, page=callback_data.page,
+                                                   cursor=callback_data.cursor)
 
-    if callback_user_object.manager_role == ManagementType.president or callback_user_object.role in (
+    if user.manager_role == ManagementType.president or user.role in (
     UserRole.teacher, UserRole.admin):
         back_to = "task_tracker_menu"
     else:
         back_to = "task_menu"
 
-    keyboard = build_task_planer_keyboard(tasks, int(data[0]), page=page, back_to=back_to)
+    keyboard = build_task_planer_keyboard(tasks, owner_id, page=page, total=total, back_to=back_to)
 
-    if callback_user_object.id == int(data[0]):
+    if user.id == owner_id:
         await callback_query.message.edit_text(
             f"🗂 Меню планера задач:",
             reply_markup=keyboard
         )
     else:
-        user_data = await get_user_data(int(data[0]))
+        user_data = await get_user_data(owner_id)
         await callback_query.message.edit_text(
             f"🗂 Меню планера задач:\n\n"
             f"👤 {user_data.get('user_desc')}",
@@ -267,36 +277,41 @@ async def callback_task_planer_page(callback_query: CallbackQuery, callback_data
     await callback_query.answer()
 
 
-@router.callback_query(ItemCallback.filter(F.callback_action == "completed_task_page"))
-async def callback_completed_task_page(callback_query: CallbackQuery, callback_data: ItemCallback):
+@callbacks.action(CompletedTaskPage)
+async def callback_completed_task_page(callback_query: CallbackQuery, callback_data: CompletedTaskPage,
+                                       user: UserIdentity):
     if not callback_query.message:
         await callback_query.answer()
         return
 
-    try:
-        page = int(callback_data.data)
-    except Exception:
-        page = 1
+    owner_id = callback_data.user_id
+    tasks, page, total = await get_user_tasks_page(owner_id, completed=True, page=callback_data.page,
+                                                   cursor=callback_data.cursor)
+    keyboard = build_completed_task_keyboard(tasks, owner_id, page=page, total=total)
 
-    tasks = await get_user_completed_tasks(callback_query.from_user.id)
-    keyboard = build_completed_task_keyboard(tasks, page=page)
-
-    await callback_query.message.edit_text(
-        f"🗃 Меню завершённых задач:",
-        reply_markup=keyboard
-    )
+    if user.id == owner_id:
+        await callback_query.message.edit_text(
+            f"🗃 Меню завершённых задач:",
+            reply_markup=keyboard
+        )
+    else:
+        user_data = await get_user_data(owner_id)
+        await callback_query.message.edit_text(
+            f"🗃 Меню завершённых задач:\n\n"
+            f"👤 {user_data.get('user_desc')}",
+            reply_markup=keyboard
+        )
     await callback_query.answer()
 
 
 # Task actions
-@router.callback_query(ItemCallback.filter(F.callback_action == "complete_task"))
-async def callback_complete_task(callback_query: CallbackQuery, callback_data: ItemCallback, state: FSMContext):
+@callbacks.action(TaskComplete)
+async def callback_complete_task(callback_query: CallbackQuery, callback_data: TaskComplete, state: FSMContext):
     if not callback_query.message:
         await callback_query.answer()
         return
 
-    data = callback_data.data
-    task_id = int(data)
+    task_id = callback_data.task_id
 
     task = await get_task_by_id(task_id)
     if not task:
@@ -314,17 +329,13 @@ async def callback_complete_task(callback_query: CallbackQuery, callback_data: I
     await callback_query.answer()
 
 
-@router.callback_query(ItemCallback.filter(F.callback_action == "task_delete"))
-async def callback_task_delete(callback_query: CallbackQuery, callback_data: ItemCallback, state: FSMContext):
+@callbacks.action(TaskDelete)
+async def callback_task_delete(callback_query: CallbackQuery, callback_data: TaskDelete, state: FSMContext):
     if not callback_query.message:
         await callback_query.answer()
         return
 
-    try:
-        task_id = int(callback_data.data)
-    except Exception:
-        await callback_query.answer("❌ Некорректный идентификатор задачи", show_alert=True)
-        return
+    task_id = callback_data.task_id
 
     task = await get_task_by_id(task_id)
     if not task:
@@ -342,19 +353,13 @@ async def callback_task_delete(callback_query: CallbackQuery, callback_data: Ite
     await callback_query.answer()
 
 
-@router.callback_query(ItemCallback.filter(F.callback_action == "edit_task"))
-async def callback_edit_task(callback_query: CallbackQuery, callback_data: ItemCallback, state: FSMContext):
+@callbacks.action(TaskEdit)
+async def callback_edit_task(callback_query: CallbackQuery, callback_data: TaskEdit, state: FSMContext):
     if not callback_query.message:
         await callback_query.answer()
         return
 
-    try:
-        task_id = int(callback_data.data)
-    except Exception:
-        await callback_query.answer("Некорректный идентификатор задачи", show_alert=True)
-        return
-
-    task = await get_task_by_id(task_id)
+    task = await get_task_by_id(callback_data.task_id)
     if not task:
         await callback_query.answer("Задача не найдена", show_alert=True)
         return
@@ -373,7 +378,7 @@ async def callback_edit_task(callback_query: CallbackQuery, callback_data: ItemC
 
 # Handle action confirm
 @router.message(StateFilter(CompleteTaskStates.waiting_for_description))
-async def handle_complete_description(message: Message, state: FSMContext):
+async def handle_complete_description(message: Message, state: FSMContext, user: UserIdentity):
     if message.text == "❌ Отменить":
         await message.answer("❌ Действие отменено.", reply_markup=ReplyKeyboardRemove())
         await state.clear()
@@ -392,11 +397,12 @@ async def handle_complete_description(message: Message, state: FSMContext):
         await state.clear()
         return
 
-    task = await set_task_completed(task_id)
+    task = await set_task_completed(task_id, notify=await president_notice(user, "✅", "завершил задачу"))
     if not task:
         await message.answer("❌ Задача не найдена или уже завершена.", reply_markup=ReplyKeyboardRemove())
         await state.clear()
         return
+    outbox_worker.notify()
 
     await update_task_complete_desc(task_id, description)
     await message.answer("✅ Задача успешно завершена.", reply_markup=ReplyKeyboardRemove())
@@ -404,7 +410,7 @@ async def handle_complete_description(message: Message, state: FSMContext):
 
 
 @router.message(StateFilter(DeleteTaskStates.waiting_for_confirmation))
-async def confirm_delete_task(message: Message, state: FSMContext):
+async def confirm_delete_task(message: Message, state: FSMContext, user: UserIdentity):
     text = (message.text or "").strip()
     data = await state.get_data()
     task_id = data.get("pending_delete_task_id")
@@ -416,8 +422,7 @@ async def confirm_delete_task(message: Message, state: FSMContext):
 
     print(text)
     if text == "✅ Подтвердить":
-        deleted_by = message.from_user.id if message.from_user else None
-        deleted_task = await soft_delete_task(task_id, deleted_by)
+        deleted_task = await soft_delete_task(task_id, user.id)
         if deleted_task:
             await message.answer("Задача успешно удалена.", reply_markup=ReplyKeyboardRemove())
         else:
@@ -11,6 +11,9 @@ announcement_preview_kb = ReplyKeyboardMarkup(keyboard=[
         KeyboardButton(text="✅ Отправить"),
         KeyboardButton(text="✏️ Изменить")
     ],
+    [
+        KeyboardButton(text="🕑 Запланировать")
+    ],
     [
         KeyboardButton(text="❌ Отменить")
     ]
@@ -1,10 +1,11 @@
 from datetime import date, timedelta
 from typing import List
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
-from app.database.models.event_models import Event
-from app.handlers import ItemCallback
+from app.database.models.event_models import Event, WeekSchedule
+from app.handlers import EventList, EventInfo, EventDelete, EventEdit
 
 from app.utils.utils import weekday_names
+from app.utils.keyboard_cache import memoize_keyboard
 
 event_creation_keyboard = ReplyKeyboardMarkup(
     keyboard=[
@@ -50,16 +51,15 @@ date_end_select = ReplyKeyboardMarkup(
 )
 
 
-def build_week_keyboard(start_of_week_date: date, events: List[Event],
-                        can_redact: bool = False) -> InlineKeyboardMarkup:
+# Клавиатура недели одинакова для всех с тем же правом редактирования. Версия "events" меняется
+# при любом изменении событий (см. invalidate_event_weeks); в ключ идёт версия, под которой неделя загружена
+@memoize_keyboard(week=lambda week: (week.start, week.version))
+def build_week_keyboard(week: WeekSchedule, can_redact: bool = False) -> InlineKeyboardMarkup:
+    start_of_week_date = week.start
     rows = []
 
-    for day_num in range(7):
+    for day_num, matching in enumerate(week.days):
         day_date = start_of_week_date + timedelta(days=day_num)
-        matching = [
-            event for event in events
-            if (getattr(event, "start_at").date() <= day_date <= getattr(event, "end_at").date())
-        ]
 
         weekday_display = weekday_names[day_num].capitalize()
         date_display = f"{day_date.day}.{day_date.month}"
@@ -72,14 +72,12 @@ def build_week_keyboard(start_of_week_date: date, events: List[Event],
             extra_text = f" (+{extra})" if extra > 0 else ""
             text = f"📌 {weekday_display} ({date_display}): {first_title}{extra_text}"
 
-        # теперь передаём индекс события в callback (по умолчанию 0)
-        day_callback = ItemCallback(callback_action="event_info", data=f"{day_date.isoformat()} 0").pack()
+        # Карточки дня открываются с первого события
+        day_callback = EventInfo(day_date).pack()
         rows.append([InlineKeyboardButton(text=text, callback_data=day_callback)])
 
-    next_week_callback = ItemCallback(callback_action="event_list",
-                                      data=f"set {(start_of_week_date + timedelta(days=7)).isoformat()}").pack()
-    prev_week_callback = ItemCallback(callback_action="event_list",
-                                      data=f"set {(start_of_week_date - timedelta(days=7)).isoformat()}").pack()
+    next_week_callback = EventList(start_of_week_date + timedelta(days=7)).pack()
+    prev_week_callback = EventList(start_of_week_date - timedelta(days=7)).pack()
 
     rows.append([InlineKeyboardButton(text="⬅️", callback_data=prev_week_callback),
                  InlineKeyboardButton(text="↩️ В профиль", callback_data="profile"),
@@ -91,15 +89,13 @@ def build_week_keyboard(start_of_week_date: date, events: List[Event],
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
+@memoize_keyboard(event=lambda event: (event.id, event.start_at.date()))
 def build_event_info_keyboard(event: Event, index: int = 0, total: int = 1,
                               day_date: date = None, can_redact: bool = False) -> InlineKeyboardMarkup:
     event_start_date = getattr(event, "start_at").date()
     start_of_week = event_start_date - timedelta(days=event_start_date.weekday())
 
-    back_callback = ItemCallback(
-        callback_action="event_list",
-        data=f"set {start_of_week.isoformat()}"
-    ).pack()
+    back_callback = EventList(start_of_week).pack()
 
     rows = []
 
@@ -108,8 +104,8 @@ def build_event_info_keyboard(event: Event, index: int = 0, total: int = 1,
         prev_index = (index - 1) % total
         next_index = (index + 1) % total
 
-        prev_cb = ItemCallback(callback_action="event_info", data=f"{day_date.isoformat()} {prev_index}").pack()
-        next_cb = ItemCallback(callback_action="event_info", data=f"{day_date.isoformat()} {next_index}").pack()
+        prev_cb = EventInfo(day_date, prev_index).pack()
+        next_cb = EventInfo(day_date, next_index).pack()
 
         rows.append([InlineKeyboardButton(text="⬅️", callback_data=prev_cb),
                      InlineKeyboardButton(text=f"{index + 1}/{total}", callback_data="pages_count"),
@@ -117,8 +113,8 @@ def build_event_info_keyboard(event: Event, index: int = 0, total: int = 1,
 
     # Check redact rights
     if can_redact:
-        delete_callback = ItemCallback(callback_action="event_delete", data=str(getattr(event, "id"))).pack()
-        redact_callback = ItemCallback(callback_action="edit_event", data=str(getattr(event, 'id'))).pack()
+        delete_callback = EventDelete(getattr(event, "id")).pack()
+        redact_callback = EventEdit(getattr(event, "id")).pack()
         hide_callback = "just_answer_callback"
 
         rows.append([InlineKeyboardButton(text="✏️ Редактировать событие", callback_data=redact_callback)])
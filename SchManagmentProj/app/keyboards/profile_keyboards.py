@@ -1,13 +1,12 @@
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardButton, InlineKeyboardMarkup
-from app.handlers import ItemCallback
+from app.handlers import EventList
 
 standard_profile = InlineKeyboardMarkup(inline_keyboard=[
-    [InlineKeyboardButton(text="📆 Календарь событий", callback_data=ItemCallback(callback_action="event_list",
-                                                                                 data="main").pack())]])
+    [InlineKeyboardButton(text="📆 Календарь событий", callback_data=EventList().pack())]])
 
 admin_profile = InlineKeyboardMarkup(inline_keyboard=[
     [InlineKeyboardButton(text="📆 Календарь событий",
-                          callback_data=ItemCallback(callback_action="event_list", data="main").pack())],
+                          callback_data=EventList().pack())],
     [InlineKeyboardButton(text="📢 Объявления", callback_data="announcement_menu")],
     [InlineKeyboardButton(text="📋 Задачи", callback_data="task_menu")]])
 
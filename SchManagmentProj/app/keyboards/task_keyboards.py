@@ -4,11 +4,20 @@ from typing import List
 
 import asyncio
 
-from app.database.models.user_models import ManagementType, UserRole, User
+from app.database.models.user_models import ManagementType, UserRole, UserIdentity
 from app.database.requests.user_requests import get_existing_managers
-from app.handlers import ItemCallback
+from app.handlers import (
+    TaskPlaner, CompletedTasks, TaskPlanerPage, CompletedTaskPage, TaskInfo, TaskComplete, TaskDelete, TaskEdit,
+    TaskCreate, TaskReport
+)
 
 from app.utils import month_names
+from app.utils.keyboard_cache import memoize_keyboard
+
+
+def _rows_key(tasks):
+    # Страница задач влияет на клавиатуру только через id и названия
+    return tuple((task.id, task.title) for task in tasks)
 
 # Static keyboards
 
@@ -48,7 +57,8 @@ task_edit_keyboard = ReplyKeyboardMarkup(
 
 # Keyboard builders
 
-def build_task_menu_keyboard(user_object: User):
+@memoize_keyboard(user_object=lambda user: (user.id, user.role, user.manager_role))
+def build_task_menu_keyboard(user_object: UserIdentity):
     if user_object.manager_role == ManagementType.president or user_object.role == UserRole.teacher:
         keyboard = InlineKeyboardMarkup(inline_keyboard=[
             [InlineKeyboardButton(text="📋 Трекер задач", callback_data="task_tracker_menu")],
@@ -58,8 +68,8 @@ def build_task_menu_keyboard(user_object: User):
 
     else:
 
-        report_cb = ItemCallback(callback_action="self_task_report", data=str(user_object.id)).pack()
-        planer_cb = ItemCallback(callback_action="task_planer", data=str(user_object.id)).pack()
+        report_cb = TaskReport(user_object.id).pack()
+        planer_cb = TaskPlaner(user_object.id).pack()
 
         keyboard = InlineKeyboardMarkup(inline_keyboard=[
             [InlineKeyboardButton(text="🗂 Планер задач", callback_data=planer_cb)],
@@ -70,11 +80,12 @@ def build_task_menu_keyboard(user_object: User):
     return keyboard
 
 
+@memoize_keyboard(task=lambda task: task.id)
 def build_task_info_keyboard(task: Task, user_id) -> InlineKeyboardMarkup:
-    complete_cb = ItemCallback(callback_action="complete_task", data=str(getattr(task, "id"))).pack()
-    redact_cb = ItemCallback(callback_action="edit_task", data=str(getattr(task, "id"))).pack()
-    delete_cb = ItemCallback(callback_action="task_delete", data=str(getattr(task, "id"))).pack()
-    back_cb = ItemCallback(callback_action="task_planer", data=str(user_id)).pack()
+    complete_cb = TaskComplete(getattr(task, "id")).pack()
+    redact_cb = TaskEdit(getattr(task, "id")).pack()
+    delete_cb = TaskDelete(getattr(task, "id")).pack()
+    back_cb = TaskPlaner(user_id).pack()
 
     return InlineKeyboardMarkup(
         inline_keyboard=[
@@ -86,9 +97,10 @@ def build_task_info_keyboard(task: Task, user_id) -> InlineKeyboardMarkup:
     )
 
 
+@memoize_keyboard(task=lambda task: task.id)
 def build_completed_task_info_keyboard(task: Task, user_id) -> InlineKeyboardMarkup:
-    delete_cb = ItemCallback(callback_action="task_delete", data=str(getattr(task, "id"))).pack()
-    back_cb = ItemCallback(callback_action="completed_task_menu", data=str(user_id)).pack()
+    delete_cb = TaskDelete(getattr(task, "id")).pack()
+    back_cb = CompletedTasks(user_id).pack()
 
     return InlineKeyboardMarkup(
         inline_keyboard=[
@@ -98,6 +110,7 @@ def build_completed_task_info_keyboard(task: Task, user_id) -> InlineKeyboardMar
     )
 
 
+@memoize_keyboard()
 def build_self_report_keyboard(year: int, month: int) -> InlineKeyboardMarkup:
     prev_month = month - 1
     prev_year = year
@@ -111,10 +124,8 @@ def build_self_report_keyboard(year: int, month: int) -> InlineKeyboardMarkup:
         next_month = 1
         next_year += 1
 
-    prev_cb = ItemCallback(callback_action="self_task_report",
-                           data=f"set {prev_year}-{prev_month:02d}").pack()
-    next_cb = ItemCallback(callback_action="self_task_report",
-                           data=f"set {next_year}-{next_month:02d}").pack()
+    prev_cb = TaskReport(None, prev_year, prev_month).pack()
+    next_cb = TaskReport(None, next_year, next_month).pack()
 
     rows = [[
         InlineKeyboardButton(text="⬅️", callback_data=prev_cb),
@@ -123,12 +134,13 @@ def build_self_report_keyboard(year: int, month: int) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
+@memoize_keyboard(manager_objects=lambda managers: tuple((m.id, m.manager_role, m.user_desc) for m in managers))
 def build_task_tracker_menu_keyboard(manager_objects) -> InlineKeyboardMarkup:
     rows = []
 
     for manager_object in manager_objects:
         if manager_object.manager_role != ManagementType.president:
-            user_data_cb = ItemCallback(callback_action="task_planer", data=str(manager_object.id)).pack()
+            user_data_cb = TaskPlaner(manager_object.id).pack()
             rows.append([InlineKeyboardButton(text=f"👤 {manager_object.user_desc}", callback_data=user_data_cb)])
 
     rows.append([InlineKeyboardButton(text="↩️ Обратно", callback_data="task_menu")])
@@ -136,107 +148,64 @@ def build_task_tracker_menu_keyboard(manager_objects) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
-def build_task_planer_keyboard(tasks: List[Task], user_id, page: int = 1,
-                               page_size: int = 5, back_to: str = "task_menu") -> InlineKeyboardMarkup:
-    complete_cb = ItemCallback(callback_action="completed_task_menu", data=str(user_id)).pack()
-
-    if not tasks:
-        keyboard = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🗃️ Завершённые", callback_data=complete_cb)],
-            [InlineKeyboardButton(text="✏️ Создать задачу",
-                                  callback_data=ItemCallback(callback_action="create_task", data=str(user_id)).pack())],
-            [InlineKeyboardButton(text="↩️ Обратно", callback_data=back_to)]
-        ])
-        return keyboard
+def _task_page_navigation(page_callback, tasks, user_id, page: int, total: int,
+                          page_size: int) -> List[InlineKeyboardButton]:
+    # В callback передаём пользователя, номер страницы и курсор по id (см. get_user_tasks_page)
+    total_pages = (total + page_size - 1) // page_size
+    if page > 1:
+        left_cb = page_callback(user_id, page - 1, f"b{tasks[0].id}")
+    else:
+        left_cb = page_callback(user_id, total_pages, "e")
+    if page < total_pages:
+        right_cb = page_callback(user_id, page + 1, f"a{tasks[-1].id}")
+    else:
+        right_cb = page_callback(user_id, 1)
 
-    total = len(tasks)
-    total_pages = (total + page_size - 1) // page_size if total > 0 else 1
+    return [
+        InlineKeyboardButton(text="⬅️", callback_data=left_cb.pack()),
+        InlineKeyboardButton(text=f"{page}/{total_pages}", callback_data="pages_count"),
+        InlineKeyboardButton(text="➡️", callback_data=right_cb.pack())
+    ]
 
-    # Нормализация номера страницы
-    if page < 1:
-        page = 1
-    if page > total_pages:
-        page = total_pages
 
-    start = (page - 1) * page_size
-    end = start + page_size
-    page_tasks = tasks[start:end]
+@memoize_keyboard(tasks=_rows_key)
+def build_task_planer_keyboard(tasks, user_id, page: int = 1, total: int = 0, page_size: int = 5,
+                               back_to: str = "task_menu") -> InlineKeyboardMarkup:
+    """tasks — одна страница задач (id и title) из get_user_tasks_page, total — всего задач."""
+    complete_cb = CompletedTasks(user_id).pack()
 
     rows: List[List[InlineKeyboardButton]] = []
-    for task in page_tasks:
+    for task in tasks:
         rows.append([InlineKeyboardButton(text=f"📋 {task.title}",
-                                          callback_data=ItemCallback(callback_action="task_info",
-                                                                     data=str(getattr(task, "id"))).pack())])
+                                          callback_data=TaskInfo(task.id).pack())])
 
     # Добавляем панель навигации только если страниц > 1
-    if total_pages > 1:
-        left_data = right_data = [str(user_id)]
-
-        left_data.append(str(page - 1)) if page > 1 else left_data.append(str(total_pages))
-        right_data.append(str(page + 1)) if page < total_pages else right_data.append("1")
-
-        print(left_data, right_data)
-        print(' '.join(left_data), ' '.join(right_data))
-
-        left_cb = ItemCallback(callback_action="task_planer_page", data=' '.join(left_data)).pack()
-        right_cb = ItemCallback(callback_action="task_planer_page", data=' '.join(right_data)).pack()
-
-        rows.append([
-            InlineKeyboardButton(text="⬅️", callback_data=left_cb),
-            InlineKeyboardButton(text=f"{page}/{total_pages}", callback_data="pages_count"),
-            InlineKeyboardButton(text="➡️", callback_data=right_cb)
-        ])
+    if total > page_size:
+        rows.append(_task_page_navigation(TaskPlanerPage, tasks, user_id, page, total, page_size))
 
     # Остальные пункты меню
 
     rows.append([InlineKeyboardButton(text="🗃️ Завершённые", callback_data=complete_cb)])
     rows.append([InlineKeyboardButton(text="✏️ Создать задачу",
-                                      callback_data=ItemCallback(callback_action="create_task",
-                                                                 data=str(user_id)).pack())])
+                                      callback_data=TaskCreate(user_id).pack())])
     rows.append([InlineKeyboardButton(text="↩️ Обратно", callback_data=back_to)])
 
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
-def build_completed_task_keyboard(tasks: List[Task], user_id, page: int = 1,
+@memoize_keyboard(tasks=_rows_key)
+def build_completed_task_keyboard(tasks, user_id, page: int = 1, total: int = 0,
                                   page_size: int = 5) -> InlineKeyboardMarkup:
-    back_cb = ItemCallback(callback_action="task_planer", data=str(user_id)).pack()
-
-    if not tasks:
-        keyboard = InlineKeyboardMarkup(
-            inline_keyboard=[[InlineKeyboardButton(text="↩️ Обратно", callback_data=back_cb)]])
-        return keyboard
-
-    total = len(tasks)
-    total_pages = (total + page_size - 1) // page_size if total > 0 else 1
-
-    if page < 1:
-        page = 1
-    if page > total_pages:
-        page = total_pages
-
-    start = (page - 1) * page_size
-    end = start + page_size
-    page_tasks = tasks[start:end]
+    """tasks — одна страница завершённых задач из get_user_tasks_page, total — всего задач."""
+    back_cb = TaskPlaner(user_id).pack()
 
     rows: List[List[InlineKeyboardButton]] = []
-    for task in page_tasks:
+    for task in tasks:
         rows.append([InlineKeyboardButton(text=f"📋 {task.title}",
-                                          callback_data=ItemCallback(callback_action="task_info",
-                                                                     data=str(getattr(task, "id"))).pack())])
-
-    if total_pages > 1:
-        left_cb = ItemCallback(callback_action="completed_task_page",
-                               data=str(page - 1)).pack() if page > 1 else ItemCallback(
-            callback_action="completed_task_page", data=str(total_pages)).pack()
-        right_cb = ItemCallback(callback_action="completed_task_page",
-                                data=str(page + 1)).pack() if page < total_pages else ItemCallback(
-            callback_action="completed_task_page", data="1").pack()
-        rows.append([
-            InlineKeyboardButton(text="⬅️", callback_data=left_cb),
-            InlineKeyboardButton(text=f"{page}/{total_pages}", callback_data="pages_count"),
-            InlineKeyboardButton(text="➡️", callback_data=right_cb)
-        ])
+                                          callback_data=TaskInfo(task.id).pack())])
+
+    if total > page_size:
+        rows.append(_task_page_navigation(CompletedTaskPage, tasks, user_id, page, total, page_size))
 
     rows.append([InlineKeyboardButton(text="↩️ Обратно", callback_data=back_cb)])
 
@@ -0,0 +1,102 @@
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware, Bot, Dispatcher
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import GetUpdates, Response, TelegramMethod
+from aiogram.types import TelegramObject, Update
+
+from app.utils.metrics import (QUERY_COUNT_BUCKETS, UpdateTiming, current_update, finish_update, metrics, set_route,
+                               start_update)
+from app.utils.sql_monitor import check_update
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """Внешняя middleware Dispatcher: время обработки апдейта целиком, по маршруту (роутер + хендлер)."""
+
+    async def __call__(
+            self,
+            handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+            event: Update,
+            data: Dict[str, Any]
+    ) -> Any:
+        timing = UpdateTiming()
+        token = start_update(timing)
+        metrics.add("bot_updates_in_flight", 1)
+        status = "ok"
+        start = time.perf_counter()
+        try:
+            result = await handler(event, data)
+            if result is UNHANDLED:
+                status = "unhandled"
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            finish_update(token)
+            metrics.add("bot_updates_in_flight", -1)
+            if timing.route == "unhandled":
+                timing.route = f"unhandled:{event.event_type}"
+            route = timing.route
+            metrics.inc("bot_updates_total", route=route, status=status)
+            metrics.observe("bot_update_duration_seconds", elapsed, route=route)
+            metrics.observe("bot_update_db_seconds", timing.db_seconds, route=route)
+            metrics.observe("bot_update_api_seconds", timing.api_seconds, route=route)
+            metrics.observe("bot_update_queries", timing.db_queries, buckets=QUERY_COUNT_BUCKETS, route=route)
+        # N+1 и бюджет запросов; в строгом режиме превышение бюджета — ошибка обработки апдейта
+        check_update(timing)
+        return result
+
+
+class HandlerRouteMiddleware(BaseMiddleware):
+    """Внутренняя middleware: запоминает, какой хендлер выбран для апдейта."""
+
+    async def __call__(
+            self,
+            handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+            event: TelegramObject,
+            data: Dict[str, Any]
+    ) -> Any:
+        handler_object = data.get("handler")
+        if handler_object is not None:
+            set_route(handler_object.callback)
+        return await handler(event, data)
+
+
+class ApiMetricsMiddleware(BaseRequestMiddleware):
+    """Middleware сессии Bot: время каждого вызова Bot API и ошибки по методам."""
+
+    async def __call__(self, make_request: NextRequestMiddlewareType, bot: Bot, method: TelegramMethod) -> Response:
+        # getUpdates — это long polling, его время ничего не говорит о скорости бота
+        if isinstance(method, GetUpdates):
+            return await make_request(bot, method)
+
+        name = type(method).__name__
+        start = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except TelegramRetryAfter:
+            metrics.inc("bot_api_errors_total", method=name, error="retry_after")
+            raise
+        except Exception as e:
+            metrics.inc("bot_api_errors_total", method=name, error=type(e).__name__)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.observe("bot_api_request_duration_seconds", elapsed, method=name)
+            timing = current_update()
+            if timing is not None:
+                timing.api_seconds += elapsed
+                timing.api_calls += 1
+
+
+def setup_metrics(dispatcher: Dispatcher) -> None:
+    """Подключает сбор метрик апдейтов. Внутренние middleware корневого роутера действуют на все вложенные."""
+    dispatcher.update.outer_middleware(UpdateMetricsMiddleware())
+    route_middleware = HandlerRouteMiddleware()
+    for name, observer in dispatcher.observers.items():
+        if name not in ("update", "error"):
+            observer.middleware(route_middleware)
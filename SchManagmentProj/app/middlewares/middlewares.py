@@ -2,7 +2,7 @@ import re
 from typing import Callable, Dict, Any, Awaitable, Iterable, Pattern, Union, List
 from aiogram import BaseMiddleware, types
 from aiogram.types import TelegramObject
-from app.database.requests.user_requests import get_user_by_tg_id
+from app.database.requests.user_requests import get_user_identity, mark_user_reachable
 
 AllowedPattern = Union[str, Pattern]
 
@@ -53,11 +53,15 @@ class RegistrationBarrier(BaseMiddleware):
     ) -> Any:
         user_id = getattr(getattr(event, "from_user", None), "id", None)
         if not user_id:
+            data["user"] = None
             return await handler(event, data)
 
-        user = await get_user_by_tg_id(user_id)
+        # Идентификация через кэш — без запроса в БД на каждый апдейт.
+        # Результат передаётся в хендлеры параметром `user`
+        user = await get_user_identity(user_id)
+        data["user"] = user
         if user:
-            if getattr(user, "is_banned", False):
+            if user.is_banned:
                 # Попытка уведомить пользователя о блокировке (если доступно)
                 ans = getattr(event, "answer", None)
                 if ans:
@@ -66,6 +70,9 @@ class RegistrationBarrier(BaseMiddleware):
                     except Exception:
                         pass
                 return None
+            if user.is_unreachable:
+                # Пользователь снова пишет боту — значит, доставка к нему снова возможна
+                await mark_user_reachable(user_id)
             return await handler(event, data)
 
         state = data.get("state")
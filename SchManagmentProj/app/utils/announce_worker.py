@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from aiogram import Bot
+
+from app.bot import get_bot
+from app.database.models.announcement_models import AnnouncementJob, AnnouncementStatus
+from app.database.requests.announcement_requests import (
+    get_due_announcement_jobs, update_announcement_job, record_deliveries, get_failed_deliveries
+)
+from app.database.requests.user_requests import (
+    iter_users_for_announce, count_users_for_announce, mark_users_unreachable
+)
+from app.utils.broadcast import Broadcaster, DeliveryError
+from app.utils.datetime_utils import local_now
+from app.utils.rate_limiter import bulk_lane
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 15.0
+# Сколько результатов доставки копить перед записью в БД
+BATCH_SIZE = 50
+# Не чаще, чем раз в столько секунд, обновляем сообщение с прогрессом
+PROGRESS_INTERVAL = 3.0
+
+
+def _now() -> datetime:
+    # Время в БД хранится в локальном поясе без tzinfo
+    return local_now().replace(tzinfo=None)
+
+
+class AnnouncementWorker:
+    """Фоновый обработчик очереди объявлений: отправляет новые, отложенные и прерванные рассылки."""
+
+    def __init__(self, poll_interval: float = POLL_INTERVAL, batch_size: int = BATCH_SIZE,
+                 progress_interval: float = PROGRESS_INTERVAL):
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.progress_interval = progress_interval
+        self._bot: Optional[Bot] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    def start(self, bot: Bot = None) -> None:
+        if self._task is not None:
+            return
+        self._bot = bot or get_bot()
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def notify(self) -> None:
+        """Разбудить воркер после постановки нового задания."""
+        self._wakeup.set()
+
+    async def _loop(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                for job in await get_due_announcement_jobs(_now()):
+                    await self._process(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Announcement worker iteration failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _process(self, job: AnnouncementJob) -> None:
+        bot = self._bot
+        if job.status == AnnouncementStatus.pending:
+            job.total_count = await count_users_for_announce()
+            job.status = AnnouncementStatus.running
+            await update_announcement_job(job.id, {"status": job.status, "started_at": _now(),
+                                                   "total_count": job.total_count})
+        else:
+            logger.info("Resuming announcement job %s", job.id)
+
+        progress = _Progress(bot, job, self.progress_interval)
+        buffer: List[Tuple[int, Optional[str]]] = []
+        unreachable: List[int] = []
+        flush_lock = asyncio.Lock()
+
+        async def flush():
+            nonlocal buffer, unreachable
+            async with flush_lock:
+                batch, buffer = buffer, []
+                dead, unreachable = unreachable, []
+                sent, failed = await record_deliveries(job.id, batch)
+                # Уже записанные ранее получатели не должны считаться повторно и в прогрессе
+                batch_failed = sum(1 for _, error in batch if error is not None)
+                progress.sent -= len(batch) - batch_failed - sent
+                progress.failed -= batch_failed - failed
+                # Больше не тратим на этих пользователей лимиты в следующих рассылках
+                await mark_users_unreachable(dead)
+
+        async def on_result(chat_id: int, error: Optional[DeliveryError]):
+            buffer.append((chat_id, error.text if error else None))
+            if error and error.unreachable:
+                unreachable.append(chat_id)
+            progress.add(error)
+            if len(buffer) >= self.batch_size:
+                await flush()
+            await progress.maybe_update()
+
+        async def send(tg_id: int):
+            await bot.copy_message(chat_id=tg_id, from_chat_id=job.from_chat_id, message_id=job.message_id)
+
+        try:
+            await progress.maybe_update(force=True)
+            # Рассылка уступает лимит Bot API ответам пользователям
+            with bulk_lane():
+                await Broadcaster().run(iter_users_for_announce(job_id=job.id), send, on_result)
+            await flush()
+        except asyncio.CancelledError:
+            # Остановка бота: сохраняем накопленное, задание продолжится после перезапуска
+            await asyncio.shield(flush())
+            raise
+        except Exception as e:
+            logger.exception("Announcement job %s failed", job.id)
+            await update_announcement_job(job.id, {"status": AnnouncementStatus.failed, "finished_at": _now()})
+            await _safe_send(bot, job.author_chat_id, f"Рассылка прервана из-за ошибки: {e}")
+            return
+
+        await update_announcement_job(job.id, {"status": AnnouncementStatus.done, "finished_at": _now()})
+        await progress.maybe_update(force=True)
+        await _safe_send(bot, job.author_chat_id, await _final_report(job, progress))
+
+
+class _Progress:
+    """Живое сообщение автору с ходом рассылки, обновляется не чаще progress_interval."""
+
+    def __init__(self, bot: Bot, job: AnnouncementJob, interval: float):
+        self.bot = bot
+        self.job = job
+        self.interval = interval
+        self.sent = job.sent_count
+        self.failed = job.failed_count
+        self._updated_at = 0.0
+        self._updating = False
+
+    def add(self, error: Optional[DeliveryError]) -> None:
+        if error is None:
+            self.sent += 1
+        else:
+            self.failed += 1
+
+    def text(self) -> str:
+        remaining = max(self.job.total_count - self.sent - self.failed, 0)
+        return (f"📢 Рассылка #{self.job.id}\n"
+                f"Отправлено: {self.sent}\n"
+                f"Не доставлено: {self.failed}\n"
+                f"Осталось: {remaining}")
+
+    async def maybe_update(self, force: bool = False) -> None:
+        if self._updating or (not force and time.monotonic() - self._updated_at < self.interval):
+            return
+        self._updating = True
+        try:
+            if self.job.progress_message_id is None:
+                message = await self.bot.send_message(self.job.author_chat_id, self.text())
+                self.job.progress_message_id = message.message_id
+                await update_announcement_job(self.job.id, {"progress_message_id": message.message_id})
+            else:
+                await self.bot.edit_message_text(self.text(), chat_id=self.job.author_chat_id,
+                                                 message_id=self.job.progress_message_id)
+        except Exception:
+            # Прогресс — вспомогательная информация, ошибки (в т.ч. "message is not modified") не критичны
+            pass
+        finally:
+            self._updated_at = time.monotonic()
+            self._updating = False
+
+
+async def _final_report(job: AnnouncementJob, progress: _Progress) -> str:
+    if not job.total_count:
+        return "В базе нет пользователей для рассылки. (как вообще возможно получить эту ошибку лол)"
+
+    report_lines = [
+        f"Рассылка завершена.",
+        f"Всего пользователей в базе: {job.total_count}",
+        f"Отправлено успешно: {progress.sent}",
+        f"Не доставлено: {progress.failed}",
+    ]
+    if progress.failed > 0:
+        # Покажем первые 10 ошибок для удобства
+        report_lines.append("Примеры ошибок (tg_id: ошибка):")
+        for uid, err in await get_failed_deliveries(job.id, limit=10):
+            report_lines.append(f"{uid}: {err}")
+    return "\n".join(report_lines)
+
+
+async def _safe_send(bot: Bot, chat_id: int, text: str) -> None:
+    try:
+        await bot.send_message(chat_id, text)
+    except Exception:
+        logger.exception("Failed to send announcement report to %s", chat_id)
+
+
+announcement_worker = AnnouncementWorker()
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import AsyncIterable, Awaitable, Callable, List, Optional, Tuple
+
+from aiogram.exceptions import (
+    TelegramRetryAfter, TelegramNetworkError, TelegramServerError, TelegramAPIError,
+    TelegramForbiddenError, TelegramNotFound, TelegramBadRequest
+)
+
+logger = logging.getLogger(__name__)
+
+# Сколько получателей обрабатывается одновременно; темп задаёт ограничитель сессии Bot
+CONCURRENCY = 20
+MAX_RETRIES = 3
+
+_UNREACHABLE_MARKERS = ("chat not found", "user not found", "peer_id_invalid", "user is deactivated")
+
+
+def is_unreachable_error(error: Exception) -> bool:
+    """Ошибка означает, что пользователю больше нельзя писать (заблокировал бота, удалил аккаунт)."""
+    if isinstance(error, (TelegramForbiddenError, TelegramNotFound)):
+        return True
+    if isinstance(error, TelegramBadRequest):
+        message = (error.message or "").lower()
+        return any(marker in message for marker in _UNREACHABLE_MARKERS)
+    return False
+
+
+@dataclass(frozen=True, slots=True)
+class DeliveryError:
+    text: str
+    unreachable: bool = False
+
+
+SendFunc = Callable[[int], Awaitable[object]]
+# Вызывается после каждой попытки доставки: (chat_id, ошибка или None)
+ResultCallback = Callable[[int, Optional[DeliveryError]], Awaitable[None]]
+
+
+@dataclass
+class BroadcastReport:
+    total: int = 0
+    sent: int = 0
+    failed: List[Tuple[int, str]] = field(default_factory=list)
+    unreachable: List[int] = field(default_factory=list)
+
+
+class Broadcaster:
+    """
+    Рассылка с ограниченной параллельностью.
+    Темп отправки и паузы по TelegramRetryAfter — забота общего ограничителя сессии Bot
+    (app/utils/rate_limiter.py): он же делит лимит между рассылкой и ответами пользователям.
+    Здесь — только очередь получателей и повторы при сетевых ошибках.
+    """
+
+    def __init__(self, *, concurrency: int = CONCURRENCY, max_retries: int = MAX_RETRIES):
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+
+    async def _deliver(self, chat_id: int, send: SendFunc) -> Optional[DeliveryError]:
+        """Отправить одному получателю. Возвращает ошибку или None при успехе."""
+        attempt = 0
+        while True:
+            try:
+                await send(chat_id)
+                return None
+            except TelegramRetryAfter as e:
+                # Ограничитель уже выждал и повторил запрос max_retries раз
+                return DeliveryError(str(e))
+            except (TelegramNetworkError, TelegramServerError) as e:
+                if attempt >= self.max_retries:
+                    return DeliveryError(str(e))
+                await asyncio.sleep(2 ** attempt)
+            except Exception as e:
+                return DeliveryError(str(e), unreachable=is_unreachable_error(e))
+            attempt += 1
+
+    async def run(self, recipients: AsyncIterable[int], send: SendFunc,
+                  on_result: ResultCallback = None) -> BroadcastReport:
+        report = BroadcastReport()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+
+        async def worker():
+            while True:
+                chat_id = await queue.get()
+                try:
+                    error = await self._deliver(chat_id, send)
+                    if error is None:
+                        report.sent += 1
+                    else:
+                        report.failed.append((chat_id, error.text))
+                        if error.unreachable:
+                            report.unreachable.append(chat_id)
+                    if on_result is not None:
+                        try:
+                            await on_result(chat_id, error)
+                        except Exception:
+                            logger.exception("Broadcast result callback failed")
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            async for chat_id in recipients:
+                report.total += 1
+                await queue.put(chat_id)
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        return report
+
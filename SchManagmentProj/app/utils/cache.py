@@ -0,0 +1,85 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+# Маркер отсутствующего значения — позволяет кэшировать None
+MISSING = object()
+
+
+class TTLCache:
+    """LRU-кэш ограниченного размера, записи которого устаревают через ttl секунд."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        # Ключи, которые сейчас загружаются через get_or_load
+        self._loading: Dict[Hashable, asyncio.Future] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at <= self._clock():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float = None) -> None:
+        expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        # Вытесняем самые давно использованные записи
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: float = None) -> Any:
+        """
+        Значение из кэша, а при промахе — результат loader().
+        Одновременные промахи по одному ключу ждут одну и ту же загрузку.
+        """
+        value = self.get(key, MISSING)
+        if value is not MISSING:
+            return value
+        future = self._loading.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            value = await loader()
+        except BaseException as e:
+            if self._loading.get(key) is future:
+                del self._loading[key]
+            future.set_exception(e)
+            # Ожидающих может не быть — не даём asyncio ругаться на непрочитанное исключение
+            future.exception()
+            raise
+        # Если ключ инвалидировали во время загрузки, результат мог устареть — не сохраняем его
+        if self._loading.get(key) is future:
+            del self._loading[key]
+            self.set(key, value, ttl)
+        future.set_result(value)
+        return value
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        self._loading.pop(key, None)
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self) -> None:
+        self._loading.clear()
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, MISSING) is not MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,178 @@
+import inspect
+import logging
+from datetime import date
+from typing import Any, ClassVar, Dict, Optional, Tuple, Union, get_args, get_origin
+
+from aiogram.filters import Filter
+from aiogram.types import CallbackQuery
+
+logger = logging.getLogger(__name__)
+
+SEPARATOR = ":"
+# Лимит Telegram на callback_data в байтах
+MAX_LENGTH = 64
+
+_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+# Даты храним числом дней от 2000-01-01: текущие даты укладываются в 3 символа base36
+_DATE_EPOCH = date(2000, 1, 1).toordinal()
+
+
+def encode_int(value: int) -> str:
+    if value < 0:
+        return "-" + encode_int(-value)
+    if value < 36:
+        return _DIGITS[value]
+    chars = []
+    while value:
+        value, rest = divmod(value, 36)
+        chars.append(_DIGITS[rest])
+    return "".join(reversed(chars))
+
+
+def decode_int(raw: str) -> int:
+    return int(raw, 36)
+
+
+def encode_date(value: date) -> str:
+    return encode_int(value.toordinal() - _DATE_EPOCH)
+
+
+def decode_date(raw: str) -> date:
+    return date.fromordinal(int(raw, 36) + _DATE_EPOCH)
+
+
+def encode_token(value: str) -> str:
+    if not value or SEPARATOR in value:
+        raise ValueError(f"Callback token must be non-empty and must not contain {SEPARATOR!r}: {value!r}")
+    return value
+
+
+def decode_token(raw: str) -> str:
+    return raw
+
+
+# Тип поля -> (кодирование, декодирование)
+_CODECS = {
+    int: (encode_int, decode_int),
+    date: (encode_date, decode_date),
+    str: (encode_token, decode_token),
+}
+
+
+class CompactCallback:
+    """
+    Компактные callback-данные вида "<code>:<поле>:<поле>".
+    Поля объявляются аннотациями: int и date пакуются в base36, str — короткий токен без ':'.
+    Optional-поля идут в конце и могут опускаться; пустое значение означает None.
+    """
+    code: ClassVar[str]
+    _fields: ClassVar[Tuple[Tuple[str, Any, Any], ...]] = ()
+    _required: ClassVar[int] = 0
+    _codes: ClassVar[Dict[str, type]] = {}
+
+    def __init_subclass__(cls, code: str, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not code or SEPARATOR in code:
+            raise ValueError(f"Invalid callback code {code!r}")
+        if code in CompactCallback._codes:
+            raise ValueError(f"Callback code {code!r} is already used by {CompactCallback._codes[code].__name__}")
+        CompactCallback._codes[code] = cls
+        cls.code = code
+
+        fields = []
+        required = 0
+        for name, hint in inspect.get_annotations(cls).items():
+            if get_origin(hint) is ClassVar:
+                continue
+            args = get_args(hint)
+            optional = get_origin(hint) is Union and type(None) in args
+            if optional:
+                hint = next(arg for arg in args if arg is not type(None))
+                setattr(cls, name, None)
+            elif required < len(fields):
+                raise TypeError(f"{cls.__name__}.{name}: required field after optional one")
+            else:
+                required += 1
+            if hint not in _CODECS:
+                raise TypeError(f"{cls.__name__}.{name}: unsupported callback field type {hint!r}")
+            fields.append((name, *_CODECS[hint]))
+
+        cls._fields = tuple(fields)
+        cls._required = required
+
+    def __init__(self, *args, **kwargs):
+        if len(args) > len(self._fields):
+            raise TypeError(f"{type(self).__name__} takes at most {len(self._fields)} fields")
+        for (name, _, _), value in zip(self._fields, args):
+            kwargs[name] = value
+        for index, (name, _, _) in enumerate(self._fields):
+            if name in kwargs:
+                setattr(self, name, kwargs.pop(name))
+            elif index < self._required:
+                raise TypeError(f"{type(self).__name__}: missing required field {name!r}")
+        if kwargs:
+            raise TypeError(f"{type(self).__name__}: unknown fields {', '.join(kwargs)}")
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name, _, _ in self._fields)
+        return f"{type(self).__name__}({values})"
+
+    def __eq__(self, other) -> bool:
+        return type(other) is type(self) and self.__dict__ == other.__dict__
+
+    def pack(self) -> str:
+        parts = [self.code]
+        for name, encode, _ in self._fields:
+            value = getattr(self, name)
+            parts.append("" if value is None else encode(value))
+        # Пустые хвостовые поля не передаём
+        while len(parts) > 1 and not parts[-1]:
+            parts.pop()
+        packed = SEPARATOR.join(parts)
+        if len(packed.encode()) > MAX_LENGTH:
+            raise ValueError(f"Callback data is longer than {MAX_LENGTH} bytes: {packed!r}")
+        return packed
+
+    @classmethod
+    def unpack(cls, data: str) -> "CompactCallback":
+        """Разбирает и проверяет callback_data. При любой ошибке формата — ValueError."""
+        code, *values = data.split(SEPARATOR)
+        if code != cls.code:
+            raise ValueError(f"Callback data {data!r} is not {cls.__name__}")
+        if not cls._required <= len(values) <= len(cls._fields):
+            raise ValueError(f"Wrong number of fields in callback data {data!r}")
+
+        callback = cls.__new__(cls)
+        for index, ((name, _, decode), raw) in enumerate(zip(cls._fields, values)):
+            if raw:
+                setattr(callback, name, decode(raw))
+            elif index < cls._required:
+                raise ValueError(f"Empty required field {name!r} in callback data {data!r}")
+        return callback
+
+    @classmethod
+    def filter(cls) -> "CompactCallbackFilter":
+        return CompactCallbackFilter(cls)
+
+
+class CompactCallbackFilter(Filter):
+    """Пропускает callback своего типа и передаёт в хендлер разобранный объект как callback_data."""
+    __slots__ = ("callback_type", "prefix")
+
+    def __init__(self, callback_type: type):
+        self.callback_type = callback_type
+        self.prefix = callback_type.code + SEPARATOR
+
+    async def __call__(self, query: CallbackQuery) -> Union[bool, Dict[str, Any]]:
+        data = query.data
+        if not data or (data != self.callback_type.code and not data.startswith(self.prefix)):
+            return False
+        try:
+            return {"callback_data": self.callback_type.unpack(data)}
+        except (ValueError, OverflowError):
+            logger.warning("Malformed callback data %r", data)
+            return False
+
+
+def is_compact_callback(data: Optional[str]) -> bool:
+    return bool(data) and data.split(SEPARATOR, 1)[0] in CompactCallback._codes
@@ -0,0 +1,79 @@
+import logging
+from typing import Any, Callable, Dict, Tuple, Type, Union
+
+from aiogram import Router
+from aiogram.dispatcher.event.handler import CallableObject
+from aiogram.types import CallbackQuery
+
+from app.utils.callback_codec import SEPARATOR, CompactCallback
+from app.utils.metrics import set_route
+
+logger = logging.getLogger(__name__)
+
+
+class CallbackTable:
+    """
+    Таблица callback-хендлеров: callback_data разбирается один раз, а хендлер находится поиском в словаре
+    по коду CompactCallback или по строке целиком — без перебора фильтров во всех роутерах.
+    Хендлеры вызываются с теми же аргументами, что и через router.callback_query.
+    """
+
+    def __init__(self):
+        self._by_code: Dict[str, Tuple[Type[CompactCallback], CallableObject]] = {}
+        self._by_data: Dict[str, CallableObject] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_code) + len(self._by_data)
+
+    def _check_free(self, key: str) -> None:
+        if key in self._by_code or key in self._by_data:
+            raise ValueError(f"Callback {key!r} already has a handler")
+
+    def action(self, callback_type: Type[CompactCallback]) -> Callable:
+        """Хендлер для CompactCallback: разобранный объект приходит параметром callback_data."""
+        def decorator(handler: Callable) -> Callable:
+            self._check_free(callback_type.code)
+            self._by_code[callback_type.code] = (callback_type, CallableObject(handler))
+            return handler
+        return decorator
+
+    def data(self, value: str) -> Callable:
+        """Хендлер для кнопки с фиксированной callback_data (аналог F.data == value)."""
+        def decorator(handler: Callable) -> Callable:
+            self._check_free(value)
+            self._by_data[value] = CallableObject(handler)
+            return handler
+        return decorator
+
+    async def match(self, query: CallbackQuery) -> Union[bool, Dict[str, Any]]:
+        data = query.data
+        if not data:
+            return False
+        handler = self._by_data.get(data)
+        if handler is not None:
+            return {"callback_handler": handler}
+
+        entry = self._by_code.get(data.split(SEPARATOR, 1)[0])
+        if entry is None:
+            return False
+        callback_type, handler = entry
+        try:
+            callback_data = callback_type.unpack(data)
+        except (ValueError, OverflowError):
+            # Такой callback дойдёт до stale_callback_router
+            logger.warning("Malformed callback data %r", data)
+            return False
+        return {"callback_handler": handler, "callback_data": callback_data}
+
+    @staticmethod
+    async def dispatch(callback_query: CallbackQuery, callback_handler: CallableObject, **kwargs: Any) -> Any:
+        # В метриках маршрут — настоящий хендлер, а не общий dispatch
+        set_route(callback_handler.callback)
+        return await callback_handler.call(callback_query, **kwargs)
+
+    def setup(self, router: Router) -> None:
+        """
+        Регистрирует таблицу одним хендлером роутера. Собственные хендлеры роутера проверяются раньше
+        вложенных, а его middleware применяются так же, как к обычным хендлерам.
+        """
+        router.callback_query.register(self.dispatch, self.match)
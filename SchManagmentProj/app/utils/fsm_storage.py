@@ -0,0 +1,139 @@
+import json
+import logging
+import time
+from datetime import datetime, date, timedelta
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from aiogram.exceptions import DataNotDictLikeError
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+
+from app.database.requests.fsm_requests import (
+    get_fsm_record, save_fsm_record, delete_fsm_record, delete_expired_fsm_records
+)
+from app.utils.cache import TTLCache, MISSING
+
+logger = logging.getLogger(__name__)
+
+# Брошенная форма живёт сутки с последнего изменения
+STATE_TTL = timedelta(hours=24)
+# Сколько пользователей держим в памяти и как долго
+CACHE_SIZE = 1000
+CACHE_TTL = 300.0
+# Как часто удалять устаревшие формы из БД, секунды
+PURGE_INTERVAL = 3600.0
+
+_EMPTY: Tuple[Optional[str], Dict[str, Any], Optional[datetime]] = (None, {}, None)
+
+
+def _encode(value: Any) -> Any:
+    # В данных форм лежат только id, строки и даты — их и поддерживаем
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable for FSM storage")
+
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1:
+        if "$dt" in obj:
+            return datetime.fromisoformat(obj["$dt"])
+        if "$d" in obj:
+            return date.fromisoformat(obj["$d"])
+    return obj
+
+
+def dumps_data(data: Mapping[str, Any]) -> str:
+    return json.dumps(data, default=_encode, ensure_ascii=False, separators=(",", ":"))
+
+
+def loads_data(raw: str) -> Dict[str, Any]:
+    return json.loads(raw, object_hook=_decode) if raw else {}
+
+
+def _key_to_str(key: StorageKey) -> str:
+    return (f"{key.bot_id}:{key.chat_id}:{key.user_id}:{key.thread_id or ''}:"
+            f"{key.business_connection_id or ''}:{key.destiny}")
+
+
+class SQLiteStorage(BaseStorage):
+    """
+    Хранилище FSM в SQLite: формы переживают перезапуск бота.
+    Перед БД стоит небольшой LRU-кэш, неактивные дольше state_ttl формы удаляются.
+    """
+
+    def __init__(self, state_ttl: timedelta = STATE_TTL, cache_size: int = CACHE_SIZE,
+                 cache_ttl: float = CACHE_TTL, purge_interval: float = PURGE_INTERVAL):
+        self.state_ttl = state_ttl
+        self.purge_interval = purge_interval
+        # key -> (state, data, updated_at); пустые записи тоже кэшируются,
+        # т.к. состояние запрашивается на каждый апдейт
+        self._cache = TTLCache(cache_size, cache_ttl)
+        self._purged_at = time.monotonic()
+
+    def _is_expired(self, updated_at: Optional[datetime]) -> bool:
+        return updated_at is not None and updated_at < datetime.now() - self.state_ttl
+
+    async def _load(self, key: StorageKey) -> Tuple[Optional[str], Dict[str, Any], Optional[datetime]]:
+        record = self._cache.get(key, MISSING)
+        if record is MISSING:
+            row = await get_fsm_record(_key_to_str(key))
+            record = _EMPTY if row is None else (row[0], loads_data(row[1]), row[2])
+            self._cache.set(key, record)
+        if self._is_expired(record[2]):
+            await delete_fsm_record(_key_to_str(key))
+            self._cache.set(key, _EMPTY)
+            return _EMPTY
+        return record
+
+    async def _save(self, key: StorageKey, state: Optional[str], data: Dict[str, Any]) -> None:
+        if state is None and not data:
+            # Пустая форма — строку в БД не держим
+            await delete_fsm_record(_key_to_str(key))
+            self._cache.set(key, _EMPTY)
+        else:
+            now = datetime.now()
+            await save_fsm_record(_key_to_str(key), state, dumps_data(data), now)
+            self._cache.set(key, (state, data, now))
+        await self._maybe_purge()
+
+    async def _maybe_purge(self) -> None:
+        if time.monotonic() - self._purged_at < self.purge_interval:
+            return
+        self._purged_at = time.monotonic()
+        try:
+            await self.purge_expired()
+        except Exception:
+            logger.exception("Failed to purge expired FSM states")
+
+    async def purge_expired(self) -> int:
+        """Удаляет из БД формы, которые не менялись дольше state_ttl."""
+        removed = await delete_expired_fsm_records(datetime.now() - self.state_ttl)
+        if removed:
+            logger.info("Removed %s expired FSM states", removed)
+        return removed
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        state = state.state if isinstance(state, State) else state
+        _, data, _ = await self._load(key)
+        await self._save(key, state, data)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        state, _, _ = await self._load(key)
+        return state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        if not isinstance(data, dict):
+            raise DataNotDictLikeError(
+                f"Data must be a dict or dict-like object, got {type(data).__name__}"
+            )
+        state, _, _ = await self._load(key)
+        await self._save(key, state, data.copy())
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        _, data, _ = await self._load(key)
+        return data.copy()
+
+    async def close(self) -> None:
+        self._cache.clear()
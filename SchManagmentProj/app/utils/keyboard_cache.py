@@ -0,0 +1,58 @@
+import functools
+import inspect
+from typing import Any, Callable, Dict
+
+from app.utils.cache import TTLCache
+
+# Готовые клавиатуры: (билдер, входные данные) -> InlineKeyboardMarkup.
+# Клавиатуры неизменяемы после сборки, поэтому один объект можно отдавать всем
+keyboard_cache = TTLCache(4096, 3600.0)
+
+# Версии данных, из которых строятся клавиатуры. Версию запоминают вместе с загруженными данными
+# и передают в ключ через converters (см. WeekSchedule.version)
+_versions: Dict[str, int] = {}
+
+
+def bump_version(name: str) -> None:
+    """Вызывается при изменении данных: клавиатуры, зависящие от версии name, соберутся заново."""
+    _versions[name] = _versions.get(name, 0) + 1
+
+
+def get_version(name: str) -> int:
+    """
+    Текущая версия данных. Если клавиатура строится из загруженных данных, версию нужно запомнить
+    до загрузки и передать в ключ: иначе данные, устаревшие во время загрузки, попадут в кэш под новой версией.
+    """
+    return _versions.get(name, 0)
+
+
+def clear_keyboard_cache() -> None:
+    keyboard_cache.clear()
+
+
+def memoize_keyboard(**converters: Callable[[Any], Any]):
+    """
+    Кэширует результат билдера клавиатуры.
+    converters — как превратить аргумент в хэшируемый ключ (например, ORM-объект в его id и поля,
+    которые попадают в клавиатуру). Остальные аргументы должны быть хэшируемыми сами по себе.
+    """
+    def decorator(builder):
+        signature = inspect.signature(builder)
+        name = builder.__qualname__
+
+        @functools.wraps(builder)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            inputs = tuple(converters[arg](value) if arg in converters else value
+                           for arg, value in bound.arguments.items())
+            key = (name, inputs)
+            keyboard = keyboard_cache.get(key)
+            if keyboard is None:
+                keyboard = builder(*args, **kwargs)
+                keyboard_cache.set(key, keyboard)
+            return keyboard
+
+        return wrapper
+
+    return decorator
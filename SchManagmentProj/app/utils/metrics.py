@@ -0,0 +1,266 @@
+"""
+Метрики бота в памяти процесса: счётчики и гистограммы с фиксированными корзинами.
+Отдаются в текстовом формате Prometheus (MetricsServer, /metrics) и сводкой для администратора (/metrics в боте).
+
+Время обработки апдейта, время запросов к БД и к Bot API внутри него собираются в UpdateTiming текущего апдейта
+(contextvars) — см. app/middlewares/metrics_middlewares.py и app/utils/sql_monitor.py.
+"""
+import bisect
+import logging
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# Верхние границы корзин, секунды
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Число SQL-запросов на апдейт
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 50)
+
+# Имя метрики -> (тип, описание)
+DESCRIPTIONS = {
+    "bot_updates_total": ("counter", "Processed updates by route and result"),
+    "bot_updates_in_flight": ("gauge", "Updates being processed right now"),
+    "bot_update_duration_seconds": ("histogram", "Update processing time by route"),
+    "bot_update_db_seconds": ("histogram", "Time spent in database queries per update"),
+    "bot_update_api_seconds": ("histogram", "Time spent in Bot API calls per update"),
+    "bot_update_queries": ("histogram", "Database queries per update"),
+    "bot_repeated_queries_total": ("counter", "Updates that ran one statement shape too many times (N+1)"),
+    "bot_query_budget_exceeded_total": ("counter", "Updates that exceeded the route query budget"),
+    "bot_slow_queries_total": ("counter", "Queries slower than the slow query threshold"),
+    "bot_db_query_duration_seconds": ("histogram", "Database query time by engine"),
+    "bot_api_request_duration_seconds": ("histogram", "Bot API call time by method"),
+    "bot_api_errors_total": ("counter", "Failed Bot API calls by method and error"),
+    "bot_outbound_queue_depth": ("gauge", "Outbound calls waiting for the rate limiter by lane"),
+    "bot_outbound_wait_seconds": ("histogram", "Time outbound calls waited for the rate limiter by lane"),
+    "bot_outbound_retry_after_total": ("counter", "Flood control (429) responses by lane"),
+    "bot_outbox_sent_total": ("counter", "Notifications delivered from the outbox"),
+    "bot_outbox_retries_total": ("counter", "Outbox deliveries rescheduled after a temporary error"),
+    "bot_outbox_failed_total": ("counter", "Outbox notifications given up on"),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        # Последняя корзина — значения больше верхней границы (+Inf)
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other: "Histogram") -> None:
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.sum += other.sum
+        self.count += other.count
+
+    def quantile(self, q: float) -> float:
+        """Оценка квантиля линейной интерполяцией внутри корзины (как histogram_quantile в Prometheus)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = ['{}="{}"'.format(key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+             for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Metrics:
+    def __init__(self):
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.gauges: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self.started_at = time.time()
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, _labels(labels))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def add(self, name: str, value: float, **labels) -> None:
+        key = (name, _labels(labels))
+        self.gauges[key] = self.gauges.get(key, 0) + value
+
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...] = LATENCY_BUCKETS, **labels) -> None:
+        key = (name, _labels(labels))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(buckets)
+        histogram.observe(value)
+
+    def reset(self) -> None:
+        self.counters.clear()
+        self.gauges.clear()
+        self.histograms.clear()
+        self.started_at = time.time()
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus."""
+        series: Dict[str, List[str]] = {}
+        for (name, labels), value in [*self.counters.items(), *self.gauges.items()]:
+            series.setdefault(name, []).append(f"{name}{_format_labels(labels)} {value:g}")
+        for (name, labels), histogram in self.histograms.items():
+            lines = series.setdefault(name, [])
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                bucket_labels = _format_labels(labels, 'le="%g"' % bound)
+                lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+            bucket_labels = _format_labels(labels, 'le="+Inf"')
+            lines.append(f"{name}_bucket{bucket_labels} {histogram.count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+        output = []
+        for name in sorted(series):
+            kind, description = DESCRIPTIONS.get(name, ("untyped", name))
+            output.append(f"# HELP {name} {description}")
+            output.append(f"# TYPE {name} {kind}")
+            output.extend(series[name])
+        return "\n".join(output) + "\n"
+
+    def merged(self, name: str, by: str) -> Dict[str, Histogram]:
+        """Гистограммы метрики, сложенные по значению одной метки."""
+        result: Dict[str, Histogram] = {}
+        for (metric, labels), histogram in self.histograms.items():
+            if metric != name:
+                continue
+            value = dict(labels).get(by, "")
+            if value not in result:
+                result[value] = Histogram(histogram.buckets)
+            result[value].merge(histogram)
+        return result
+
+    def summary(self, limit: int = 15) -> str:
+        """Короткая сводка по маршрутам для команды администратора."""
+        durations = self.merged("bot_update_duration_seconds", "route")
+        if not durations:
+            return "Апдейтов пока не было."
+        db = self.merged("bot_update_db_seconds", "route")
+        api = self.merged("bot_update_api_seconds", "route")
+        queries = self.merged("bot_update_queries", "route")
+        errors: Dict[str, float] = {}
+        for (name, labels), value in self.counters.items():
+            labels = dict(labels)
+            if name == "bot_updates_total" and labels.get("status") == "error":
+                errors[labels["route"]] = errors.get(labels["route"], 0) + value
+
+        total = sum(histogram.count for histogram in durations.values())
+        uptime = time.time() - self.started_at
+        lines = [f"Апдейтов: {total} за {uptime / 60:.0f} мин, ошибок: {sum(errors.values()):g}",
+                 "маршрут: число, p50/p95 мс, БД/API мс и SQL-запросов в среднем"]
+        # Сначала маршруты, на которые уходит больше всего времени
+        for route, histogram in sorted(durations.items(), key=lambda item: item[1].sum, reverse=True)[:limit]:
+            count = histogram.count
+            line = (f"{route}: {count}, {histogram.quantile(0.5) * 1000:.0f}/{histogram.quantile(0.95) * 1000:.0f}, "
+                    f"{db[route].sum / count * 1000:.0f}/{api[route].sum / count * 1000:.0f}, "
+                    f"{queries[route].sum / count:.1f}")
+            if errors.get(route):
+                line += f", ошибок {errors[route]:g}"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+metrics = Metrics()
+
+
+@dataclass
+class UpdateTiming:
+    """Что известно об апдейте, который обрабатывается в текущем контексте."""
+    route: str = "unhandled"
+    db_seconds: float = 0.0
+    db_queries: int = 0
+    api_seconds: float = 0.0
+    api_calls: int = 0
+    # Сколько раз выполнялся запрос каждой формы (текст без значений параметров)
+    statements: Counter = field(default_factory=Counter)
+
+
+_current_update: ContextVar[Optional[UpdateTiming]] = ContextVar("current_update", default=None)
+
+
+def current_update() -> Optional[UpdateTiming]:
+    return _current_update.get()
+
+
+def start_update(timing: UpdateTiming):
+    return _current_update.set(timing)
+
+
+def finish_update(token) -> None:
+    _current_update.reset(token)
+
+
+def route_name(callback: Callable) -> str:
+    # Модуль хендлеров соответствует роутеру: "task_handlers.callback_task_info"
+    return f"{callback.__module__.rsplit('.', 1)[-1]}.{callback.__qualname__}"
+
+
+def set_route(callback: Callable) -> None:
+    timing = _current_update.get()
+    if timing is not None:
+        timing.route = route_name(callback)
+
+
+class MetricsServer:
+    """Маленький HTTP-сервер с единственным адресом /metrics для Prometheus."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9101):
+        self.host = host
+        self.port = port
+        self._runner: Optional[web.AppRunner] = None
+
+    @classmethod
+    def from_env(cls) -> Optional["MetricsServer"]:
+        """Сервер включается переменной BOT_METRICS_PORT; адрес — BOT_METRICS_HOST (по умолчанию только локально)."""
+        port = os.getenv("BOT_METRICS_PORT")
+        if not port:
+            return None
+        return cls(host=os.getenv("BOT_METRICS_HOST", "127.0.0.1"), port=int(port))
+
+    async def handle(self, request: web.Request) -> web.Response:
+        return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8")
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info("Metrics server listening on %s:%s/metrics", self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -1,45 +1,108 @@
-from typing import Any, Optional
-from aiogram.exceptions import TelegramNotFound
-from sqlalchemy import select
+import asyncio
+from contextlib import nullcontext
+from dataclasses import dataclass
+from enum import Enum as PyEnum
+from typing import Any, Dict, Iterable, List, Optional
 
-from app.database.engine_base import async_session
-from app.database.models.user_models import User
-from app.database.requests.user_requests import get_user_data
+from aiogram import Bot
+
+from app.database.requests.user_requests import get_notification_targets, mark_users_unreachable
+from app.utils.broadcast import is_unreachable_error
+from app.utils.rate_limiter import bulk_lane
 from app.bot import get_bot
 
+# Сколько уведомлений отправляется одновременно; темп отправки задаёт ограничитель сессии (rate_limiter)
+NOTIFY_CONCURRENCY = 10
 
-async def send_notification_by_id(user_id: int, send_content: str, sender_tg_id: int = None,
-                                  reply_markup: Optional[Any] = None) -> bool:
-    # Проверки входных данных
-    if not isinstance(user_id, int) or user_id <= 0:
-        return False
+
+class NotificationStatus(PyEnum):
+    sent = "sent"
+    not_found = "not_found"  # пользователя нет в базе
+    inactive = "inactive"  # заблокирован, удалён или уже помечен недоступным
+    unreachable = "unreachable"  # доставка показала, что писать пользователю больше нельзя
+    failed = "failed"
+
+
+@dataclass(frozen=True, slots=True)
+class NotificationResult:
+    user_id: int
+    status: NotificationStatus
+    tg_id: Optional[int] = None
+    error: Optional[str] = None
+
+    @property
+    def sent(self) -> bool:
+        return self.status == NotificationStatus.sent
+
+
+async def send_notifications(user_ids: Iterable[int], send_content: str, reply_markup: Optional[Any] = None,
+                             concurrency: int = NOTIFY_CONCURRENCY) -> List[NotificationResult]:
+    """
+    Уведомление многим пользователям: получатели выбираются одним запросом, доставка идёт параллельно
+    ограниченным пулом. Результат — по одному на каждый уникальный user_id, в порядке user_ids.
+    """
+    ids = list(dict.fromkeys(user_ids))
     if not isinstance(send_content, str) or not send_content.strip():
-        return False
+        return [NotificationResult(user_id, NotificationStatus.failed, error="Пустое сообщение") for user_id in ids]
 
-    # Получение пользователя из базы, проверки статусов
-    try:
-        user_data = await get_user_data(user_id)
-        if not user_data:
-            return False
-
-        if user_data.get("is_banned") or user_data.get("is_deleted"):
-            return False
-        tg_id = user_data.get("tg_id")
-        if not tg_id:
-            return False
-    except Exception:
-        return False
+    results: Dict[int, NotificationResult] = {}
+    valid_ids = []
+    for user_id in ids:
+        if isinstance(user_id, int) and user_id > 0:
+            valid_ids.append(user_id)
+        else:
+            results[user_id] = NotificationResult(user_id, NotificationStatus.not_found)
 
-    try:
-        bot = get_bot()
-    except RuntimeError:
-        return False
+    # Получение пользователей из базы, проверки статусов
+    targets = await get_notification_targets(valid_ids) if valid_ids else {}
+    recipients: Dict[int, int] = {}  # tg_id -> user_id
+    for user_id in valid_ids:
+        target = targets.get(user_id)
+        if target is None or not target.tg_id:
+            results[user_id] = NotificationResult(user_id, NotificationStatus.not_found)
+        elif target.is_banned or target.is_deleted or target.unreachable_at:
+            results[user_id] = NotificationResult(user_id, NotificationStatus.inactive, tg_id=target.tg_id)
+        else:
+            recipients[target.tg_id] = user_id
+
+    if recipients:
+        try:
+            delivered = await _deliver(get_bot(), recipients, send_content, reply_markup, concurrency)
+        except RuntimeError as e:
+            # Бот не инициализирован
+            delivered = [NotificationResult(user_id, NotificationStatus.failed, tg_id=tg_id, error=str(e))
+                         for tg_id, user_id in recipients.items()]
+        for result in delivered:
+            results[result.user_id] = result
+        # Больше не тратим на этих пользователей лимиты
+        await mark_users_unreachable([result.tg_id for result in delivered
+                                      if result.status == NotificationStatus.unreachable])
+
+    return [results[user_id] for user_id in ids]
+
+
+async def _deliver(bot: Bot, recipients: Dict[int, int], send_content: str, reply_markup: Optional[Any],
+                   concurrency: int) -> List[NotificationResult]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def deliver_one(tg_id: int, user_id: int) -> NotificationResult:
+        async with semaphore:
+            try:
+                await bot.send_message(chat_id=tg_id, text=send_content, reply_markup=reply_markup)
+            except Exception as e:
+                status = NotificationStatus.unreachable if is_unreachable_error(e) else NotificationStatus.failed
+                return NotificationResult(user_id, status, tg_id=tg_id, error=str(e))
+        return NotificationResult(user_id, NotificationStatus.sent, tg_id=tg_id)
 
+    # Одиночное уведомление — ответ на действие пользователя, пачка уступает лимит интерактивным ответам
+    with bulk_lane() if len(recipients) > 1 else nullcontext():
+        return await asyncio.gather(*(deliver_one(tg_id, user_id) for tg_id, user_id in recipients.items()))
+
+
+async def send_notification_by_id(user_id: int, send_content: str, sender_tg_id: int = None,
+                                  reply_markup: Optional[Any] = None) -> bool:
     try:
-        await bot.send_message(chat_id=tg_id, text=send_content, reply_markup=reply_markup)
-    except TelegramNotFound:
-        return False
+        results = await send_notifications([user_id], send_content, reply_markup=reply_markup)
     except Exception:
         return False
-
-    return True
+    return bool(results) and results[0].sent
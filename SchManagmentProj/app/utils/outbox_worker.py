@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from aiogram import Bot
+from aiogram.types import InlineKeyboardMarkup
+
+from app.bot import get_bot
+from app.database.models.outbox_models import OutboxNotification
+from app.database.requests.outbox_requests import complete_outbox, get_due_outbox, get_next_outbox_attempt
+from app.database.requests.user_requests import get_notification_targets, mark_users_unreachable
+from app.utils.broadcast import is_unreachable_error
+from app.utils.metrics import metrics
+from app.utils.notif_sender import NOTIFY_CONCURRENCY
+from app.utils.rate_limiter import bulk_lane
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 30.0
+# Сколько уведомлений забирается из outbox за раз
+BATCH_SIZE = 50
+# Повторы при временных ошибках: 5 с, 10 с, 20 с … но не реже раза в час
+RETRY_BASE_DELAY = 5.0
+RETRY_MAX_DELAY = 3600.0
+MAX_ATTEMPTS = 8
+
+
+def retry_delay(attempts: int) -> float:
+    """Пауза перед следующей попыткой после attempts неудачных."""
+    return min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+
+
+class OutboxWorker:
+    """
+    Фоновая доставка уведомлений из outbox (см. app/database/models/outbox_models.py).
+    Запись удаляется только после успешной отправки, поэтому перезапуск бота ничего не теряет:
+    в худшем случае уведомление, отправленное прямо перед остановкой, придёт повторно.
+    """
+
+    def __init__(self, poll_interval: float = POLL_INTERVAL, batch_size: int = BATCH_SIZE,
+                 concurrency: int = NOTIFY_CONCURRENCY):
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self._bot: Optional[Bot] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    def start(self, bot: Bot = None) -> None:
+        if self._task is not None:
+            return
+        self._bot = bot or get_bot()
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def notify(self) -> None:
+        """Разбудить воркер после записи в outbox."""
+        self._wakeup.set()
+
+    async def _loop(self) -> None:
+        while True:
+            self._wakeup.clear()
+            timeout = self.poll_interval
+            try:
+                # Полная пачка — скорее всего, ждут ещё
+                while await self.deliver_due() >= self.batch_size:
+                    pass
+                next_attempt = await get_next_outbox_attempt()
+                if next_attempt is not None:
+                    timeout = min(max((next_attempt - datetime.now()).total_seconds(), 0.0), timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbox worker iteration failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def deliver_due(self) -> int:
+        """Отправляет одну пачку уведомлений, у которых подошло время. Возвращает размер пачки."""
+        now = datetime.now()
+        batch = await get_due_outbox(now, self.batch_size)
+        if not batch:
+            return 0
+
+        targets = await get_notification_targets(list({item.user_id for item in batch}))
+        sent: List[int] = []
+        retries: List[tuple] = []
+        failures: List[tuple] = []
+        unreachable: List[int] = []
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def deliver_one(item: OutboxNotification) -> None:
+            target = targets.get(item.user_id)
+            if target is None or not target.tg_id:
+                failures.append((item.id, "Пользователь не найден"))
+                return
+            if target.is_banned or target.is_deleted or target.unreachable_at:
+                failures.append((item.id, "Пользователь недоступен"))
+                return
+            markup = InlineKeyboardMarkup.model_validate_json(item.reply_markup) if item.reply_markup else None
+            async with semaphore:
+                try:
+                    await self._bot.send_message(chat_id=target.tg_id, text=item.text, reply_markup=markup)
+                except Exception as e:
+                    if is_unreachable_error(e):
+                        failures.append((item.id, str(e)))
+                        unreachable.append(target.tg_id)
+                    elif item.attempts + 1 >= MAX_ATTEMPTS:
+                        logger.warning("Outbox notification %s dropped after %d attempts: %s",
+                                       item.id, item.attempts + 1, e)
+                        failures.append((item.id, str(e)))
+                    else:
+                        retries.append((item.id, str(e), now + timedelta(seconds=retry_delay(item.attempts + 1))))
+                    return
+            sent.append(item.id)
+
+        async def flush():
+            await complete_outbox(sent, retries, failures)
+            await mark_users_unreachable(unreachable)
+            metrics.inc("bot_outbox_sent_total", len(sent))
+            metrics.inc("bot_outbox_retries_total", len(retries))
+            metrics.inc("bot_outbox_failed_total", len(failures))
+
+        try:
+            # Уведомления не срочные — уступают лимит Bot API ответам пользователям
+            with bulk_lane():
+                await asyncio.gather(*(deliver_one(item) for item in batch))
+        except asyncio.CancelledError:
+            # Остановка бота: отправленное удаляем, остальное уйдёт после перезапуска
+            await asyncio.shield(flush())
+            raise
+        await flush()
+        return len(batch)
+
+
+outbox_worker = OutboxWorker()
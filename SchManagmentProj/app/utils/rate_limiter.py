@@ -0,0 +1,161 @@
+"""
+Общий ограничитель исходящих вызовов Bot API — middleware сессии Bot (см. app/bot.py).
+
+Каждый метод отправки и редактирования сообщений ждёт свою очередь:
+- в чат — не чаще BOT_API_CHAT_RATE в секунду с запасом BOT_API_CHAT_BURST (группы — BOT_API_GROUP_RATE);
+- на весь бот — не чаще BOT_API_GLOBAL_RATE в секунду;
+- после TelegramRetryAfter пауза действует для всех, а сам запрос повторяется.
+Ответы пользователям (полоса interactive) получают глобальные токены раньше рассылок (полоса bulk).
+Рассылки помечают себя через bulk_lane().
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Deque, Dict, Optional
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+
+from app.utils.cache import TTLCache
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+LANES = (INTERACTIVE, BULK)
+
+# Лимиты Telegram: ~30 сообщений в секунду на бота, ~1 в секунду в чат и 20 в минуту в группу.
+# Берём небольшой запас, чтобы не упираться в 429
+GLOBAL_RATE = float(os.getenv("BOT_API_GLOBAL_RATE", "25"))
+GLOBAL_BURST = int(os.getenv("BOT_API_GLOBAL_BURST", "5"))
+CHAT_RATE = float(os.getenv("BOT_API_CHAT_RATE", "1"))
+# Быстрые нажатия по меню не должны ждать секунду на каждое редактирование
+CHAT_BURST = int(os.getenv("BOT_API_CHAT_BURST", "3"))
+GROUP_RATE = float(os.getenv("BOT_API_GROUP_RATE", str(20 / 60)))
+MAX_RETRIES = 3
+
+# Методы, на которые распространяются лимиты Telegram; answerCallbackQuery, getMe и т.п. идут без очереди
+_LIMITED_PREFIXES = ("Send", "Copy", "Forward", "Edit")
+
+_lane: ContextVar[str] = ContextVar("outbound_lane", default=INTERACTIVE)
+
+
+@contextmanager
+def bulk_lane():
+    """Вызовы Bot API внутри блока (и в созданных в нём задачах) идут в полосе массовой рассылки."""
+    token = _lane.set(BULK)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def is_limited(method: TelegramMethod) -> bool:
+    return type(method).__name__.startswith(_LIMITED_PREFIXES) and getattr(method, "chat_id", None) is not None
+
+
+class OutboundLimiter(BaseRequestMiddleware):
+    def __init__(self, *, global_rate: float = GLOBAL_RATE, global_burst: int = GLOBAL_BURST,
+                 chat_rate: float = CHAT_RATE, chat_burst: int = CHAT_BURST, group_rate: float = GROUP_RATE,
+                 max_retries: int = MAX_RETRIES, clock: Callable[[], float] = time.monotonic):
+        self.global_rate = global_rate
+        self.global_burst = global_burst
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+        self._clock = clock
+
+        self._tokens = float(global_burst)
+        self._updated_at = clock()
+        # Пока не наступил этот момент, Telegram просил не отправлять ничего (retry_after)
+        self._resume_at = 0.0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+        self._pump: Optional[asyncio.Task] = None
+        # chat_id -> теоретическое время следующей отправки (GCRA). Срок жизни у каждой записи свой — до её tat
+        self._chat_tat = TTLCache(maxsize=50_000)
+
+    async def __call__(self, make_request: NextRequestMiddlewareType, bot: Bot, method: TelegramMethod) -> Response:
+        if not is_limited(method):
+            return await make_request(bot, method)
+
+        lane = _lane.get()
+        attempt = 0
+        while True:
+            started = self._clock()
+            await self._wait_chat(method.chat_id)
+            await self._acquire(lane)
+            metrics.observe("bot_outbound_wait_seconds", self._clock() - started, lane=lane)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                # Лимит общий для бота — останавливаем все полосы
+                self.pause(e.retry_after or 1)
+                metrics.inc("bot_outbound_retry_after_total", lane=lane)
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                logger.warning("Flood control: all outbound calls paused for %ss", e.retry_after)
+
+    def pause(self, seconds: float) -> None:
+        self._resume_at = max(self._resume_at, self._clock() + seconds)
+
+    async def _wait_chat(self, chat_id) -> None:
+        # Группы и каналы (отрицательный id или @username) — свой, более строгий лимит
+        is_private = isinstance(chat_id, int) and chat_id > 0
+        interval = 1 / (self.chat_rate if is_private else self.group_rate)
+        now = self._clock()
+        tat = max(self._chat_tat.get(chat_id, now), now) + interval
+        # Пока tat в будущем, запись нужна: в очереди чата могут ждать отправки, и новая не должна их обогнать.
+        # Когда tat прошёл, запись ничего не меняет (max(tat, now) == now) и может исчезнуть
+        self._chat_tat.set(chat_id, tat, ttl=tat - now)
+        delay = tat - self.chat_burst * interval - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _acquire(self, lane: str) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(future)
+        metrics.add("bot_outbound_queue_depth", 1, lane=lane)
+        if self._pump is None or self._pump.done():
+            self._pump = asyncio.create_task(self._run_pump())
+        try:
+            await future
+        except asyncio.CancelledError:
+            if not future.done():
+                future.cancel()
+            raise
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        for lane in LANES:
+            queue = self._waiters[lane]
+            while queue:
+                future = queue.popleft()
+                metrics.add("bot_outbound_queue_depth", -1, lane=lane)
+                if not future.done():
+                    return future
+        return None
+
+    async def _run_pump(self) -> None:
+        """Выдаёт глобальные токены ожидающим: сначала interactive, затем bulk. Завершается, когда очередь пуста."""
+        while any(self._waiters.values()):
+            now = self._clock()
+            if self._resume_at > now:
+                await asyncio.sleep(self._resume_at - now)
+                continue
+            self._tokens = min(self.global_burst, self._tokens + (now - self._updated_at) * self.global_rate)
+            self._updated_at = now
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.global_rate)
+                continue
+            future = self._next_waiter()
+            if future is not None:
+                self._tokens -= 1
+                future.set_result(None)
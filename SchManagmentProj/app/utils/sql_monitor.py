@@ -0,0 +1,110 @@
+"""
+Наблюдение за SQL: время и число запросов на апдейт, журнал медленных запросов,
+поиск N+1 (один и тот же запрос много раз за апдейт) и бюджет запросов по маршрутам.
+
+Настройки через переменные окружения:
+    BOT_SLOW_QUERY_MS        — порог медленного запроса, мс (по умолчанию 100)
+    BOT_REPEATED_QUERY_LIMIT — сколько раз один запрос может выполниться за апдейт без предупреждения (3)
+    BOT_QUERY_BUDGET_STRICT  — 1: превышение бюджета — ошибка QueryBudgetExceeded (для проверок в CI),
+                               иначе только предупреждение в журнале
+"""
+import logging
+import os
+import re
+import time
+from functools import lru_cache
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.utils.metrics import UpdateTiming, current_update, metrics
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_SECONDS = float(os.getenv("BOT_SLOW_QUERY_MS", "100")) / 1000
+REPEATED_QUERY_LIMIT = int(os.getenv("BOT_REPEATED_QUERY_LIMIT", "3"))
+STRICT_BUDGETS = os.getenv("BOT_QUERY_BUDGET_STRICT", "") not in ("", "0")
+
+# Не больше стольких SQL-запросов на апдейт для маршрута (см. app.utils.metrics.route_name).
+# Значения — худший случай сейчас, с промахом кэша пользователя и кэшей меню; рост — повод разобраться
+QUERY_BUDGETS: Dict[str, int] = {
+    # Профиль учителя и министра дочитывает имя из базы (в кэше пользователя только поля доступа)
+    "profile_handlers.cmd_profile": 2,
+    "profile_handlers.callback_profile": 2,
+    "event_handlers.callback_event_list": 2,
+    "event_handlers.callback_event_info": 2,
+    "task_handlers.callback_task_menu": 1,
+    "task_handlers.callback_task_planer": 3,
+    "task_handlers.callback_task_planer_page": 3,
+    "task_handlers.callback_completed_task_menu": 3,
+    "task_handlers.callback_task_info": 2,
+    # Первый вызов после запуска пересчитывает счётчики трекера (см. recalculate_task_counters)
+    "task_handlers.callback_task_tracker_menu": 9,
+    "report_handlers.callback_self_task_report": 2,
+    "announcement_handlers.receive_announcement_content": 3,
+}
+
+# Значения IN (...) разворачиваются в разное число "?" — для формы запроса это один и тот же запрос
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@lru_cache(maxsize=1024)
+def statement_shape(statement: str) -> str:
+    return _IN_LIST.sub("(?)", _SPACES.sub(" ", statement).strip())
+
+
+def _short(value, limit: int = 300) -> str:
+    text = repr(value) if not isinstance(value, str) else value
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+def track_queries(engine: Engine, name: str) -> None:
+    """Время каждого запроса движка: в гистограмму по движку и в UpdateTiming текущего апдейта."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_started
+        metrics.observe("bot_db_query_duration_seconds", elapsed, engine=name)
+        timing = current_update()
+        if timing is not None:
+            timing.db_seconds += elapsed
+            timing.db_queries += 1
+            timing.statements[statement_shape(statement)] += 1
+
+        if elapsed >= SLOW_QUERY_SECONDS:
+            metrics.inc("bot_slow_queries_total", engine=name)
+            logger.warning("Slow query (%.0f ms, %s, route %s): %s; parameters: %s",
+                           elapsed * 1000, name, timing.route if timing else "-",
+                           _short(statement, 1000), _short(parameters))
+
+
+def check_update(timing: UpdateTiming) -> None:
+    """
+    Итог по SQL для успешно обработанного апдейта: предупреждение о N+1 и проверка бюджета.
+    В строгом режиме превышение бюджета вызывает QueryBudgetExceeded.
+    """
+    route = timing.route
+
+    repeated = {shape: count for shape, count in timing.statements.items() if count > REPEATED_QUERY_LIMIT}
+    if repeated:
+        metrics.inc("bot_repeated_queries_total", route=route)
+        for shape, count in repeated.items():
+            logger.warning("Possible N+1 in %s: statement ran %d times: %s", route, count, _short(shape, 1000))
+
+    budget = QUERY_BUDGETS.get(route)
+    if budget is not None and timing.db_queries > budget:
+        metrics.inc("bot_query_budget_exceeded_total", route=route)
+        message = f"{route} ran {timing.db_queries} queries, budget is {budget}"
+        if STRICT_BUDGETS:
+            raise QueryBudgetExceeded(message)
+        logger.warning("Query budget exceeded: %s", message)
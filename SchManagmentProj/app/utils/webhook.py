@@ -0,0 +1,152 @@
+import asyncio
+import hmac
+import ipaddress
+import logging
+import os
+import secrets
+from typing import List, Optional
+
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+# Сколько апдейтов может ждать обработки; при переполнении отвечаем 503 и Telegram повторит доставку
+QUEUE_SIZE = 1000
+WORKERS = 8
+# Telegram может повторно прислать апдейт, если не дождался ответа
+SEEN_UPDATES_SIZE = 10_000
+SEEN_UPDATES_TTL = 600.0
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _shard_key(update: Update) -> int:
+    # Апдейты одного пользователя обрабатываются одним воркером — по порядку, как при polling
+    try:
+        event = update.event
+    except Exception:
+        return update.update_id
+    user = getattr(event, "from_user", None)
+    if user is not None:
+        return user.id
+    chat = getattr(event, "chat", None)
+    return chat.id if chat is not None else update.update_id
+
+
+class WebhookServer:
+    """
+    Встроенный aiohttp-сервер для режима webhook.
+    Запрос проверяется по секретному токену, апдейт кладётся во внутреннюю очередь
+    и Telegram сразу получает 200 — обработка идёт в фоновых воркерах.
+    """
+
+    def __init__(self, dispatcher: Dispatcher, bot: Bot, secret_token: Optional[str] = None,
+                 path: str = "/webhook", host: str = "127.0.0.1", port: int = 8080,
+                 queue_size: int = QUEUE_SIZE, workers: int = WORKERS):
+        self.dispatcher = dispatcher
+        self.bot = bot
+        self.secret_token = secret_token
+        self.path = path
+        self.host = host
+        self.port = port
+        # Отдельная ограниченная очередь на каждого воркера
+        self._queues: List[asyncio.Queue] = [asyncio.Queue(max(queue_size // workers, 1)) for _ in range(workers)]
+        self._workers: List[asyncio.Task] = []
+        self._seen = TTLCache(SEEN_UPDATES_SIZE, SEEN_UPDATES_TTL)
+        self._runner: Optional[web.AppRunner] = None
+
+    @classmethod
+    def from_env(cls, dispatcher: Dispatcher, bot: Bot) -> "WebhookServer":
+        return cls(dispatcher, bot,
+                   secret_token=os.getenv("BOT_WEBHOOK_SECRET") or None,
+                   path=os.getenv("BOT_WEBHOOK_PATH", "/webhook"),
+                   host=os.getenv("BOT_WEBHOOK_HOST", "127.0.0.1"),
+                   port=int(os.getenv("BOT_WEBHOOK_PORT", "8080")))
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(self.path, self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if self.secret_token is not None:
+            received = request.headers.get(SECRET_HEADER, "")
+            if not hmac.compare_digest(received, self.secret_token):
+                return web.Response(status=401)
+        try:
+            update = Update.model_validate(await request.json(), context={"bot": self.bot})
+        except Exception:
+            logger.warning("Received malformed update")
+            return web.Response(status=400)
+
+        if update.update_id in self._seen:
+            return web.Response()
+        queue = self._queues[_shard_key(update) % len(self._queues)]
+        try:
+            queue.put_nowait(update)
+        except asyncio.QueueFull:
+            logger.warning("Webhook queue is full, asking Telegram to retry update %s", update.update_id)
+            return web.Response(status=503)
+        self._seen.set(update.update_id, True)
+        return web.Response()
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            update = await queue.get()
+            try:
+                await self.dispatcher.feed_update(self.bot, update)
+            except Exception:
+                logger.exception("Failed to process update %s", update.update_id)
+            finally:
+                queue.task_done()
+
+    async def start(self, url: Optional[str] = None) -> None:
+        """
+        Запустить сервер и воркеры. Если передан url — зарегистрировать webhook в Telegram.
+        Webhook без секрета принимал бы поддельные апдейты от кого угодно: если BOT_WEBHOOK_SECRET не задан,
+        при регистрации секрет генерируется на время запуска, а без url сервер слушает только loopback.
+        """
+        if url and self.secret_token is None:
+            self.secret_token = secrets.token_urlsafe(32)
+        if self.secret_token is None and not _is_loopback(self.host):
+            # Например, за reverse proxy webhook регистрируется снаружи — секрет должен быть общим
+            raise RuntimeError(f"Webhook server on {self.host} requires BOT_WEBHOOK_SECRET")
+        self._workers = [asyncio.create_task(self._worker(queue)) for queue in self._queues]
+        await self.dispatcher.emit_startup(bot=self.bot, dispatcher=self.dispatcher)
+
+        self._runner = web.AppRunner(self.build_app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info("Webhook server listening on %s:%s%s", self.host, self.port, self.path)
+
+        if url:
+            await self.bot.set_webhook(url, secret_token=self.secret_token,
+                                       allowed_updates=self.dispatcher.resolve_used_update_types())
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        # Даём дообработать уже принятые апдейты
+        try:
+            await asyncio.wait_for(asyncio.gather(*(queue.join() for queue in self._queues)), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Webhook queue was not drained in %s seconds", drain_timeout)
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        await self.dispatcher.emit_shutdown(bot=self.bot, dispatcher=self.dispatcher)
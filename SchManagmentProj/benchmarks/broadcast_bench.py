@@ -0,0 +1,95 @@
+"""
+Бенчмарк рассылки объявлений против локальной заглушки Bot API с ответами 429.
+
+Запуск из каталога SchManagmentProj:
+    python -m benchmarks.broadcast_bench --users 500 --flood 0.01
+"""
+import argparse
+import asyncio
+import time
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.exceptions import TelegramRetryAfter, TelegramAPIError
+
+from app.utils.broadcast import Broadcaster
+from app.utils.rate_limiter import OutboundLimiter
+from benchmarks.fake_bot_api import FakeBotAPI
+
+
+async def legacy_broadcast(bot: Bot, user_ids, from_chat_id: int, message_id: int):
+    """Прежний алгоритм announce_send: последовательная отправка с паузой 0.05с."""
+    sent_count = 0
+    failed = []
+    for tg_id in user_ids:
+        try:
+            await bot.copy_message(chat_id=tg_id, from_chat_id=from_chat_id, message_id=message_id)
+            sent_count += 1
+        except TelegramRetryAfter as e:
+            await asyncio.sleep(e.retry_after or 1)
+            try:
+                await bot.copy_message(chat_id=tg_id, from_chat_id=from_chat_id, message_id=message_id)
+                sent_count += 1
+            except Exception as ex:
+                failed.append((tg_id, str(ex)))
+        except TelegramAPIError as e:
+            failed.append((tg_id, str(e)))
+        await asyncio.sleep(0.05)
+    return sent_count, len(failed)
+
+
+async def engine_broadcast(bot: Bot, user_ids, from_chat_id: int, message_id: int, concurrency: int):
+    async def recipients():
+        for tg_id in user_ids:
+            yield tg_id
+
+    async def send(tg_id: int):
+        await bot.copy_message(chat_id=tg_id, from_chat_id=from_chat_id, message_id=message_id)
+
+    report = await Broadcaster(concurrency=concurrency).run(recipients(), send)
+    return report.sent, len(report.failed)
+
+
+async def measure(name: str, api: FakeBotAPI, runner, limited: bool = False) -> None:
+    session = AiohttpSession(api=TelegramAPIServer.from_base(api.base_url))
+    if limited:
+        # Темп рассылки задаёт ограничитель сессии, как у бота из init_bot
+        session.middleware(OutboundLimiter())
+    bot = Bot(token="42:BENCH", session=session)
+    api.calls.clear()
+    api.flood_errors = 0
+    started = time.perf_counter()
+    try:
+        sent, failed = await runner(bot)
+    finally:
+        await session.close()
+    elapsed = time.perf_counter() - started
+    print(f"{name:>8}: {elapsed:7.2f}s  sent={sent} failed={failed} "
+          f"requests={sum(api.calls.values())} 429={api.flood_errors} rate={sent / elapsed:6.1f} msg/s")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.03)
+    parser.add_argument("--flood", type=float, default=0.01, help="доля случайных ответов 429")
+    parser.add_argument("--limit", type=int, default=30, help="глобальный лимит заглушки, запросов/с")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    api = FakeBotAPI(latency=args.latency, flood_probability=args.flood, global_limit=args.limit)
+    await api.start()
+    user_ids = list(range(1_000_000, 1_000_000 + args.users))
+    try:
+        if not args.skip_legacy:
+            await measure("legacy", api, lambda bot: legacy_broadcast(bot, user_ids, 1, 1))
+        await measure("engine", api, lambda bot: engine_broadcast(bot, user_ids, 1, 1, args.concurrency),
+                      limited=True)
+    finally:
+        await api.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
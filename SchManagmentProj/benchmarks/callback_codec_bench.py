@@ -0,0 +1,93 @@
+"""
+Сравнение прежнего ItemCallback (pydantic CallbackData + строка в data, разбираемая в хендлере)
+с компактными callback-данными из app/utils/callback_codec.py: упаковка, разбор и длина payload.
+
+Запуск из каталога SchManagmentProj:
+    python -m benchmarks.callback_codec_bench --number 20000
+"""
+import argparse
+import time
+from datetime import date
+
+from aiogram.filters.callback_data import CallbackData
+
+from app.utils.callback_codec import CompactCallback
+
+
+# Прежний формат — для сравнения
+class ItemCallback(CallbackData, prefix="item"):
+    callback_action: str
+    data: str
+
+
+class TaskPlanerPage(CompactCallback, code="bench_pp"):
+    user_id: int
+    page: int
+    cursor: str
+
+
+class EventInfo(CompactCallback, code="bench_ei"):
+    day: date
+    index: int
+
+
+class TaskInfo(CompactCallback, code="bench_ti"):
+    task_id: int
+
+
+def _legacy_page(data: str):
+    callback = ItemCallback.unpack(data)
+    parts = callback.data.split()
+    return int(parts[0]), int(parts[1]), parts[2]
+
+
+def _legacy_event(data: str):
+    parts = ItemCallback.unpack(data).data.split()
+    return date.fromisoformat(parts[0]), int(parts[1])
+
+
+def _legacy_task(data: str):
+    return int(ItemCallback.unpack(data).data)
+
+
+CASES = [
+    ("task page",
+     lambda: ItemCallback(callback_action="task_planer_page", data="1234567890 12 a48213").pack(),
+     _legacy_page,
+     lambda: TaskPlanerPage(1234567890, 12, "a48213").pack(),
+     TaskPlanerPage.unpack),
+    ("event info",
+     lambda: ItemCallback(callback_action="event_info", data="2026-10-19 3").pack(),
+     _legacy_event,
+     lambda: EventInfo(date(2026, 10, 19), 3).pack(),
+     EventInfo.unpack),
+    ("task info",
+     lambda: ItemCallback(callback_action="task_info", data="48213").pack(),
+     _legacy_task,
+     lambda: TaskInfo(48213).pack(),
+     TaskInfo.unpack),
+]
+
+
+def _per_call_us(func, number: int, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        func(*args)
+    return (time.perf_counter() - start) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'case':>10}  {'format':>7}  {'bytes':>5}  {'pack, us':>8}  {'parse, us':>9}")
+    for name, legacy_pack, legacy_parse, compact_pack, compact_parse in CASES:
+        for label, pack, parse in (("legacy", legacy_pack, legacy_parse), ("compact", compact_pack, compact_parse)):
+            packed = pack()
+            print(f"{name:>10}  {label:>7}  {len(packed.encode()):5d}  {_per_call_us(pack, args.number):8.2f}  "
+                  f"{_per_call_us(parse, args.number, packed):9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Стоимость доставки callback до хендлера в зависимости от числа зарегистрированных действий:
+- legacy  — цепочка роутеров с ItemCallback.filter(F.callback_action == ...), как было раньше;
+- filters — та же цепочка, но с фильтрами CompactCallback.filter();
+- table   — CallbackTable: один разбор и поиск хендлера в словаре.
+Измеряется маршрутизация callback_query от корневого роутера (propagate_event) для первого и последнего
+(худший случай) действия за вычетом baseline — доставки в единственный хендлер без фильтров.
+Берётся минимум из нескольких повторов.
+
+Запуск из каталога SchManagmentProj:
+    python -m benchmarks.callback_dispatch_bench --actions 10 50 200
+"""
+import argparse
+import asyncio
+import gc
+import time
+from datetime import datetime
+
+from aiogram import Bot, F, Router
+from aiogram.filters.callback_data import CallbackData
+from aiogram.types import CallbackQuery, Chat, Message, User
+
+from app.utils.callback_codec import CompactCallback
+from app.utils.callback_dispatch import CallbackTable
+
+# Как в app/handlers: действия разложены по нескольким роутерам
+ROUTERS = 11
+
+
+class ItemCallback(CallbackData, prefix="item"):
+    callback_action: str
+    data: str
+
+
+async def handler(callback_query: CallbackQuery, callback_data=None):
+    return callback_data
+
+
+def _action_types(count: int, run: int):
+    return [type(f"BenchAction{run}_{i}", (CompactCallback,), {"__annotations__": {"item_id": int}},
+                 code=f"b{run}x{i}") for i in range(count)]
+
+
+def _legacy(count: int):
+    routers = [Router() for _ in range(ROUTERS)]
+    for i in range(count):
+        routers[i * ROUTERS // count].callback_query.register(
+            handler, ItemCallback.filter(F.callback_action == f"action_{i}"))
+    datas = [ItemCallback(callback_action=f"action_{i}", data="48213").pack() for i in (0, count - 1)]
+    return routers, datas
+
+
+def _filters(types):
+    routers = [Router() for _ in range(ROUTERS)]
+    count = len(types)
+    for i, action in enumerate(types):
+        routers[i * ROUTERS // count].callback_query.register(handler, action.filter())
+    return routers, [types[0](48213).pack(), types[-1](48213).pack()]
+
+
+def _table(types):
+    router = Router()
+    table = CallbackTable()
+    for action in types:
+        table.action(action)(handler)
+    table.setup(router)
+    return [router], [types[0](48213).pack(), types[-1](48213).pack()]
+
+
+def _query(data: str) -> CallbackQuery:
+    user = User(id=7, is_bot=False, first_name="u")
+    message = Message(message_id=1, date=datetime.now(), chat=Chat(id=7, type="private"), text="menu")
+    return CallbackQuery(id="1", from_user=user, chat_instance="c", message=message, data=data)
+
+
+async def _per_query_us(root: Router, bot: Bot, query: CallbackQuery, number: int, repeat: int = 7) -> float:
+    # Как в timeit: без сборщика мусора на время замера, иначе разброс больше самой разницы
+    best = float("inf")
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                await root.propagate_event("callback_query", query, bot=bot)
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return best / number * 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--actions", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    bot = Bot(token="42:TEST")
+    baseline_router = Router()
+    baseline_router.callback_query.register(handler)
+    baseline = await _per_query_us(baseline_router, bot, _query("b"), args.number)
+    print(f"baseline propagate_event: {baseline:.1f} us")
+
+    print(f"{'actions':>7}  {'layout':>7}  {'first, us':>9}  {'last, us':>9}")
+    for run, count in enumerate(args.actions):
+        types = _action_types(count, run)
+        for name, build in (("legacy", lambda: _legacy(count)), ("filters", lambda: _filters(types)),
+                            ("table", lambda: _table(types))):
+            routers, (first, last) = build()
+            root = Router()
+            root.include_routers(*routers)
+            first_us = await _per_query_us(root, bot, _query(first), args.number) - baseline
+            last_us = await _per_query_us(root, bot, _query(last), args.number) - baseline
+            print(f"{count:7d}  {name:>7}  {first_us:9.1f}  {last_us:9.1f}")
+    await bot.session.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,176 @@
+"""
+Локальная заглушка Telegram Bot API на aiohttp для бенчмарков.
+
+Отвечает на любые методы вида /bot<token>/<method>, моделирует задержку сети,
+глобальный лимит запросов в секунду, случайные ответы 429 с retry_after
+и чаты, заблокировавшие бота (403).
+
+Для нагрузочных тестов также отдаёт боту апдейты через getUpdates (push_update),
+запоминает последнюю inline-клавиатуру в каждом чате и сообщает об ответах бота (expect).
+"""
+import asyncio
+import json
+import random
+import time
+from collections import Counter, deque
+from datetime import datetime
+from itertools import islice
+
+from aiohttp import web
+
+
+class FakeBotAPI:
+    def __init__(self, *, latency: float = 0.02, jitter: float = 0.01, global_limit: int = 30,
+                 flood_probability: float = 0.0, retry_after: int = 1, blocked_chats=(), seed: int = 0,
+                 limited_methods=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.global_limit = global_limit
+        self.flood_probability = flood_probability
+        self.retry_after = retry_after
+        self.blocked_chats = {str(chat_id) for chat_id in blocked_chats}
+        self.random = random.Random(seed)
+        # Методы, к которым применяются лимит и случайные 429; None — ко всем
+        self.limited_methods = {method.lower() for method in limited_methods} if limited_methods else None
+
+        self.calls = Counter()
+        self.flood_errors = 0
+        self._window = deque()
+        self._message_id = 0
+        self._runner: web.AppRunner | None = None
+        self.base_url = ""
+
+        # Очередь апдейтов для getUpdates
+        self._updates = deque()
+        self._update_id = 0
+        self._updates_added = asyncio.Event()
+        self.polling_started = asyncio.Event()
+        # Ответы бота: ("cb", callback_query_id) или ("chat", chat_id) -> ожидающий Future
+        self._waiters = {}
+        self.keyboards = {}
+        self.last_message_id = {}
+
+        self.app = web.Application()
+        self.app.router.add_route("*", "/bot{token}/{method}", self._handle)
+
+    def _rate_limited(self) -> bool:
+        now = time.monotonic()
+        while self._window and self._window[0] <= now - 1:
+            self._window.popleft()
+        if self.global_limit and len(self._window) >= self.global_limit:
+            return True
+        self._window.append(now)
+        return False
+
+    def _flood_response(self) -> web.Response:
+        self.flood_errors += 1
+        return web.json_response({
+            "ok": False,
+            "error_code": 429,
+            "description": f"Too Many Requests: retry after {self.retry_after}",
+            "parameters": {"retry_after": self.retry_after},
+        }, status=429)
+
+    def _message(self, chat_id) -> dict:
+        self._message_id += 1
+        return {
+            "message_id": self._message_id,
+            "date": int(datetime.now().timestamp()),
+            "chat": {"id": int(chat_id or 1), "type": "private"},
+            "text": "ok",
+        }
+
+    def push_update(self, update: dict) -> int:
+        """Ставит апдейт в очередь getUpdates и возвращает присвоенный update_id."""
+        self._update_id += 1
+        update["update_id"] = self._update_id
+        self._updates.append(update)
+        self._updates_added.set()
+        return self._update_id
+
+    def expect(self, key: tuple) -> asyncio.Future:
+        """Future, который завершится, когда бот ответит на callback (("cb", id)) или напишет в чат (("chat", id))."""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[key] = future
+        return future
+
+    def _resolve(self, key: tuple, method: str) -> None:
+        future = self._waiters.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(method)
+
+    def _record_reply(self, method: str, params: dict) -> None:
+        if method == "answercallbackquery":
+            self._resolve(("cb", params.get("callback_query_id")), method)
+            return
+        chat_id = params.get("chat_id")
+        if chat_id is None or method not in ("sendmessage", "editmessagetext", "sendphoto", "editmessagemedia",
+                                             "copymessage"):
+            return
+        chat_id = int(chat_id)
+        markup = params.get("reply_markup")
+        if markup:
+            self.keyboards[chat_id] = json.loads(markup).get("inline_keyboard")
+        if method in ("sendmessage", "sendphoto"):
+            self.last_message_id[chat_id] = self._message_id
+        self._resolve(("chat", chat_id), method)
+
+    async def _get_updates(self, params: dict) -> web.Response:
+        self.polling_started.set()
+        offset = int(params.get("offset") or 0)
+        limit = int(params.get("limit") or 100)
+        # Подтверждённые ботом апдейты (id < offset) удаляем, как Telegram
+        while self._updates and self._updates[0]["update_id"] < offset:
+            self._updates.popleft()
+        if not self._updates:
+            self._updates_added.clear()
+            try:
+                await asyncio.wait_for(self._updates_added.wait(), float(params.get("timeout") or 0))
+            except asyncio.TimeoutError:
+                pass
+        return web.json_response({"ok": True, "result": list(islice(self._updates, limit))})
+
+    def result_for(self, method: str, params: dict):
+        if method == "copymessage":
+            self._message_id += 1
+            return {"message_id": self._message_id}
+        if method in ("sendmessage", "editmessagetext", "sendphoto", "editmessagemedia"):
+            return self._message(params.get("chat_id"))
+        if method == "getme":
+            return {"id": 42, "is_bot": True, "first_name": "bench"}
+        return True
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"].lower()
+        params = dict(await request.post())
+        self.calls[method] += 1
+        if method == "getupdates":
+            return await self._get_updates(params)
+
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        limited = self.limited_methods is None or method in self.limited_methods
+        if limited and (self._rate_limited() or self.random.random() < self.flood_probability):
+            return self._flood_response()
+        if str(params.get("chat_id")) in self.blocked_chats:
+            return web.json_response({"ok": False, "error_code": 403,
+                                      "description": "Forbidden: bot was blocked by the user"}, status=403)
+        result = self.result_for(method, params)
+        self._record_reply(method, params)
+        return web.json_response({"ok": True, "result": result})
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{bound_port}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
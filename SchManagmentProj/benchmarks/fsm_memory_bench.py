@@ -0,0 +1,99 @@
+"""
+Память и скорость FSM-хранилищ: MemoryStorage против SQLiteStorage на брошенных формах.
+
+Каждый симулированный пользователь начинает создание задачи и бросает его на полпути —
+в MemoryStorage такие формы копятся, в SQLiteStorage в памяти остаётся только LRU-кэш.
+
+Запуск из каталога SchManagmentProj:
+    python -m benchmarks.fsm_memory_bench --users 10000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+_tmp = tempfile.TemporaryDirectory()
+# Бенчмарк работает с временной БД, а не с базой бота
+os.environ["BOT_DB_URL"] = f"sqlite+aiosqlite:///{os.path.join(_tmp.name, 'bench.sqlite3')}"
+
+from aiogram.fsm.storage.base import StorageKey  # noqa: E402
+from aiogram.fsm.storage.memory import MemoryStorage  # noqa: E402
+
+from app.database.engine_base import async_main, dispose_engines  # noqa: E402
+from app.utils.fsm_storage import SQLiteStorage  # noqa: E402
+
+BOT_ID = 42
+# Строки состояний как у TaskCreation из task_creation_handlers
+TITLE_INPUT = "TaskCreation:title_input"
+END_TIME_INPUT = "TaskCreation:end_time_input"
+
+
+def _key(user_id: int) -> StorageKey:
+    return StorageKey(bot_id=BOT_ID, chat_id=user_id, user_id=user_id)
+
+
+async def simulate(storage, users: int, first_id: int = 1) -> float:
+    """Каждый пользователь проходит половину формы создания задачи. Возвращает время в секундах."""
+    start = time.perf_counter()
+    deadline = datetime(2026, 10, 1, 18, 0)
+    for user_id in range(first_id, first_id + users):
+        key = _key(user_id)
+        await storage.get_state(key)
+        await storage.set_state(key, TITLE_INPUT)
+        await storage.update_data(key, {"created_for": user_id, "title": f"Задача пользователя {user_id}"})
+        await storage.get_state(key)
+        await storage.update_data(key, {"description": "Описание " * 10,
+                                        "end_at": deadline + timedelta(minutes=user_id)})
+        await storage.set_state(key, END_TIME_INPUT)
+    return time.perf_counter() - start
+
+
+async def measure(name: str, factory, users: int, timing_users: int) -> None:
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    storage = factory()
+    await simulate(storage, users, first_id=1)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del storage
+    # Скорость меряем отдельно: под tracemalloc всё работает в разы медленнее
+    elapsed = await simulate(factory(), timing_users, first_id=users + 1)
+    print(f"{name:>8}: retained {(current - baseline) / 1024 / 1024:7.2f} MiB  "
+          f"peak {(peak - baseline) / 1024 / 1024:7.2f} MiB  {timing_users * 6 / elapsed:9.0f} ops/s")
+
+
+async def check_restart(users: int) -> None:
+    # Новый экземпляр с пустым кэшем — как после перезапуска бота
+    storage = SQLiteStorage()
+    restored = 0
+    for user_id in range(1, users + 1, max(users // 100, 1)):
+        key = _key(user_id)
+        data = await storage.get_data(key)
+        if (await storage.get_state(key) == END_TIME_INPUT
+                and isinstance(data.get("end_at"), datetime) and data.get("created_for") == user_id):
+            restored += 1
+    print(f" restart: restored {restored}/{len(range(1, users + 1, max(users // 100, 1)))} sampled forms")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--timing-users", type=int, default=1000)
+    parser.add_argument("--cache-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    await async_main()
+    try:
+        await measure("memory", MemoryStorage, args.users, args.timing_users)
+        await measure("sqlite", lambda: SQLiteStorage(cache_size=args.cache_size), args.users, args.timing_users)
+        await check_restart(args.users)
+    finally:
+        await dispose_engines()
+        _tmp.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,261 @@
+"""
+Бенчмарк горячих маршрутов бота через Dispatcher.feed_update.
+
+Собирает настоящий корневой router из app/handlers поверх временной SQLite-базы с синтетическими данными
+и заглушки сессии Bot (без сети). Для каждого маршрута печатает перцентили задержки обработки апдейта,
+число SQL-запросов и вызовов Bot API на апдейт.
+С --check-budgets апдейт, превысивший бюджет запросов маршрута (app/utils/sql_monitor.py), считается ошибкой,
+а бенчмарк завершается с ненулевым кодом — так регрессия по числу запросов ловится в CI.
+
+Запуск из каталога SchManagmentProj:
+    python -m benchmarks.handler_bench --users 2000 --tasks 20000 --events 2000 --iterations 300
+    python -m benchmarks.handler_bench --routes event_list task_planer_page --json bench.json
+    python -m benchmarks.handler_bench --iterations 50 --check-budgets
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+_tmp = tempfile.TemporaryDirectory()
+# Бенчмарк работает с временной БД, а не с базой бота
+os.environ["BOT_DB_URL"] = f"sqlite+aiosqlite:///{os.path.join(_tmp.name, 'bench.sqlite3')}"
+
+from aiogram import Bot, Dispatcher  # noqa: E402
+from aiogram.client.session.base import BaseSession  # noqa: E402
+from aiogram.fsm.storage.base import StorageKey  # noqa: E402
+from aiogram.types import CallbackQuery, Chat, Message, MessageId, Update, User as TgUser  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.database import engine_base  # noqa: E402
+from app.database.requests.task_requests import get_user_tasks_page  # noqa: E402
+from app.handlers import router, EventList, EventInfo, TaskPlaner, TaskPlanerPage, TaskReport  # noqa: E402
+from app.handlers.announcement_handlers import AnnouncementCreation  # noqa: E402
+from app.middlewares.metrics_middlewares import setup_metrics  # noqa: E402
+from app.utils import sql_monitor  # noqa: E402
+from app.utils.fsm_storage import SQLiteStorage  # noqa: E402
+from benchmarks.seed_data import TG_ID_BASE, Population, seed  # noqa: E402
+
+BOT_ID = 42
+
+
+class BenchSession(BaseSession):
+    """Сессия Bot без сети: отвечает правдоподобными объектами и считает вызовы методов."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = Counter()
+        self._message_id = 0
+
+    async def close(self):
+        pass
+
+    async def stream_content(self, *args, **kwargs):
+        yield b""
+
+    async def make_request(self, bot, method, timeout=None):
+        self.calls[type(method).__name__] += 1
+        returning = method.__returning__
+        if returning is bool:
+            return True
+        self._message_id += 1
+        if returning is MessageId:
+            return MessageId(message_id=self._message_id)
+        chat_id = getattr(method, "chat_id", None) or 1
+        return Message(message_id=self._message_id, date=datetime.now(), chat=Chat(id=chat_id, type="private"),
+                       from_user=TgUser(id=BOT_ID, is_bot=True, first_name="bench"), text="ok")
+
+
+def _tg_user(user_id: int) -> TgUser:
+    return TgUser(id=TG_ID_BASE + user_id, is_bot=False, first_name="bench")
+
+
+def message_update(update_id: int, user_id: int, text: str) -> Update:
+    chat = Chat(id=TG_ID_BASE + user_id, type="private")
+    return Update(update_id=update_id, message=Message(message_id=update_id, date=datetime.now(), chat=chat,
+                                                       from_user=_tg_user(user_id), text=text))
+
+
+def callback_update(update_id: int, user_id: int, data: str) -> Update:
+    chat = Chat(id=TG_ID_BASE + user_id, type="private")
+    message = Message(message_id=update_id, date=datetime.now(), chat=chat,
+                      from_user=TgUser(id=BOT_ID, is_bot=True, first_name="bench"), text="menu")
+    return Update(update_id=update_id, callback_query=CallbackQuery(
+        id=str(update_id), from_user=_tg_user(user_id), chat_instance="bench", message=message, data=data))
+
+
+def _months_ago(today: date, months: int) -> tuple:
+    year, month_index = divmod(today.year * 12 + today.month - 1 - months, 12)
+    return year, month_index + 1
+
+
+@dataclass
+class Route:
+    name: str
+    # (номер итерации) -> (id пользователя, апдейт); подготовка перед апдейтом в замер не входит
+    make: Callable[[int], tuple]
+    prepare: Optional[Callable[[int], Awaitable[None]]] = None
+
+
+def build_routes(population: Population, dp: Dispatcher, rnd: random.Random, page_anchors: dict) -> list:
+    today = date.today()
+    monday = today - timedelta(days=today.weekday())
+    update_ids = iter(range(1, 10 ** 9))
+
+    def pick(users: list) -> int:
+        return rnd.choice(users)
+
+    def callback(users: list, data: Callable[[int], str]):
+        def make(_):
+            user_id = pick(users)
+            return user_id, callback_update(next(update_ids), user_id, data(user_id))
+        return make
+
+    # announcement preview: перед каждым апдейтом автор уже находится в состоянии ввода текста
+    async def enter_announcement(_):
+        key = StorageKey(bot_id=BOT_ID, chat_id=TG_ID_BASE + population.admin,
+                         user_id=TG_ID_BASE + population.admin)
+        await dp.storage.set_state(key, AnnouncementCreation.waiting_for_content)
+
+    def announcement(_):
+        return population.admin, message_update(next(update_ids), population.admin, "Объявление для всех " * 5)
+
+    return [
+        Route("profile", callback(population.everyone, lambda _: "profile")),
+        Route("event_list", callback(population.everyone, lambda _: EventList(
+            monday + timedelta(weeks=rnd.randint(-8, 8))).pack())),
+        Route("event_info", callback(population.everyone, lambda _: EventInfo(
+            today + timedelta(days=rnd.randint(-30, 30)), rnd.randint(0, 2)).pack())),
+        Route("task_planer", callback(population.managers, lambda user_id: TaskPlaner(user_id).pack())),
+        Route("task_planer_page", callback(list(page_anchors), lambda user_id: TaskPlanerPage(
+            user_id, 2, f"a{page_anchors[user_id]}").pack())),
+        Route("self_task_report", callback(population.managers, lambda _: TaskReport(
+            None, *_months_ago(today, rnd.randint(0, 11))).pack())),
+        Route("task_tracker_menu", callback([population.president], lambda _: "task_tracker_menu")),
+        Route("announcement_preview", announcement, prepare=enter_announcement),
+    ]
+
+
+def _percentile(values: list, q: int) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+async def run_route(route: Route, dp: Dispatcher, bot: Bot, session: BenchSession, queries: Counter,
+                    iterations: int, warmup: int) -> dict:
+    latencies, query_counts = [], []
+    api_calls = 0
+    over_budget = []
+    for i in range(warmup + iterations):
+        _, update = route.make(i)
+        if route.prepare:
+            await route.prepare(i)
+        queries_before = queries["total"]
+        calls_before = sum(session.calls.values())
+
+        start = time.perf_counter()
+        try:
+            await dp.feed_update(bot, update)
+        except sql_monitor.QueryBudgetExceeded as e:
+            over_budget.append(str(e))
+        elapsed = time.perf_counter() - start
+
+        if i >= warmup:
+            latencies.append(elapsed * 1000)
+            query_counts.append(queries["total"] - queries_before)
+            api_calls += sum(session.calls.values()) - calls_before
+
+    return {
+        "route": route.name,
+        "n": len(latencies),
+        "p50_ms": _percentile(latencies, 50),
+        "p95_ms": _percentile(latencies, 95),
+        "p99_ms": _percentile(latencies, 99),
+        "max_ms": max(latencies),
+        "queries_mean": statistics.fmean(query_counts),
+        "queries_max": max(query_counts),
+        "api_calls_mean": api_calls / len(latencies),
+        "over_budget": over_budget,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--groups", type=int, default=24)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--routes", nargs="+", help="только эти маршруты (по умолчанию все)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="сохранить результаты в файл, чтобы сравнивать между версиями")
+    parser.add_argument("--check-budgets", action="store_true", help="превышение бюджета запросов — ошибка")
+    args = parser.parse_args()
+    sql_monitor.STRICT_BUDGETS = args.check_budgets
+
+    rnd = random.Random(args.seed)
+    await engine_base.async_main()
+    population = await seed(args.users, args.tasks, args.events, args.groups, rnd)
+
+    # Для листания нужен курсор после первой страницы — берём его до замеров
+    page_anchors = {}
+    for manager_id in population.managers:
+        tasks, _, total = await get_user_tasks_page(manager_id, completed=False)
+        if total > len(tasks) > 0:
+            page_anchors[manager_id] = tasks[-1].id
+
+    queries = Counter()
+    for engine in (engine_base.write_engine, engine_base.read_engine):
+        event.listen(engine.sync_engine, "before_cursor_execute",
+                     lambda *_: queries.update(total=1))
+
+    session = BenchSession()
+    bot = Bot(token=f"{BOT_ID}:BENCH", session=session)
+    dp = Dispatcher(storage=SQLiteStorage())
+    dp.include_router(router)
+    setup_metrics(dp)
+
+    routes = build_routes(population, dp, rnd, page_anchors)
+    if args.routes:
+        routes = [route for route in routes if route.name in args.routes]
+    if not page_anchors:
+        routes = [route for route in routes if route.name != "task_planer_page"]
+
+    print(f"users={args.users} tasks={args.tasks} events={args.events} groups={args.groups} "
+          f"iterations={args.iterations}")
+    print(f"{'route':>20}  {'p50, ms':>8}  {'p95, ms':>8}  {'p99, ms':>8}  {'max, ms':>8}  "
+          f"{'queries':>7}  {'max q':>5}  {'api':>4}")
+    results = []
+    for route in routes:
+        result = await run_route(route, dp, bot, session, queries, args.iterations, args.warmup)
+        results.append(result)
+        print(f"{result['route']:>20}  {result['p50_ms']:8.2f}  {result['p95_ms']:8.2f}  {result['p99_ms']:8.2f}  "
+              f"{result['max_ms']:8.2f}  {result['queries_mean']:7.2f}  {result['queries_max']:5d}  "
+              f"{result['api_calls_mean']:4.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+
+    await dp.storage.close()
+    await engine_base.dispose_engines()
+
+    failures = [message for result in results for message in result["over_budget"]]
+    if failures:
+        print(f"query budget exceeded in {len(failures)} updates, e.g. {failures[0]}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
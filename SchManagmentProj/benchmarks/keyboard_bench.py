@@ -0,0 +1,66 @@
+"""
+Микробенчмарк билдеров клавиатур: полная сборка pydantic-моделей против повторного использования из keyboard_cache.
+
+Запуск из каталога SchManagmentProj:
+    python -m benchmarks.keyboard_bench --number 2000
+"""
+import argparse
+import time
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import app.handlers  # noqa: F401 — клавиатуры импортируют хендлеры, порядок импорта как в main.py
+from app.database.models.event_models import WeekSchedule
+from app.database.models.user_models import ManagementType, UserRole
+from app.keyboards.event_keyboards import build_week_keyboard, build_event_info_keyboard
+from app.keyboards.task_keyboards import (
+    build_task_planer_keyboard, build_completed_task_keyboard, build_task_tracker_menu_keyboard,
+    build_task_menu_keyboard, build_self_report_keyboard
+)
+from app.utils.keyboard_cache import clear_keyboard_cache
+
+
+def _cases():
+    tasks = [SimpleNamespace(id=100 + i, title=f"Подготовить отчёт №{i}") for i in range(5)]
+    managers = [SimpleNamespace(id=i, manager_role=ManagementType.media, user_desc=f"Министр {i}") for i in range(12)]
+    user = SimpleNamespace(id=7, role=UserRole.management, manager_role=ManagementType.media)
+    events = [SimpleNamespace(id=i, title=f"Событие {i}", start_at=datetime(2026, 10, 19 + i % 5, 10),
+                              end_at=datetime(2026, 10, 19 + i % 5, 12)) for i in range(10)]
+    week = WeekSchedule(start=date(2026, 10, 19),
+                        days=tuple(tuple(e for e in events if e.start_at.weekday() == d) for d in range(7)))
+
+    return [
+        ("task_planer", build_task_planer_keyboard, (tasks, 7), {"page": 2, "total": 40}),
+        ("completed_tasks", build_completed_task_keyboard, (tasks, 7), {"page": 3, "total": 120}),
+        ("tracker_menu", build_task_tracker_menu_keyboard, (managers,), {}),
+        ("task_menu", build_task_menu_keyboard, (user,), {}),
+        ("self_report", build_self_report_keyboard, (2026, 10), {}),
+        ("week", build_week_keyboard, (week, True), {}),
+        ("event_info", build_event_info_keyboard, (events[0],),
+         {"index": 1, "total": 4, "day_date": date(2026, 10, 19), "can_redact": True}),
+    ]
+
+
+def _per_call_us(func, args, kwargs, number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        func(*args, **kwargs)
+    return (time.perf_counter() - start) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'builder':>16}  {'build, us':>10}  {'cached, us':>10}  {'speedup':>8}")
+    for name, builder, call_args, call_kwargs in _cases():
+        clear_keyboard_cache()
+        uncached = _per_call_us(builder.__wrapped__, call_args, call_kwargs, args.number)
+        builder(*call_args, **call_kwargs)  # прогрев кэша
+        cached = _per_call_us(builder, call_args, call_kwargs, args.number)
+        print(f"{name:>16}  {uncached:10.1f}  {cached:10.1f}  {uncached / cached:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
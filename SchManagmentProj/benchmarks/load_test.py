@@ -0,0 +1,244 @@
+"""
+Нагрузочный тест: бот запускается как есть (main.py, режим polling) против локальной заглушки Bot API.
+
+Заглушка (fake_bot_api.FakeBotAPI) отдаёт боту апдейты через getUpdates, моделирует задержку сети и 429.
+Виртуальные пользователи с паузами «на подумать» проходят типичные пути по меню: каждое нажатие берётся
+из клавиатуры, которую бот прислал этому пользователю последней. Задержка шага — от постановки апдейта
+в очередь getUpdates до ответа бота (answerCallbackQuery для кнопок, сообщение в чат для команд).
+
+Запуск из каталога SchManagmentProj:
+    python -m benchmarks.load_test --users 2000 --ramp 60
+    python -m benchmarks.load_test --users 500 1000 2000 --ramp 60 --latency 0.05 --limit 30
+"""
+import argparse
+import asyncio
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+_tmp = tempfile.TemporaryDirectory()
+# И генератор, и бот работают с временной БД, а не с базой бота
+os.environ["BOT_DB_URL"] = f"sqlite+aiosqlite:///{os.path.join(_tmp.name, 'load.sqlite3')}"
+
+from app.database import engine_base  # noqa: E402
+from benchmarks.fake_bot_api import FakeBotAPI  # noqa: E402
+from benchmarks.seed_data import TG_ID_BASE, seed  # noqa: E402
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+TOKEN = "42:LOADTEST"
+# Лимит Telegram касается отправки и редактирования сообщений, а не answerCallbackQuery
+MESSAGE_METHODS = ("sendMessage", "editMessageText", "editMessageMedia", "sendPhoto", "copyMessage")
+
+
+def button(prefix: str = None, text: str = None):
+    """Выбирает случайную кнопку текущей клавиатуры по началу callback_data и/или текста."""
+    def select(keyboard, rnd: random.Random):
+        options = [item["callback_data"] for row in keyboard or () for item in row
+                   if "callback_data" in item
+                   and (prefix is None or item["callback_data"].startswith(prefix))
+                   and (text is None or item["text"].startswith(text))]
+        return rnd.choice(options) if options else None
+    return select
+
+
+# Шаг — команда (строка) или выбор кнопки. Если подходящей кнопки нет, шаг пропускается
+STUDENT_PATH = [
+    ("/profile", "/profile"),
+    ("event_list", button("el")),
+    ("next_week", button("el", text="➡️")),
+    ("event_day", button("ei")),
+    ("event_next", button("ei", text="➡️")),
+    ("event_back", button("el", text="↩️")),
+    ("to_profile", button("profile")),
+]
+
+MANAGER_PATH = [
+    ("/profile", "/profile"),
+    ("task_menu", button("task_menu")),
+    ("task_planer", button("tp")),
+    ("planer_page", button("pp", text="➡️")),
+    ("task_info", button("ti")),
+    ("task_back", button("tp")),
+    ("completed", button("tc")),
+    ("report_back", button("tp")),
+]
+
+
+@dataclass
+class RunStats:
+    latencies: defaultdict = field(default_factory=lambda: defaultdict(list))
+    timeouts: Counter = field(default_factory=Counter)
+    skipped: int = 0
+
+    def all_latencies(self) -> list:
+        return [value for values in self.latencies.values() for value in values]
+
+
+def _percentile(values: list, q: int) -> float:
+    if not values:
+        return float("nan")
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def _user(chat_id: int) -> dict:
+    return {"id": chat_id, "is_bot": False, "first_name": "load"}
+
+
+async def virtual_user(api: FakeBotAPI, chat_id: int, path: list, stats: RunStats, args, rnd: random.Random,
+                       start_delay: float) -> None:
+    await asyncio.sleep(start_delay)
+    for step, (label, action) in enumerate(path):
+        chat = {"id": chat_id, "type": "private"}
+        if isinstance(action, str):
+            key = ("chat", chat_id)
+            update = {"message": {"message_id": step + 1, "date": int(time.time()), "chat": chat,
+                                  "from": _user(chat_id), "text": action}}
+        else:
+            data = action(api.keyboards.get(chat_id), rnd)
+            if data is None:
+                stats.skipped += 1
+                continue
+            callback_id = f"{chat_id}-{step}"
+            key = ("cb", callback_id)
+            message = {"message_id": api.last_message_id.get(chat_id, 1), "date": int(time.time()), "chat": chat,
+                       "from": {"id": 42, "is_bot": True, "first_name": "bot"}, "text": "menu"}
+            update = {"callback_query": {"id": callback_id, "from": _user(chat_id), "chat_instance": "load",
+                                         "message": message, "data": data}}
+
+        reply = api.expect(key)
+        start = time.perf_counter()
+        api.push_update(update)
+        try:
+            await asyncio.wait_for(reply, args.timeout)
+        except asyncio.TimeoutError:
+            # Без ответа пользователь дальше не идёт
+            stats.timeouts[label] += 1
+            return
+        stats.latencies[label].append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(rnd.uniform(args.think_min, args.think_max))
+
+
+def start_bot(api_url: str, workdir: Path, log_path: Path) -> subprocess.Popen:
+    """Запускает main.py отдельным процессом: токен из BOT_API_TOKEN.yaml, Bot API — заглушка."""
+    (workdir / "BOT_API_TOKEN.yaml").write_text(TOKEN, encoding="utf-8")
+    env = {
+        **os.environ,
+        "BOT_API_URL": api_url,
+        "BOT_MODE": "polling",
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(PROJECT_DIR), os.environ.get("PYTHONPATH")])),
+    }
+    with open(log_path, "wb") as log:
+        return subprocess.Popen([sys.executable, str(PROJECT_DIR / "main.py")], cwd=workdir, env=env,
+                                stdout=log, stderr=subprocess.STDOUT)
+
+
+async def stop_bot(process: subprocess.Popen) -> None:
+    if process.poll() is None:
+        process.send_signal(signal.SIGINT)
+        try:
+            await asyncio.wait_for(asyncio.to_thread(process.wait), 15)
+        except asyncio.TimeoutError:
+            process.kill()
+
+
+def _log_errors(log_path: Path) -> Counter:
+    errors = Counter()
+    for line in log_path.read_text(encoding="utf-8", errors="replace").splitlines():
+        if line.startswith(("ERROR:", "CRITICAL:")):
+            errors[line.split(":", 2)[1]] += 1
+    return errors
+
+
+async def run(users: int, chats: list, args, workdir: Path) -> None:
+    api = FakeBotAPI(latency=args.latency, jitter=args.jitter, global_limit=args.limit,
+                     flood_probability=args.flood, retry_after=args.retry_after, seed=args.seed,
+                     limited_methods=MESSAGE_METHODS)
+    api_url = await api.start()
+    log_path = workdir / f"bot_{users}.log"
+    process = start_bot(api_url, workdir, log_path)
+    try:
+        try:
+            await asyncio.wait_for(api.polling_started.wait(), 60)
+        except asyncio.TimeoutError:
+            pass
+        if process.poll() is not None or not api.polling_started.is_set():
+            print(f"Бот не начал polling, лог: {log_path}")
+            print(log_path.read_text(encoding="utf-8", errors="replace")[-2000:])
+            return
+
+        rnd = random.Random(args.seed)
+        stats = RunStats()
+        tasks = [virtual_user(api, chat_id, path, stats, args, random.Random(rnd.random()), rnd.uniform(0, args.ramp))
+                 for chat_id, path in chats[:users]]
+        start = time.perf_counter()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+    finally:
+        await stop_bot(process)
+        await api.stop()
+
+    latencies = stats.all_latencies()
+    timeouts = sum(stats.timeouts.values())
+    actions = len(latencies) + timeouts
+    errors = _log_errors(log_path)
+    print(f"\n=== users={users} ramp={args.ramp:g}s think={args.think_min:g}-{args.think_max:g}s "
+          f"api latency={args.latency * 1000:g}+{args.jitter * 1000:g}ms limit={args.limit}/s")
+    print(f"actions: {actions}, answered: {len(latencies)}, timeouts: {timeouts} "
+          f"({timeouts / max(actions, 1):.2%}), skipped steps: {stats.skipped}")
+    print(f"throughput: {len(latencies) / elapsed:.1f} answered actions/s over {elapsed:.1f} s")
+    print(f"latency: p50 {_percentile(latencies, 50):.1f} ms, p90 {_percentile(latencies, 90):.1f} ms, "
+          f"p99 {_percentile(latencies, 99):.1f} ms, max {max(latencies, default=float('nan')):.1f} ms")
+    print(f"Bot API: 429 responses: {api.flood_errors}, calls: "
+          + ", ".join(f"{method}={count}" for method, count in api.calls.most_common()))
+    print(f"bot log errors: {sum(errors.values())}"
+          + (" (" + ", ".join(f"{name}={count}" for name, count in errors.most_common()) + ")" if errors else ""))
+    print(f"{'step':>12}  {'n':>6}  {'p50, ms':>8}  {'p99, ms':>8}  {'timeouts':>8}")
+    for label in dict.fromkeys(label for label, _ in STUDENT_PATH + MANAGER_PATH):
+        values = stats.latencies.get(label, [])
+        if values or stats.timeouts[label]:
+            print(f"{label:>12}  {len(values):6d}  {_percentile(values, 50):8.1f}  {_percentile(values, 99):8.1f}  "
+                  f"{stats.timeouts[label]:8d}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, nargs="+", default=[2000], help="число пользователей; по прогону на значение")
+    parser.add_argument("--ramp", type=float, default=60.0, help="за сколько секунд приходят все пользователи")
+    parser.add_argument("--think-min", type=float, default=1.0)
+    parser.add_argument("--think-max", type=float, default=4.0)
+    parser.add_argument("--timeout", type=float, default=10.0, help="сколько пользователь ждёт ответа бота")
+    parser.add_argument("--latency", type=float, default=0.03)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--limit", type=int, default=30, help="лимит сообщений бота в секунду, 0 — без лимита")
+    parser.add_argument("--flood", type=float, default=0.0, help="вероятность случайного 429")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    await engine_base.async_main()
+    population = await seed(max(args.users) + 2, args.tasks, args.events, 24, random.Random(args.seed))
+    await engine_base.dispose_engines()
+
+    # Министры идут по пути задач, ученики — по календарю событий
+    chats = [(TG_ID_BASE + user_id, MANAGER_PATH) for user_id in population.managers]
+    chats += [(TG_ID_BASE + user_id, STUDENT_PATH) for user_id in population.students]
+    random.Random(args.seed).shuffle(chats)
+
+    for users in args.users:
+        await run(users, chats, args, Path(_tmp.name))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
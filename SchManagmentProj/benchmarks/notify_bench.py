@@ -0,0 +1,92 @@
+"""
+Уведомление группы пользователей (министерство, класс): прежний цикл send_notification_by_id
+(запрос get_user_data и последовательная отправка на каждого) против send_notifications
+(один IN-запрос и параллельная доставка). Bot API — локальная заглушка, бот создаётся через init_bot,
+то есть с тем же ограничителем исходящих вызовов, что и в работе.
+
+Запуск из каталога SchManagmentProj:
+    python -m benchmarks.notify_bench --recipients 10 30 100 --latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+
+_tmp = tempfile.TemporaryDirectory()
+# Бенчмарк работает с временной БД, а не с базой бота
+os.environ["BOT_DB_URL"] = f"sqlite+aiosqlite:///{os.path.join(_tmp.name, 'notify.sqlite3')}"
+
+from aiogram.client.session.aiohttp import AiohttpSession  # noqa: E402
+from aiogram.client.telegram import TelegramAPIServer  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.bot import close_bot, get_bot, init_bot  # noqa: E402
+from app.database import engine_base  # noqa: E402
+from app.database.requests.user_requests import get_user_data  # noqa: E402
+from app.utils.notif_sender import send_notifications  # noqa: E402
+from benchmarks.fake_bot_api import FakeBotAPI  # noqa: E402
+from benchmarks.seed_data import seed  # noqa: E402
+
+
+async def legacy_notify(user_ids: list, text: str) -> int:
+    """Прежний send_notification_by_id в цикле: полная запись пользователя и отправка по одному."""
+    sent = 0
+    for user_id in user_ids:
+        user_data = await get_user_data(user_id)
+        if user_data.get("is_banned") or user_data.get("is_deleted") or user_data.get("unreachable_at"):
+            continue
+        try:
+            await get_bot().send_message(chat_id=user_data["tg_id"], text=text)
+            sent += 1
+        except Exception:
+            pass
+    return sent
+
+
+async def bulk_notify(user_ids: list, text: str) -> int:
+    return sum(result.sent for result in await send_notifications(user_ids, text))
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recipients", type=int, nargs="+", default=[10, 30, 100])
+    parser.add_argument("--latency", type=float, default=0.05, help="задержка ответа Bot API, с")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    await engine_base.async_main()
+    population = await seed(max(args.recipients) * 2 + 20, 0, 0, 4, random.Random(args.seed))
+
+    queries = Counter()
+    for engine in (engine_base.write_engine, engine_base.read_engine):
+        event.listen(engine.sync_engine, "before_cursor_execute", lambda *_: queries.update(total=1))
+
+    api = FakeBotAPI(latency=args.latency, jitter=args.jitter, global_limit=30, seed=args.seed)
+    init_bot("42:BENCH", AiohttpSession(api=TelegramAPIServer.from_base(await api.start())))
+
+    print(f"latency={args.latency * 1000:g}+{args.jitter * 1000:g}ms")
+    print(f"{'recipients':>10}  {'variant':>7}  {'time, s':>7}  {'queries':>7}  {'sent':>5}  {'429':>4}")
+    students = population.students
+    for count in args.recipients:
+        # Разные получатели для вариантов — ограничитель не должен переносить паузу по чатам между ними
+        groups = {"legacy": students[:count], "bulk": students[count:2 * count]}
+        for name, notify in (("legacy", legacy_notify), ("bulk", bulk_notify)):
+            await asyncio.sleep(1)  # запас токенов ограничителя восстанавливается
+            queries.clear()
+            api.flood_errors = 0
+            start = time.perf_counter()
+            sent = await notify(groups[name], "Новая задача для вашего министерства")
+            elapsed = time.perf_counter() - start
+            print(f"{count:10d}  {name:>7}  {elapsed:7.2f}  {queries['total']:7d}  {sent:5d}  {api.flood_errors:4d}")
+
+    await close_bot()
+    await api.stop()
+    await engine_base.dispose_engines()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+"""
+Отправляет записанные апдейты в локальный webhook-сервер бота — для проверки режима webhook без Telegram.
+
+Файл — JSON-массив апдейтов или JSONL (по апдейту в строке), пример: benchmarks/updates_sample.jsonl.
+update_id каждого повтора сдвигается, чтобы сервер не отбросил апдейты как дубликаты.
+
+Запуск из каталога SchManagmentProj (бот запущен с BOT_MODE=webhook):
+    python -m benchmarks.replay_updates benchmarks/updates_sample.jsonl --secret "$BOT_WEBHOOK_SECRET" --repeat 100
+"""
+import argparse
+import asyncio
+import copy
+import json
+import statistics
+import time
+from collections import Counter
+
+import aiohttp
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def load_updates(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        text = f.read().strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+async def replay(url: str, updates: list, secret: str, repeat: int, concurrency: int) -> None:
+    headers = {SECRET_HEADER: secret} if secret else {}
+    statuses = Counter()
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    id_step = max(update["update_id"] for update in updates) + 1
+
+    async def post(session: aiohttp.ClientSession, update: dict):
+        async with semaphore:
+            start = time.perf_counter()
+            async with session.post(url, json=update, headers=headers) as response:
+                await response.read()
+                statuses[response.status] += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    async with aiohttp.ClientSession() as session:
+        batch = []
+        for i in range(repeat):
+            for update in updates:
+                update = copy.deepcopy(update)
+                update["update_id"] += i * id_step
+                batch.append(post(session, update))
+        await asyncio.gather(*batch)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"posted {len(latencies)} updates in {elapsed:.2f}s ({len(latencies) / elapsed:.0f}/s)")
+    print("statuses: " + ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items())))
+    print(f"response latency: median {statistics.median(latencies) * 1000:.1f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("file")
+    parser.add_argument("--url", default="http://127.0.0.1:8080/webhook")
+    parser.add_argument("--secret", default="")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(replay(args.url, load_updates(args.file), args.secret, args.repeat, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
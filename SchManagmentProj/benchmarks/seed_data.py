@@ -0,0 +1,84 @@
+"""
+Синтетические данные для бенчмарков: пользователи по ролям, классы, задачи министров и события.
+
+Модуль работает с БД из BOT_DB_URL — задайте временную базу до импорта (см. handler_bench, load_test).
+"""
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.database import engine_base
+from app.database.models.event_models import Event
+from app.database.models.group_models import Group
+from app.database.models.task_models import Task
+from app.database.models.user_models import ManagementType, User, UserRole
+import app.database.models.code_models  # noqa: F401 — регистрирует все таблицы в metadata
+import app.database.models.announcement_models  # noqa: F401
+import app.database.models.fsm_models  # noqa: F401
+import app.database.models.outbox_models  # noqa: F401
+
+# Telegram id пользователя = TG_ID_BASE + его id в БД
+TG_ID_BASE = 100_000
+MANAGER_TYPES = [t for t in ManagementType if t != ManagementType.president]
+
+
+@dataclass
+class Population:
+    admin: int
+    president: int
+    managers: list
+    students: list
+
+    @property
+    def everyone(self) -> list:
+        return [self.admin, self.president, *self.managers, *self.students]
+
+
+async def seed(users: int, tasks: int, events: int, groups: int, rnd: random.Random) -> Population:
+    """Пользователи: id 1 — админ, 2 — президент, дальше министры и ученики. Возвращает id по ролям."""
+    now = datetime.now().replace(microsecond=0)
+    managers = list(range(3, 3 + len(MANAGER_TYPES)))
+    students = list(range(3 + len(MANAGER_TYPES), max(users, len(managers) + 3) + 1))
+
+    rows = [{"role": UserRole.admin, "manager_role": None, "user_desc": "Админ"},
+            {"role": UserRole.management, "manager_role": ManagementType.president, "user_desc": "Президент"}]
+    rows += [{"role": UserRole.management, "manager_role": kind, "user_desc": f"Министр ({kind.value})"}
+             for kind in MANAGER_TYPES]
+    rows += [{"role": UserRole.student, "manager_role": None, "user_desc": None} for _ in students]
+
+    async with engine_base.write_engine.begin() as conn:
+        await conn.execute(insert(Group), [{"grade": 5 + i % 7, "letter": "АБВГДЕ"[i % 6], "students_count": 30,
+                                            "registered_students": 0} for i in range(groups)])
+        await conn.execute(insert(User), [{
+            **row, "tg_id": TG_ID_BASE + i, "registered_at": now, "is_banned": False, "is_deleted": False,
+            "group_id": rnd.randint(1, groups) if groups and row["role"] == UserRole.student else None,
+        } for i, row in enumerate(rows, start=1)])
+
+        task_rows = []
+        for i in range(tasks):
+            created_at = now - timedelta(days=rnd.randint(0, 365), minutes=rnd.randint(0, 1440))
+            completed = rnd.random() < 0.6
+            task_rows.append({
+                "title": f"Задача {i}", "description": "Описание задачи " * 4, "created_by": 2,
+                "created_for": rnd.choice(managers), "created_at": created_at,
+                "end_at": created_at + timedelta(days=rnd.randint(1, 30)), "is_completed": completed,
+                "completed_at": created_at + timedelta(days=rnd.randint(0, 20)) if completed else None,
+                "complete_desc": "Итоги" if completed else None, "is_deleted": rnd.random() < 0.05,
+            })
+        if task_rows:
+            await conn.execute(insert(Task), task_rows)
+
+        event_rows = []
+        for i in range(events):
+            start_at = (now + timedelta(days=rnd.randint(-90, 90))).replace(hour=rnd.randint(8, 18), minute=0)
+            event_rows.append({
+                "title": f"Событие {i}", "description": "Описание события " * 4, "created_by": 1,
+                "created_at": now, "is_active": True, "start_at": start_at,
+                "end_at": start_at + timedelta(hours=rnd.randint(1, 4)), "is_deleted": rnd.random() < 0.05,
+            })
+        if event_rows:
+            await conn.execute(insert(Event), event_rows)
+
+    return Population(admin=1, president=2, managers=managers, students=students)
@@ -0,0 +1,124 @@
+"""
+Пропускная способность чтения/записи SQLite: настройки по умолчанию, профиль (WAL, mmap и т.д.)
+и профиль с раздельными движками (пул читателей + один писатель), как в engine_base.
+
+Запуск из каталога SchManagmentProj:
+    python -m benchmarks.sqlite_profile_bench --users 2000 --tasks 20000 --events 2000 --seconds 5
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func, insert, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database.engine_base import Base, SQLiteProfile, LEGACY_PROFILE, build_engine
+from app.database.models.group_models import Group
+from app.database.models.user_models import User, UserRole
+from app.database.models.task_models import Task
+from app.database.models.event_models import Event
+import app.database.models.code_models  # noqa: F401 — регистрирует все таблицы в metadata
+import app.database.models.announcement_models  # noqa: F401
+
+
+async def seed(engine, users: int, tasks: int, events: int) -> None:
+    rnd = random.Random(1)
+    now = datetime(2026, 10, 1)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Group), [{"grade": 10 + i % 2, "letter": "АБВГ"[i % 4], "students_count": 30,
+                                            "registered_students": 0} for i in range(8)])
+        await conn.execute(insert(User), [{"tg_id": 10_000 + i, "role": UserRole.student, "registered_at": now,
+                                           "is_banned": False, "is_deleted": False} for i in range(users)])
+        await conn.execute(insert(Task), [{
+            "title": f"task {i}", "description": "d", "created_by": 1, "created_for": rnd.randint(1, users),
+            "created_at": now - timedelta(days=rnd.randint(0, 365)), "end_at": now + timedelta(days=7),
+            "is_completed": rnd.random() < 0.6, "completed_at": now, "is_deleted": False,
+        } for i in range(tasks)])
+        await conn.execute(insert(Event), [{
+            "title": f"event {i}", "description": "d", "created_at": now, "is_active": True,
+            "start_at": now + timedelta(days=rnd.randint(-180, 180)),
+            "end_at": now + timedelta(days=rnd.randint(-180, 180), hours=3), "is_deleted": False,
+        } for i in range(events)])
+
+
+async def workload(read_engine, write_engine, users: int, readers: int, writers: int, seconds: float) -> dict:
+    read_factory = async_sessionmaker(read_engine, expire_on_commit=False)
+    write_factory = async_sessionmaker(write_engine, expire_on_commit=False)
+    stats = {"reads": 0, "writes": 0, "errors": 0}
+    deadline = time.perf_counter() + seconds
+    rnd = random.Random(2)
+
+    async def reader():
+        while time.perf_counter() < deadline:
+            user_id = rnd.randint(1, users)
+            start = datetime(2026, 10, 1) + timedelta(days=rnd.randint(-180, 180))
+            try:
+                async with read_factory() as session:
+                    await session.execute(select(Task).filter_by(created_for=user_id, is_completed=False,
+                                                                 is_deleted=False))
+                    await session.execute(select(Event).filter(Event.start_at < start + timedelta(days=7),
+                                                               Event.end_at >= start, Event.is_deleted == False))
+                    await session.scalar(select(func.count(Task.id)).where(Task.is_deleted.is_(False)))
+                stats["reads"] += 1
+            except OperationalError:
+                stats["errors"] += 1
+
+    async def writer():
+        while time.perf_counter() < deadline:
+            user_id = rnd.randint(1, users)
+            try:
+                async with write_factory() as session:
+                    session.add(Task(title="bench", created_by=user_id, created_for=user_id,
+                                     created_at=datetime.now(), end_at=datetime.now() + timedelta(days=1)))
+                    await session.execute(update(Task).where(Task.id == rnd.randint(1, 1000))
+                                          .values(complete_desc="bench"))
+                    await session.commit()
+                stats["writes"] += 1
+            except OperationalError:
+                stats["errors"] += 1
+
+    await asyncio.gather(*[reader() for _ in range(readers)], *[writer() for _ in range(writers)])
+    return stats
+
+
+async def run_profile(name: str, profile: SQLiteProfile, args, split: bool = False) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.sqlite3')}"
+        if split:
+            write_engine = build_engine(url, profile, pool_size=1, max_overflow=0)
+            read_engine = build_engine(url, profile, read_only=True)
+        else:
+            write_engine = read_engine = build_engine(url, profile)
+        try:
+            await seed(write_engine, args.users, args.tasks, args.events)
+            stats = await workload(read_engine, write_engine, args.users, args.readers, args.writers, args.seconds)
+        finally:
+            await read_engine.dispose()
+            await write_engine.dispose()
+    print(f"{name:>8}: reads {stats['reads'] / args.seconds:8.1f}/s  writes {stats['writes'] / args.seconds:7.1f}/s"
+          f"  lock errors {stats['errors']}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--tasks", type=int, default=20000)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    await run_profile("legacy", LEGACY_PROFILE, args)
+    await run_profile("profile", SQLiteProfile(), args)
+    await run_profile("split", SQLiteProfile(), args, split=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
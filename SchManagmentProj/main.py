@@ -1,28 +1,66 @@
 import asyncio
 import logging
+import os
 
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
 
 from app.handlers import router
-from app.database.engine_base import async_main, engine
+from app.database.engine_base import async_main, dispose_engines
 from app.bot import init_bot, close_bot
+from app.utils.announce_worker import announcement_worker
+from app.utils.fsm_storage import SQLiteStorage
+from app.utils.metrics import MetricsServer
+from app.utils.outbox_worker import outbox_worker
+from app.middlewares.metrics_middlewares import setup_metrics
+from app.utils.webhook import WebhookServer
 
 with open("BOT_API_TOKEN.yaml", encoding="utf-8") as key:
     TOKEN = key.read().strip()
 
+# Режим получения апдейтов: "polling" или "webhook" (параметры webhook — BOT_WEBHOOK_*, см. WebhookServer.from_env)
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+# Публичный адрес webhook для регистрации в Telegram; без него сервер просто слушает порт.
+# Без BOT_WEBHOOK_SECRET сервер без url запускается только на loopback (BOT_WEBHOOK_HOST по умолчанию 127.0.0.1):
+# за reverse proxy или на внешнем адресе секрет обязателен, иначе апдейты можно подделать
+WEBHOOK_URL = os.getenv("BOT_WEBHOOK_URL")
+
 
 async def main():
     await async_main()
-    storage = MemoryStorage()
+    # Состояния форм хранятся в БД и переживают перезапуск
+    storage = SQLiteStorage()
     bot = init_bot(TOKEN)
     dispatcher = Dispatcher(storage=storage)
     dispatcher.include_router(router)
+    setup_metrics(dispatcher)
+    # Продолжает прерванные рассылки и отправляет отложенные
+    announcement_worker.start(bot)
+    # Доставляет уведомления из outbox, в том числе не отправленные до перезапуска
+    outbox_worker.start(bot)
+    webhook = None
+    # /metrics для Prometheus, если задан BOT_METRICS_PORT
+    metrics_server = MetricsServer.from_env()
+    if metrics_server is not None:
+        await metrics_server.start()
     try:
-        await dispatcher.start_polling(bot)
+        if BOT_MODE == "webhook":
+            webhook = WebhookServer.from_env(dispatcher, bot)
+            await webhook.start(WEBHOOK_URL)
+            await asyncio.Event().wait()
+        else:
+            # Если раньше был включён webhook, getUpdates без его удаления не работает
+            await bot.delete_webhook()
+            await dispatcher.start_polling(bot)
     finally:
+        if webhook is not None:
+            await webhook.stop()
+        if metrics_server is not None:
+            await metrics_server.stop()
+        await announcement_worker.stop()
+        await outbox_worker.stop()
+        await dispatcher.storage.close()
         await close_bot()
-        await engine.dispose()
+        await dispose_engines()
 
 
 if __name__ == "__main__":